@@ -1,21 +1,68 @@
-from playwright.sync_api import sync_playwright
-from datetime import datetime, date
+import asyncio
 
 from utils_files import (
     ensure_directories,
     load_config,
-    load_all_postliste,
-    load_changes,
-    save_changes,
-    merge_and_save_sharded,
+    append_changes,
+    upsert_sharded,
 )
+from utils_shards import ShardDocLookup, ensure_hash_index
+from utils_change_rollup import update_change_rollup
 
 from scraper_core_incremental import hent_side_incremental
+from scraper_engine import open_engine
+from utils_page_pool import PageTimings
+from utils_detail_queue import DetailQueue, apply_listing_only
 from scraper_changes import detect_changes, build_change_entry
+from scraper_core_api import (
+    InnsynApiClient,
+    api_backend_available,
+    has_file_data,
+    hent_side_api,
+    DEFAULT_SEARCH_PATH,
+    SITE_URL,
+)
 
 CONFIG_FILE = "../config/config.json"
 
 
+async def hent_sider_api(config, max_pages, handle_page):
+    """
+    Går gjennom sidene via JSON-API-et.
+    Returnerer sidenummeret Playwright skal fortsette fra hvis API-et
+    feiler, ellers None.
+    """
+    per_page = int(config.get("per_page", 100))
+
+    async with InnsynApiClient(
+        base_url=config.get("api_base_url", SITE_URL),
+        search_path=config.get("api_search_path", DEFAULT_SEARCH_PATH),
+        fields=config.get("api_fields"),
+    ) as client:
+        for page_num in range(1, max_pages + 1):
+            docs = await hent_side_api(page_num, client, per_page)
+            if docs is None:
+                return page_num
+            if handle_page(page_num, docs):
+                return None
+    return None
+
+
+async def hent_sider_playwright(config, first_page, max_pages, details, handle_page):
+    """Går gjennom sidene med scrapingmotoren til handle_page ber om stopp."""
+    timings = PageTimings()
+    # Én listeside om gangen (stoppkriteriet avhenger av forrige side);
+    # detaljsidene hentes parallelt fra motorens detaljpool.
+    async with open_engine(config, listing_pages=1) as engine:
+        for page_num in range(first_page, max_pages + 1):
+            docs = await hent_side_incremental(page_num, engine, details=details, timings=timings)
+            if handle_page(page_num, docs):
+                break
+        pages_created = engine.pages_created
+    timings.log_report()
+    print(f"[INFO] Sider opprettet: {pages_created}")
+
+
 def main():
     print("[INFO] Starter incremental scraper…")
 
@@ -25,49 +72,91 @@ def main():
     mode = config.get("mode", "incremental")
     max_pages = int(config.get(f"max_pages_{mode}", 50))
 
-    print(f"[INFO] Modus: {mode}, max_pages: {max_pages}")
-
-    # Last ALLE shards
-    existing_dict, _all_existing_list = load_all_postliste()
-    updated = dict(existing_dict)
-    changes = load_changes()
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
-
-        for page_num in range(1, max_pages + 1):
-            docs = hent_side_incremental(page_num, browser)
-
-            if not docs:
-                print(f"[INFO] Ingen dokumenter på side {page_num}. Stopper.")
-                break
-
-            print(f"[INFO] Behandler {len(docs)} dokumenter fra side {page_num}")
-
-            for d in docs:
-                doc_id = d["dokumentID"]
+    # "deferred": bare listesider her; detaljsidene (filer/status) hentes
+    # senere av scraper_details.py fra data/detail_queue.json.
+    deferred = config.get("detail_mode", "inline") == "deferred"
+
+    print(f"[INFO] Modus: {mode}, max_pages: {max_pages}, detaljer: {'utsatt' if deferred else 'inline'}")
+
+    # Hash-indeksen (ID → avtrykk) holder for å avgjøre nytt/uendret.
+    # Shards lastes bare ved behov, når et dokument faktisk er endret.
+    known_hashes = ensure_hash_index()
+    existing = ShardDocLookup()
+    updated = {}
+    changes = []
+    use_api = config.get("fetch_backend") == "api"
+    # API-svar uten fildata behandles som listesider i deferred-modus:
+    # kjente dokumenter beholder filer/status, nye køes for detaljsiden
+    detail_queue = DetailQueue() if deferred or use_api else None
+
+    def handle_page(page_num, docs):
+        """Behandler én side. Returnerer True når scraperen skal stoppe."""
+        if not docs:
+            print(f"[INFO] Ingen dokumenter på side {page_num}. Stopper.")
+            return True
+
+        print(f"[INFO] Behandler {len(docs)} dokumenter fra side {page_num}")
+
+        for d in docs:
+            doc_id = d["dokumentID"]
+            if doc_id in updated:
                 is_new, change_dict = detect_changes(updated, d)
-
-                if is_new:
-                    print(f"[NEW] {doc_id} – {d['tittel']}")
-                    changes.append(build_change_entry(doc_id, d["tittel"], change_dict, "NEW"))
-                elif change_dict:
-                    print(f"[UPDATE] {doc_id} – {', '.join(change_dict.keys())}")
-                    changes.append(build_change_entry(doc_id, d["tittel"], change_dict, "UPDATE"))
-
-                updated[doc_id] = d
-
-            # Incremental stop condition
-            known = sum(1 for d in docs if d["dokumentID"] in existing_dict)
-            if known == len(docs):
-                print("[INFO] Incremental: alle dokumenter på denne siden er kjente. Stopper.")
-                break
-
-        browser.close()
+            else:
+                is_new, change_dict = detect_changes(existing, d, fingerprints=known_hashes)
+
+            if is_new:
+                print(f"[NEW] {doc_id} – {d['tittel']}")
+                changes.append(build_change_entry(doc_id, d["tittel"], change_dict, "NEW"))
+            elif change_dict:
+                print(f"[UPDATE] {doc_id} – {', '.join(change_dict.keys())}")
+                changes.append(build_change_entry(doc_id, d["tittel"], change_dict, "UPDATE"))
+
+            updated[doc_id] = d
+
+        # Incremental stop condition
+        known = sum(1 for d in docs if d["dokumentID"] in known_hashes)
+        if known == len(docs):
+            print("[INFO] Incremental: alle dokumenter på denne siden er kjente. Stopper.")
+            return True
+        return False
+
+    def with_known_details(d):
+        old = updated.get(d["dokumentID"]) or existing.get(d["dokumentID"])
+        apply_listing_only(d, old, detail_queue)
+
+    def handle_api_page(page_num, docs):
+        for d in docs:
+            if not has_file_data(d):
+                with_known_details(d)
+        return handle_page(page_num, docs)
+
+    first_page = 1
+    if use_api:
+        if api_backend_available():
+            resume = asyncio.run(hent_sider_api(config, max_pages, handle_api_page))
+            first_page = resume if resume is not None else max_pages + 1
+            if resume is not None:
+                print(f"[WARN] API feilet på side {resume}, fortsetter med Playwright.")
+        else:
+            print("[WARN] fetch_backend=api, men aiohttp mangler. Bruker Playwright.")
+
+    if first_page <= max_pages:
+        def handle_listing_page(page_num, docs):
+            if deferred:
+                for d in docs:
+                    with_known_details(d)
+            return handle_page(page_num, docs)
+
+        asyncio.run(hent_sider_playwright(config, first_page, max_pages, not deferred, handle_listing_page))
 
     # Lagre til shards
-    merge_and_save_sharded(existing_dict, list(updated.values()))
-    save_changes(changes)
+    existing.close()
+    upsert_sharded(list(updated.values()))
+    append_changes(changes)
+    update_change_rollup(changes, updated)
+    if detail_queue is not None:
+        detail_queue.save()
+        print(f"[INFO] Detaljkø: {len(detail_queue)} dokumenter venter på detaljsiden.")
 
     print(f"[INFO] Incremental scraper ferdig.")
 
@@ -1,8 +1,33 @@
 from datetime import datetime
+from utils_files import doc_fingerprint
+from utils_detail_queue import is_pending
 
-def detect_changes(existing, new_doc):
-    """Returnerer (is_new, changes_dict)."""
+# Eldre dokumenter fra scraper_dates.py har lenken i journal_link
+LEGACY_FIELDS = {"detalj_link": "journal_link"}
+
+# Felt som er ukjente for et dokument som venter på detaljsiden
+# (detail_mode "deferred"); de sammenlignes ikke mot den gamle versjonen
+DETAIL_FIELDS = ("status",)
+
+
+def _old_value(old, key):
+    value = old.get(key)
+    if value is None and key in LEGACY_FIELDS:
+        value = old.get(LEGACY_FIELDS[key])
+    return value
+
+
+def detect_changes(existing, new_doc, fingerprints=None):
+    """
+    Returnerer (is_new, changes_dict).
+    Med fingerprints ({dokumentID: avtrykk}) hoppes feltsammenligningen
+    over for dokumenter med uendret avtrykk.
+    """
     doc_id = new_doc["dokumentID"]
+
+    if fingerprints is not None and fingerprints.get(doc_id) == doc_fingerprint(new_doc):
+        return False, {}
+
     old = existing.get(doc_id)
 
     if not old:
@@ -17,12 +42,17 @@ def detect_changes(existing, new_doc):
             "filer_count": {"gammel": 0, "ny": len(new_doc.get("filer", []))}
         }
 
+    # Status og filer for et ventende dokument hører til NEW-hendelsen
+    pending = is_pending(old)
+
     changes = {}
     for key in ["status", "tittel", "dokumenttype", "avsender_mottaker", "detalj_link", "dato", "dato_iso"]:
-        if old.get(key) != new_doc.get(key):
-            changes[key] = {"gammel": old.get(key), "ny": new_doc.get(key)}
+        if pending and key in DETAIL_FIELDS:
+            continue
+        if _old_value(old, key) != new_doc.get(key):
+            changes[key] = {"gammel": _old_value(old, key), "ny": new_doc.get(key)}
 
-    if len(old.get("filer", [])) != len(new_doc.get("filer", [])):
+    if not pending and len(old.get("filer", [])) != len(new_doc.get("filer", [])):
         changes["filer_count"] = {
             "gammel": len(old.get("filer", [])),
             "ny": len(new_doc.get("filer", []))
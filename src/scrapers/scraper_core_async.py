@@ -1,125 +1,61 @@
+import asyncio
+import time
+from urllib.parse import urlparse
 from utils_dates import parse_date_from_page, within_range
-from utils_playwright_async import safe_text, safe_goto
-from utils_dates import format_date
-
-BASE_URL = (
-    "https://www.strand.kommune.no/tjenester/politikk-innsyn-og-medvirkning/"
-    "postliste-dokumenter-og-vedtak/sok-i-post-dokumenter-og-saker/#/"
-    "?page={page}&pageSize={page_size}"
+from scraper_core_api import (
+    InnsynApiClient,
+    api_backend_available,
+    has_file_data,
+    hent_side_api,
+    DEFAULT_SEARCH_PATH,
 )
+from scraper_engine import LISTING_RETRIES, LISTING_TIMEOUT_MS, ScrapeEngine
+from utils_concurrency import AdaptiveLimiter
+from utils_page_locator import ProbeFailed, bounds_from_dates
+from utils_site import LISTING_URL, SITE_URL
 
+BASE_URL = LISTING_URL
 
-async def hent_side_async(page_num, page, per_page, retries=5, timeout=10_000):
-    """
-    Henter en side med dokumenter (async).
-    Returnerer liste med dokumenter eller None ved feil.
-    """
-    url = BASE_URL.format(page=page_num, page_size=per_page)
-
-    for attempt in range(1, retries + 1):
-        try:
-            print(f"[INFO] (async) Åpner side {page_num} (forsøk {attempt}/{retries}): {url}")
+# Detaljpool for datointervall-skraping (config detail_pool_size / detail_per_host)
+DATES_DETAIL_POOL_SIZE = 8
+DATES_DETAIL_PER_HOST = 6
+# Maks sideinnlastinger per sekund, samlet for alle prosessene (config global_rate_per_sec)
+GLOBAL_RATE_PER_SEC = 20.0
 
-            ok = await safe_goto(page, url, retries=1, timeout=timeout)
-            if not ok:
-                raise RuntimeError("safe_goto feilet")
-
-            await page.wait_for_timeout(150)
-
-            await page.wait_for_selector(
-                "article.bc-content-teaser--item",
-                timeout=timeout,
-                state="attached",
-            )
 
-            artikler = await page.query_selector_all("article.bc-content-teaser--item")
-            if not artikler:
-                raise RuntimeError("0 artikler funnet")
-
-            docs = []
-
-            for art in artikler:
-                dokid = await safe_text(art, ".bc-content-teaser-meta-property--dokumentID dd")
-                if not dokid:
-                    continue
-
-                tittel = await safe_text(art, ".bc-content-teaser-title-text")
-                dato_raw = await safe_text(art, ".bc-content-teaser-meta-property--dato dd")
-                parsed = parse_date_from_page(dato_raw)
+async def hent_side_async(page_num, engine, per_page, retries=LISTING_RETRIES, timeout=LISTING_TIMEOUT_MS,
+                          timings=None, extraction=None):
+    """
+    Henter en side med dokumenter via scrapingmotoren
+    (scraper_engine.ScrapeEngine): listesiden parses én gang, deretter
+    hentes alle detaljsider parallelt fra motorens detaljpool.
+    timings: PageTimings. extraction: "batch" (ett evaluate-kall per
+    side) eller "handles". Returnerer liste med dokumenter eller None ved feil.
+    """
+    return await engine.fetch_page(page_num, per_page, retries=retries, timeout=timeout, timings=timings,
+                                   extraction=extraction)
 
-                doktype = await safe_text(art, ".SakListItem_sakListItemTypeText__16759c")
-                avsender = await safe_text(art, ".bc-content-teaser-meta-property--avsender dd")
-                mottaker = await safe_text(art, ".bc-content-teaser-meta-property--mottaker dd")
 
-                am = (
-                    f"Avsender: {avsender}"
-                    if avsender
-                    else (f"Mottaker: {mottaker}" if mottaker else "")
-                )
+async def hent_side_datoer(page_num, engine, per_page, api_client=None):
+    """
+    Henter bare datoene fra en listeside (ingen detaljsider), til bruk i
+    utils_page_locator. Returnerer (nyeste, eldste) eller None for en tom
+    side. ProbeFailed hvis siden ikke lot seg hente, så en feil ikke
+    tolkes som slutten av listen.
+    """
+    if api_client is not None:
+        docs = await hent_side_api(page_num, api_client, per_page)
+        if docs is not None:
+            return bounds_from_dates(parse_date_from_page(d.get("dato")) for d in docs)
 
-                detalj_link = ""
-                try:
-                    link_elem = await art.evaluate_handle("node => node.closest('a')")
-                    if link_elem:
-                        detalj_link = await link_elem.get_attribute("href")
-                except Exception:
-                    detalj_link = ""
-
-                if detalj_link and not detalj_link.startswith("http"):
-                    detalj_link = "https://www.strand.kommune.no" + detalj_link
-
-                filer = []
-                if detalj_link:
-                    try:
-                        ok = await safe_goto(page, detalj_link, retries=1, timeout=timeout)
-                        if ok:
-                            await page.wait_for_timeout(120)
-
-                            links = await page.query_selector_all("a")
-                            for fl in links:
-                                href = await fl.get_attribute("href")
-                                tekst = await fl.inner_text()
-
-                                if href and "/api/presentation/v2/nye-innsyn/filer" in href:
-                                    abs_url = href if href.startswith("http") else "https://www.strand.kommune.no" + href
-                                    filer.append({
-                                        "tekst": (tekst or "").strip(),
-                                        "url": abs_url
-                                    })
-
-                    except Exception as e:
-                        print(f"[WARN] (async) Klarte ikke hente filer for {dokid}: {e}")
-
-                    finally:
-                        await safe_goto(page, url, retries=1, timeout=timeout)
-                        await page.wait_for_timeout(80)
-
-                status = "Publisert" if filer else "Må bes om innsyn"
-
-                docs.append({
-                    "tittel": tittel,
-                    "dato": format_date(parsed),
-                    "dato_iso": parsed.isoformat() if parsed else None,
-                    "dokumentID": dokid,
-                    "dokumenttype": doktype,
-                    "avsender_mottaker": am,
-                    "journal_link": detalj_link,
-                    "filer": filer,
-                    "status": status,
-                })
-
-            return docs
-
-        except Exception as e:
-            print(f"[WARN] (async) Feil ved lasting/parsing av side {page_num}: {e}")
-            await asyncio.sleep(1)
-
-    print(f"[ERROR] (async) Side {page_num} feilet etter {retries} forsøk.")
-    return None
+    datoer = await engine.fetch_dates(page_num, per_page)
+    if datoer is None:
+        raise ProbeFailed(page_num)
+    return bounds_from_dates(parse_date_from_page(d) for d in datoer)
 
 
 async def scrape_page_with_filter(
-    page,
+    engine,
     page_num,
     per_page,
     start_date,
@@ -127,11 +63,14 @@ async def scrape_page_with_filter(
     semaphore,
     index,
     total_pages,
-    timeout=20000,
+    timeout=LISTING_TIMEOUT_MS,
+    api_client=None,
 ):
     """
     Wrapper rundt hent_side_async() som:
-      - henter en side
+      - henter en side (via JSON-API hvis api_client er gitt,
+        med Playwright som fallback)
+      - melder latens/feil til semaphore hvis den er en AdaptiveLimiter
       - filtrerer dokumenter på dato
       - returnerer enten liste eller {"failed": page_num}
     """
@@ -139,16 +78,28 @@ async def scrape_page_with_filter(
     print(f"[INFO] Scraper side {index} av {total_pages} (page_num={page_num})")
 
     async with semaphore:
-        docs = await hent_side_async(
-            page_num=page_num,
-            page=page,
-            per_page=per_page,
-            timeout=timeout,
-            retries=5,
-        )
+        t0 = time.monotonic()
+        docs = None
+        if api_client is not None:
+            docs = await hent_side_api(page_num, api_client, per_page)
+            if docs is None:
+                print(f"[WARN] API feilet for side {page_num}, faller tilbake til Playwright.")
+
+        if docs is None:
+            docs = await hent_side_async(
+                page_num=page_num,
+                engine=engine,
+                per_page=per_page,
+                timeout=timeout,
+            )
 
+        adaptive = isinstance(semaphore, AdaptiveLimiter)
         if not docs:
+            if adaptive:
+                semaphore.record_error(f"side {page_num} feilet")
             return {"failed": page_num}
+        if adaptive:
+            semaphore.record_success(time.monotonic() - t0)
 
         filtered = []
         for d in docs:
@@ -156,4 +107,120 @@ async def scrape_page_with_filter(
             if within_range(parsed_date, start_date, end_date):
                 filtered.append(d)
 
+        # API-svar uten fildata: filer/status hentes fra detaljsidene
+        missing = [d for d in filtered if not has_file_data(d)]
+        if missing:
+            await engine.fill_files(missing)
+
         return filtered
+
+
+async def open_scraping(cfg, rate=None):
+    """
+    Oppsett for én scrapende prosess (scraper_dates.py og arbeiderne i
+    scraper_parallel.py): AdaptiveLimiter, scrapingmotor med én listeside
+    per arbeider og (med fetch_backend=api) API-klient.
+    rate: felles takt for sideinnlastinger (RateLimiter/SharedRateLimiter).
+    Returnerer (limiter, engine, api_client).
+    """
+    # Antall arbeidere er taket; hvor mange som faktisk jobber samtidig
+    # styres av limiteren (AIMD ut fra latens og feil).
+    limiter = AdaptiveLimiter.from_config(cfg)
+    engine = await ScrapeEngine.launch(
+        cfg,
+        listing_pages=limiter.max_limit,
+        detail_pages=int(cfg.get("detail_pool_size", DATES_DETAIL_POOL_SIZE)),
+        detail_per_host=int(cfg.get("detail_per_host", DATES_DETAIL_PER_HOST)),
+        rate=rate,
+    )
+    limiter.watch_responses(engine.context, urlparse(SITE_URL).netloc)
+
+    api_client = None
+    if cfg.get("fetch_backend", "playwright") == "api":
+        if api_backend_available():
+            api_client = InnsynApiClient(
+                base_url=cfg.get("api_base_url", SITE_URL),
+                search_path=cfg.get("api_search_path", DEFAULT_SEARCH_PATH),
+                limit=limiter.max_limit,
+                fields=cfg.get("api_fields"),
+            )
+            await api_client.open()
+        else:
+            print("[WARN] fetch_backend=api, men aiohttp mangler. Bruker Playwright.")
+    return limiter, engine, api_client
+
+
+async def close_scraping(engine, api_client):
+    if api_client is not None:
+        await api_client.close()
+    await engine.close()
+
+
+async def scrape_pages(engine, limiter, api_client, pages, per_page, start_date, end_date, spill, journal):
+    """
+    Scraper sidene (produsent/konsument med begrenset kø), skriver
+    dokumentene innenfor datointervallet til spill og ferdige/feilede
+    sider til journal. Returnerer listen over feilede sider.
+    """
+    concurrency = limiter.max_limit
+    failed_pages = []
+    page_queue = asyncio.Queue(maxsize=concurrency * 2)
+    result_queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    def journal_flushed(flushed):
+        for pn, ids in flushed:
+            journal.mark_done(pn, ids)
+
+    async def producer():
+        for idx, page_num in enumerate(pages, start=1):
+            await page_queue.put((idx, page_num))
+        for _ in range(concurrency):
+            await page_queue.put(None)
+
+    async def worker():
+        try:
+            while True:
+                item = await page_queue.get()
+                if item is None:
+                    break
+                idx, page_num = item
+                try:
+                    result = await scrape_page_with_filter(
+                        engine=engine,
+                        page_num=page_num,
+                        per_page=per_page,
+                        start_date=start_date,
+                        end_date=end_date,
+                        semaphore=limiter,
+                        index=idx,
+                        total_pages=len(pages),
+                        api_client=api_client,
+                    )
+                except Exception as e:
+                    print(f"[WARN] Uventet feil på side {page_num}: {e}")
+                    result = {"failed": page_num}
+                await result_queue.put((page_num, result))
+        finally:
+            await result_queue.put(None)
+
+    async def consumer():
+        done_workers = 0
+        while done_workers < concurrency:
+            item = await result_queue.get()
+            if item is None:
+                done_workers += 1
+                continue
+            page_num, batch = item
+            if isinstance(batch, dict) and "failed" in batch:
+                failed_pages.append(batch["failed"])
+                journal.mark_failed(batch["failed"])
+            elif isinstance(batch, list):
+                journal_flushed(spill.add(batch, page_num))
+        journal_flushed(spill.flush())
+
+    await asyncio.gather(
+        producer(),
+        consumer(),
+        *[worker() for _ in range(concurrency)],
+    )
+    return failed_pages
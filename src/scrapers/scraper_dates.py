@@ -1,19 +1,38 @@
 import argparse
 import asyncio
+import json
 from utils_dates import parse_cli_date
 from utils_files import (
     ensure_directories,
     load_config,
-    merge_and_save_sharded,
-    atomic_write,
+    upsert_sharded,
+    atomic_write_stream,
     load_archive_year,
     append_missing,
     save_failed_pages,
     find_missing_docs,
 )
-from utils_concurrency import compute_concurrency
-from utils_playwright_setup import create_playwright_context
-from scraper_core_async import scrape_page_with_filter
+from utils_concurrency import RateLimiter
+from scraper_core_async import (
+    hent_side_datoer,
+    open_scraping,
+    close_scraping,
+    scrape_pages,
+    DATES_DETAIL_POOL_SIZE,
+    DATES_DETAIL_PER_HOST,
+    GLOBAL_RATE_PER_SEC,
+)
+from scraper_parallel import run_parallel, default_processes
+from utils_page_locator import LocateError, locate_page_range
+from utils_spill import (
+    SpillWriter,
+    CheckpointJournal,
+    JOURNAL_NAME,
+    iter_spill,
+    done_pages_in,
+    spill_dir_for,
+    clear_spill,
+)
 
 DEFAULT_CONFIG_FILE = "../config/config.json"
 FILTERED_FILE = "../../data/postliste_filtered.json"
@@ -24,15 +43,26 @@ async def run_scrape_async(
     end_date=None,
     config_path=DEFAULT_CONFIG_FILE,
     mode="publish",
+    resume=False,
+    processes=None,
 ):
     print(f"[INFO] Starter ASYNC PARALLELL scraper_dates i modus='{mode}'…")
 
     ensure_directories()
     cfg = load_config(config_path)
 
+    if processes is None:
+        processes = cfg.get("processes", 1)
+    processes = default_processes() if str(processes) in ("auto", "0") else max(1, int(processes))
+
     start_page = int(cfg.get("start_page", 1))
     max_pages = int(cfg.get("max_pages", 100))
     per_page = int(cfg.get("per_page", 100))
+    detail_pool_size = int(cfg.get("detail_pool_size", DATES_DETAIL_POOL_SIZE))
+    detail_per_host = int(cfg.get("detail_per_host", DATES_DETAIL_PER_HOST))
+    rate_per_sec = float(cfg.get("global_rate_per_sec", GLOBAL_RATE_PER_SEC))
+    fetch_backend = cfg.get("fetch_backend", "playwright")
+    spill_batch_size = int(cfg.get("spill_batch_size", 500))
     step = 1 if max_pages > start_page else -1
     total_pages = abs(max_pages - start_page) + 1
 
@@ -42,64 +72,102 @@ async def run_scrape_async(
     print(f"       step        = {step}")
     print(f"       total_pages = {total_pages}")
     print(f"       per_page    = {per_page}")
+    print(f"       detail_pool = {detail_pool_size} (maks {detail_per_host} per vert)")
+    print(f"       backend     = {fetch_backend}")
+    print(f"       prosesser   = {processes} (felles takt {rate_per_sec:g} sider/s)")
     print(f"       start_date  = {start_date}")
     print(f"       end_date    = {end_date}")
 
     # ---------------------------------------------------------
-    # SETUP: concurrency + Playwright
+    # SETUP: concurrency + scrapingmotor
     # ---------------------------------------------------------
-    CONCURRENCY = compute_concurrency()
-    print(f"[INFO] Bruker CONCURRENCY={CONCURRENCY}")
-
-    p, browser, context = await create_playwright_context()
-    semaphore = asyncio.Semaphore(CONCURRENCY)
+    # Med flere prosesser brukes denne motoren bare til å finne
+    # sideintervallet; arbeiderne i scraper_parallel.py har hver sin.
+    rate = RateLimiter(rate_per_sec)
+    limiter, engine, api_client = await open_scraping(cfg, rate=rate)
+    styring = f"adaptiv, mål p95 {limiter.target_latency:.0f}s per side" if limiter.adaptive else "statisk"
+    print(f"[INFO] Concurrency: start {limiter.limit}, min {limiter.min_limit}, "
+          f"maks {limiter.max_limit} ({styring}){' per prosess' if processes > 1 else ''}")
 
     # ---------------------------------------------------------
     # SCRAPE ALL PAGES
     # ---------------------------------------------------------
-    async def task_for_page(page_num, idx):
-        page = await context.new_page()
-        try:
-            return await scrape_page_with_filter(
-                page=page,
-                page_num=page_num,
-                per_page=per_page,
-                start_date=start_date,
-                end_date=end_date,
-                semaphore=semaphore,
-                index=idx,
-                total_pages=total_pages,
-            )
-        finally:
-            await page.close()
-
-    tasks = [
-        task_for_page(page_num, idx)
-        for idx, page_num in enumerate(
-            range(start_page, max_pages + step, step),
-            start=1,
+    run_key = f"{mode}_{start_page}-{max_pages}_{start_date}_{end_date}"
+    spill_dir = spill_dir_for(run_key)
+    journal = CheckpointJournal(spill_dir / JOURNAL_NAME)
+    pages_file = spill_dir / "pages.json"
+
+    done_pages = set()
+
+    if resume:
+        done_pages = done_pages_in(spill_dir)
+        print(f"[INFO] Resume: {len(done_pages)} sider allerede ferdige i {spill_dir}")
+    elif spill_dir.exists():
+        print(f"[WARN] Fjerner gamle spill-filer i {spill_dir}")
+        clear_spill(spill_dir)
+        journal = CheckpointJournal(spill_dir / JOURNAL_NAME)
+
+    # Finn sidene som faktisk dekker datointervallet. Configens sider
+    # brukes bare som startpunkt for søket. Ved resume gjenbrukes
+    # intervallet fra forrige kjøring, siden sidetallene i journalen
+    # gjelder det.
+    if (start_date or end_date) and cfg.get("locate_pages", True):
+        if resume and pages_file.exists():
+            start_page, max_pages = json.loads(pages_file.read_text(encoding="utf-8"))
+            print(f"[INFO] Resume: bruker sideintervall {start_page}–{max_pages} fra forrige kjøring")
+        else:
+            try:
+                located = await locate_page_range(
+                    lambda pn: hent_side_datoer(pn, engine, per_page, api_client=api_client),
+                    per_page,
+                    start_date,
+                    end_date,
+                    hint_first=min(start_page, max_pages),
+                    hint_last=max(start_page, max_pages),
+                )
+            except LocateError as e:
+                # Et kortere intervall ville hoppet over sider uten å si fra
+                print(f"[ERROR] Fant ikke sideintervallet: {e}. Avbryter.")
+                await close_scraping(engine, api_client)
+                raise SystemExit(1)
+
+            if located is None:
+                print("[WARN] Ingen sider dekker datointervallet.")
+                located = (1, 0)
+            start_page, max_pages = located
+            spill_dir.mkdir(parents=True, exist_ok=True)
+            pages_file.write_text(json.dumps([start_page, max_pages]), encoding="utf-8")
+        step = 1
+        total_pages = max(0, max_pages - start_page + 1)
+
+    all_pages = list(range(start_page, max_pages + step, step))
+
+    pages_to_scrape = [pn for pn in all_pages if pn not in done_pages]
+    print(f"[INFO] Skal scrape {len(pages_to_scrape)} av {total_pages} sider.")
+
+    if processes > 1:
+        await close_scraping(engine, api_client)
+        count, failed_pages = await asyncio.to_thread(
+            run_parallel, pages_to_scrape, spill_dir, cfg, processes, per_page, start_date, end_date,
         )
-    ]
-
-    results = await asyncio.gather(*tasks)
-
-    await context.close()
-    await browser.close()
-    await p.stop()
-
-    # ---------------------------------------------------------
-    # COLLECT RESULTS
-    # ---------------------------------------------------------
-    all_docs = []
-    failed_pages = []
-
-    for batch in results:
-        if isinstance(batch, dict) and "failed" in batch:
-            failed_pages.append(batch["failed"])
-        elif isinstance(batch, list):
-            all_docs.extend(batch)
-
-    print(f"[INFO] Totalt hentet {len(all_docs)} dokumenter innenfor dato-range.")
+    else:
+        spill = SpillWriter(spill_dir, batch_size=spill_batch_size)
+        failed_pages = await scrape_pages(
+            engine, limiter, api_client, pages_to_scrape, per_page, start_date, end_date, spill, journal,
+        )
+        count = spill.count
+        await close_scraping(engine, api_client)
+        print(f"[INFO] Slutt: {limiter.summary()}")
+
+    def finish_spill():
+        # Behold journal + spill hvis noe feilet, slik at --resume kan
+        # prøve bare de feilede sidene på nytt.
+        if failed_pages:
+            print(f"[INFO] Beholder checkpoint i {spill_dir} ({len(failed_pages)} feilede sider). Kjør med --resume.")
+        else:
+            clear_spill(spill_dir)
+
+    print(f"[INFO] Totalt hentet {count} nye dokumenter innenfor dato-range i denne kjøringen.")
     print(f"[INFO] Antall feilede sider: {len(failed_pages)}")
 
     # ---------------------------------------------------------
@@ -111,29 +179,30 @@ async def run_scrape_async(
         year = start_date.year if start_date else "unknown"
 
         archive_dict = load_archive_year(year)
-        missing_docs = find_missing_docs(all_docs, archive_dict)
+        missing_docs = find_missing_docs(iter_spill(spill_dir), archive_dict)
 
         print(f"[INFO] Fant {len(missing_docs)} nye manglende dokumenter.")
 
         append_missing(year, missing_docs)
         save_failed_pages(year, failed_pages)
 
+        finish_spill()
         print("[INFO] Repair fullført.")
         return
 
     # ---------------------------------------------------------
     # NORMAL MODES
     # ---------------------------------------------------------
-    atomic_write(FILTERED_FILE, all_docs)
+    atomic_write_stream(FILTERED_FILE, iter_spill(spill_dir))
 
     if mode == "publish":
-        from utils_files import load_all_postliste
-        existing_dict, _ = load_all_postliste()
-        merge_and_save_sharded(existing_dict, all_docs)
+        upsert_sharded(iter_spill(spill_dir))
         print("[INFO] Oppdatert shard-basert hoveddatasett.")
     else:
         print("[INFO] FULL-modus: Oppdaterer ikke hoveddatasettet")
 
+    finish_spill()
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -143,6 +212,16 @@ def main():
         default="publish",
         choices=["full", "publish", "repair"],
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Fortsett en avbrutt kjøring: hopp over ferdige sider i checkpoint-journalen",
+    )
+    parser.add_argument(
+        "--processes",
+        help="Antall arbeidsprosesser, hver med egen nettleser ('auto' = CPU-kjerner - 1). "
+             "Overstyrer processes i config.",
+    )
     parser.add_argument("start_date", nargs="?")
     parser.add_argument("end_date", nargs="?")
 
@@ -157,6 +236,8 @@ def main():
             end_date=end_date,
             config_path=args.config,
             mode=args.mode,
+            resume=args.resume,
+            processes=args.processes,
         )
     )
 
@@ -0,0 +1,145 @@
+import asyncio
+
+from utils_files import ensure_directories, load_config, upsert_sharded, append_changes
+from utils_shards import ShardDocLookup
+from utils_change_rollup import update_change_rollup
+from utils_concurrency import RateLimiter
+from scraper_engine import open_engine, set_files
+from utils_detail_queue import DetailQueue, DETAIL_STATUS_KEY
+from utils_revisit import RevisitSchedule
+from scraper_changes import detect_changes, build_change_entry
+
+# Fase to av listing-only-modus ("detail_mode": "deferred" i scraper.py):
+# henter detaljsidene for dokumentene i data/detail_queue.json, fyller
+# inn filer/status og logger endringene. Kjøres i eget tempo, uavhengig
+# av den daglige listeskrapingen.
+#
+# I samme kjøring brukes et eget budsjett på ny sjekk av upubliserte
+# dokumenter i hele arkivet ("Må bes om innsyn"), se utils_revisit.py.
+#
+# Config:
+#   "detail_budget": maks antall detaljsider per kjøring (standard 200)
+#   "detail_rate_per_sec": maks nye detaljsider per sekund (standard 2)
+#   "detail_workers": samtidige sider (standard 4)
+#   "revisit_budget": maks antall nye sjekker av upubliserte per kjøring (standard 100)
+#   "revisit_base_days" / "revisit_max_days": back-off 1, 2, 4 … dager, maks 90
+
+CONFIG_FILE = "../config/config.json"
+
+
+async def hent_detaljer(entries, rate_per_sec, workers, cfg):
+    """
+    Henter filer for [(dokumentID, køoppføring)].
+    Returnerer {dokumentID: filer}, og None for sider som ikke lot seg åpne.
+    """
+    limiter = RateLimiter(rate_per_sec)
+    results = {}
+
+    async with open_engine(cfg, detail_pages=workers, detail_per_host=workers, rate=limiter) as engine:
+        async def worker(did, entry):
+            results[did] = await engine.hent_filer(did, entry["link"])
+
+        await asyncio.gather(*(worker(did, entry) for did, entry in entries))
+
+    return results
+
+
+def apply_details(did, filer, existing, updated, changes):
+    """
+    Fyller inn filer/status fra detaljsiden i dokumentet og logger
+    endringen. Returnerer den nye statusen, eller None hvis dokumentet
+    ikke finnes i shardene.
+
+    For et ventende dokument fullfører dette NEW-hendelsen fra
+    listeskrapingen: status og filer hadde ingen tidligere verdi, så
+    detect_changes logger ingen UPDATE for dem.
+    """
+    old = updated.get(did) or existing.get(did)
+    if old is None:
+        print(f"[WARN] {did} står i detaljkøen/planen, men finnes ikke i shardene.")
+        return None
+
+    doc = dict(old)
+    doc.pop(DETAIL_STATUS_KEY, None)
+    set_files(doc, filer)
+
+    _is_new, change_dict = detect_changes({did: old}, doc)
+    if change_dict:
+        print(f"[UPDATE] {did} – {', '.join(change_dict.keys())}")
+        changes.append(build_change_entry(did, doc["tittel"], change_dict, "UPDATE"))
+    if doc != old:
+        updated[did] = doc
+    return doc["status"]
+
+
+def main():
+    print("[INFO] Starter detalj-backfill…")
+
+    ensure_directories()
+    cfg = load_config(CONFIG_FILE)
+
+    budget = int(cfg.get("detail_budget", 200))
+    revisit_budget = int(cfg.get("revisit_budget", 100))
+    rate = float(cfg.get("detail_rate_per_sec", 2.0))
+    workers = int(cfg.get("detail_workers", 4))
+
+    queue = DetailQueue()
+    queue_entries = queue.take(budget)
+
+    schedule = RevisitSchedule.from_config(cfg)
+    schedule.sync()
+    taken = {did for did, _entry in queue_entries}
+    revisit_entries = schedule.due(revisit_budget, exclude=taken)
+
+    if not queue_entries and not revisit_entries:
+        schedule.save()
+        print(f"[INFO] Ingen detaljsider å hente ({len(queue)} i detaljkøen, ingen klare; ingen forfalte i planen).")
+        return
+
+    print(f"[INFO] Henter {len(queue_entries)} av {len(queue)} fra detaljkøen og "
+          f"{len(revisit_entries)} forfalte av {len(schedule)} upubliserte "
+          f"(maks {rate:g}/s, {workers} samtidige).")
+
+    results = asyncio.run(hent_detaljer(queue_entries + revisit_entries, rate, workers, cfg))
+
+    existing = ShardDocLookup()
+    updated = {}
+    changes = []
+    failed = 0
+
+    for did, _entry in queue_entries:
+        filer = results.get(did)
+        if filer is None:
+            queue.failed(did)
+            failed += 1
+            continue
+        queue.done(did)
+        apply_details(did, filer, existing, updated, changes)
+
+    published = 0
+    for did, _entry in revisit_entries:
+        filer = results.get(did)
+        if filer is None:
+            schedule.failed(did)
+            failed += 1
+            continue
+        status = apply_details(did, filer, existing, updated, changes)
+        if status == "Må bes om innsyn":
+            schedule.still_unpublished(did)
+        else:
+            schedule.published(did)
+            published += status is not None
+
+    existing.close()
+    upsert_sharded(list(updated.values()))
+    append_changes(changes)
+    update_change_rollup(changes, updated)
+    queue.save()
+    schedule.save()
+
+    print(f"[INFO] Detalj-backfill ferdig: {len(updated)} oppdatert, {published} nylig publisert, "
+          f"{failed} feilet, {len(queue)} igjen i køen.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from utils_dates import parse_date_from_page, format_date
+from utils_page_pool import PagePool
+from utils_playwright_async import goto_fresh, install_activity_tracker, safe_text, wait_for_settled
+from utils_playwright_setup import create_playwright_context
+from utils_resources import ResourcePolicy
+from utils_site import LISTING_URL, SITE_URL
+
+# Felles scrapingmotor (async) for alle modusene.
+#
+#   read_listing(page)   listeparseren: rå felter for hver artikkel
+#   make_doc(raw, side)  dokument i felles format (DOC_FIELDS)
+#   read_files(page)     detaljparseren: fil-lenkene på en detaljside
+#   ScrapeEngine         context med ressurspolicy og aktivitetssporing,
+#                        varme sider for liste- og detaljsider og
+#                        tilstandsbasert venting
+#
+# Parserne leser DOM-en på to måter (EXTRACTION_MODES, config
+# "dom_extraction"):
+#
+#   batch    ett eval_on_selector_all-kall per side som returnerer alle
+#            feltene som JSON (standard)
+#   handles  query_selector/inner_text per felt og artikkel, ca. sju
+#            rundturer til nettleseren per artikkel
+#
+# scraper.py, scraper_dates.py og scraper_details.py er moduser oppå
+# motoren; hent_side_async og hent_side_incremental er tynne innganger
+# til den samme koden. Den synkrone hent_side (via SyncEngine) finnes
+# bare for tools/bench_scraper.py.
+
+ARTICLE_SELECTOR = "article.bc-content-teaser--item"
+FILE_LINK_SELECTOR = 'a[href*="/api/presentation/v2/nye-innsyn/filer"]'
+DATE_SELECTOR = ARTICLE_SELECTOR + " .bc-content-teaser-meta-property--dato dd"
+
+# Utfall for en listeside: artikler funnet, lastet uten artikler (forbi
+# slutten av listen) eller ikke lastet i det hele tatt
+LISTING_OK = "ok"
+LISTING_EMPTY = "tom"
+LISTING_FAILED = "feilet"
+
+# Rå felter per artikkel på listesiden
+LISTING_FIELDS = {
+    "dokumentID": ".bc-content-teaser-meta-property--dokumentID dd",
+    "tittel": ".bc-content-teaser-title-text",
+    "dato": ".bc-content-teaser-meta-property--dato dd",
+    "dokumenttype": ".SakListItem_sakListItemTypeText__16759c",
+    "avsender": ".bc-content-teaser-meta-property--avsender dd",
+    "mottaker": ".bc-content-teaser-meta-property--mottaker dd",
+}
+
+# Feltene i et dokument, i lagret rekkefølge
+DOC_FIELDS = (
+    "tittel", "dato", "dato_iso", "dokumentID", "dokumenttype",
+    "avsender_mottaker", "side", "detalj_link", "filer", "status",
+)
+
+# Samme felter som handles-veien, men for alle artiklene i ett kall
+LISTING_JS = """(arts, fields) => arts.map(art => {
+  const raw = {};
+  for (const [key, sel] of Object.entries(fields)) {
+    const node = art.querySelector(sel);
+    raw[key] = node ? (node.innerText || "").trim() : "";
+  }
+  const link = art.closest("a");
+  raw.href = link ? link.getAttribute("href") || "" : "";
+  return raw;
+}).filter(raw => raw.dokumentID)"""
+
+FILES_JS = """links => links.map(a => ({ href: a.getAttribute("href"), tekst: a.innerText }))"""
+
+EXTRACTION_MODES = ("batch", "handles")
+DEFAULT_EXTRACTION = "batch"
+
+STATUS_PUBLISHED = "Publisert"
+STATUS_REQUEST = "Må bes om innsyn"
+
+LISTING_TIMEOUT_MS = 15_000
+DETAIL_TIMEOUT_MS = 10_000
+LISTING_RETRIES = 3
+LISTING_PAGES = 2
+DETAIL_POOL_SIZE = 4
+DETAIL_PER_HOST = 4
+
+
+def abs_url(href, site_url=SITE_URL):
+    if not href:
+        return ""
+    return href if href.startswith("http") else site_url + href
+
+
+def make_doc(raw, page_num, site_url=SITE_URL):
+    """
+    Lager et dokument i felles format fra rå listefelter (LISTING_FIELDS
+    pluss "href"). filer/status fylles inn av set_files.
+    """
+    parsed = parse_date_from_page(raw.get("dato"))
+    avsender = raw.get("avsender")
+    mottaker = raw.get("mottaker")
+    am = f"Avsender: {avsender}" if avsender else (f"Mottaker: {mottaker}" if mottaker else "")
+    return {
+        "tittel": raw.get("tittel") or "",
+        "dato": format_date(parsed),
+        "dato_iso": parsed.isoformat() if parsed else None,
+        "dokumentID": raw.get("dokumentID") or "",
+        "dokumenttype": raw.get("dokumenttype") or "",
+        "avsender_mottaker": am,
+        "side": page_num,
+        "detalj_link": abs_url(raw.get("href"), site_url),
+        "filer": [],
+        "status": STATUS_REQUEST,
+    }
+
+
+def set_files(doc, filer):
+    doc["filer"] = filer
+    doc["status"] = STATUS_PUBLISHED if filer else STATUS_REQUEST
+    return doc
+
+
+def _check_extraction(mode):
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Ukjent dom_extraction: {mode} (gyldige: {', '.join(EXTRACTION_MODES)})")
+    return mode
+
+
+async def read_listing(page, extraction=DEFAULT_EXTRACTION):
+    """Listeparseren: rå felter for artiklene på en lastet listeside."""
+    if extraction == "batch":
+        return await page.eval_on_selector_all(ARTICLE_SELECTOR, LISTING_JS, LISTING_FIELDS)
+
+    out = []
+    for art in await page.query_selector_all(ARTICLE_SELECTOR):
+        raw = {key: await safe_text(art, sel) for key, sel in LISTING_FIELDS.items()}
+        if not raw["dokumentID"]:
+            continue
+        raw["href"] = ""
+        try:
+            link = (await art.evaluate_handle("node => node.closest('a')")).as_element()
+            if link:
+                raw["href"] = await link.get_attribute("href") or ""
+        except Exception:
+            pass
+        out.append(raw)
+    return out
+
+
+async def read_files(page, extraction=DEFAULT_EXTRACTION):
+    """Detaljparseren: fil-lenkene på en lastet detaljside."""
+    if extraction == "batch":
+        links = await page.eval_on_selector_all(FILE_LINK_SELECTOR, FILES_JS)
+    else:
+        links = []
+        for fl in await page.query_selector_all(FILE_LINK_SELECTOR):
+            links.append({"href": await fl.get_attribute("href"), "tekst": await fl.inner_text()})
+
+    filer = []
+    for link in links:
+        href, tekst = link["href"], link["tekst"]
+        if href:
+            filer.append({"tekst": (tekst or "").strip(), "url": abs_url(href)})
+    return filer
+
+
+class ScrapeEngine:
+    """
+    Henter liste- og detaljsider i én Playwright-context.
+
+    - Listesider lånes fra en pool på `listing_pages` sider, detaljsider
+      fra en egen pool (`detail_pages`, maks `detail_per_host` per vert)
+    - Sidene gjenbrukes og lastes via about:blank (goto_fresh)
+    - Det ventes på artiklene / fil-lenkene eller på at siden er stille
+      (wait_for_settled), ikke på faste pauser
+    - `extraction` velger hvordan parserne leser DOM-en (kan overstyres
+      per kall)
+    - `rate` (RateLimiter/SharedRateLimiter) begrenser hvor mange sider
+      som lastes per sekund, liste- og detaljsider samlet
+    """
+
+    def __init__(self, context, listing_pages=LISTING_PAGES, detail_pages=DETAIL_POOL_SIZE,
+                 detail_per_host=DETAIL_PER_HOST, extraction=DEFAULT_EXTRACTION, rate=None):
+        self.context = context
+        self.extraction = _check_extraction(extraction)
+        self.rate = rate
+        self.listing = PagePool(context, size=listing_pages, per_host=listing_pages)
+        self.details = PagePool(context, size=detail_pages, per_host=detail_per_host)
+        self.policy = None
+        self._owned = None  # (playwright, browser) når motoren startet nettleseren selv
+
+    @classmethod
+    async def attach(cls, context, **kwargs):
+        """Motor i en eksisterende context (ressurspolicy installeres av kaller)."""
+        await install_activity_tracker(context)
+        return cls(context, **kwargs)
+
+    @classmethod
+    async def launch(cls, cfg=None, policy=None, **kwargs):
+        """
+        Starter Chromium med ressurspolicy (fra cfg hvis policy mangler).
+        detail_pool_size / detail_per_host i cfg gir detaljpoolen,
+        dom_extraction parsermodus.
+        """
+        cfg = cfg or {}
+        if policy is None:
+            policy = ResourcePolicy.from_config(cfg)
+        kwargs.setdefault("detail_pages", int(cfg.get("detail_pool_size", DETAIL_POOL_SIZE)))
+        kwargs.setdefault("detail_per_host", int(cfg.get("detail_per_host", DETAIL_PER_HOST)))
+        _check_extraction(kwargs.setdefault("extraction", cfg.get("dom_extraction", DEFAULT_EXTRACTION)))
+
+        p, browser, context = await create_playwright_context(policy=policy)
+        engine = await cls.attach(context, **kwargs)
+        engine.policy = policy
+        engine._owned = (p, browser)
+        return engine
+
+    async def _throttle(self):
+        if self.rate is not None:
+            await self.rate.wait()
+
+    @property
+    def pages_created(self):
+        return self.listing.pages_created + self.details.pages_created
+
+    async def close(self):
+        await self.listing.close()
+        await self.details.close()
+        if self._owned is not None:
+            p, browser = self._owned
+            self._owned = None
+            await self.context.close()
+            await browser.close()
+            await p.stop()
+            self.policy.log_report()
+
+    # ---------------------------------------------------------
+    # Listesider
+    # ---------------------------------------------------------
+    async def _open_listing(self, page, url, page_num, retries, timeout):
+        """
+        LISTING_OK, LISTING_EMPTY hvis siste forsøk lastet siden uten
+        artikler, ellers LISTING_FAILED.
+        """
+        status = LISTING_FAILED
+        for attempt in range(1, retries + 1):
+            print(f"[INFO] Åpner side {page_num} (forsøk {attempt}/{retries}): {url}")
+            await self._throttle()
+            status = LISTING_FAILED
+            if await goto_fresh(page, url, retries=1, timeout=timeout):
+                try:
+                    await page.wait_for_selector(ARTICLE_SELECTOR, timeout=timeout, state="attached")
+                    return LISTING_OK
+                except Exception:
+                    status = LISTING_EMPTY
+                    print(f"[WARN] Ingen artikler på side {page_num} (forsøk {attempt}/{retries})")
+            if attempt < retries:
+                await asyncio.sleep(0.5 * attempt)
+        if status == LISTING_EMPTY:
+            print(f"[INFO] Side {page_num} har ingen artikler etter {retries} forsøk.")
+        else:
+            print(f"[ERROR] Side {page_num} feilet etter {retries} forsøk.")
+        return status
+
+    async def fetch_listing(self, page_num, per_page, retries=LISTING_RETRIES,
+                            timeout=LISTING_TIMEOUT_MS, phases=None, extraction=None):
+        """Rå listefelter for en side, eller None hvis siden ikke lot seg lese."""
+        phases = {} if phases is None else phases
+        extraction = _check_extraction(extraction or self.extraction)
+        url = LISTING_URL.format(page=page_num, page_size=per_page)
+        async with self.listing.page_for(url) as page:
+            t0 = time.perf_counter()
+            status = await self._open_listing(page, url, page_num, retries, timeout)
+            phases["liste"] = time.perf_counter() - t0
+            if status != LISTING_OK:
+                return None
+            t0 = time.perf_counter()
+            raw = await read_listing(page, extraction)
+            phases["parsing"] = time.perf_counter() - t0
+        print(f"[INFO] Fant {len(raw)} artikler på side {page_num}")
+        return raw
+
+    async def fetch_dates(self, page_num, per_page, retries=LISTING_RETRIES, timeout=LISTING_TIMEOUT_MS):
+        """
+        Bare datoteksten på en listeside (utils_page_locator). [] for en
+        tom side, None hvis siden ikke lot seg laste.
+        """
+        url = LISTING_URL.format(page=page_num, page_size=per_page)
+        async with self.listing.page_for(url) as page:
+            status = await self._open_listing(page, url, page_num, retries, timeout)
+            if status == LISTING_EMPTY:
+                return []
+            if status != LISTING_OK:
+                return None
+            return await page.eval_on_selector_all(DATE_SELECTOR, "els => els.map(e => e.textContent.trim())")
+
+    async def fetch_page(self, page_num, per_page, details=True, retries=LISTING_RETRIES,
+                         timeout=LISTING_TIMEOUT_MS, timings=None, extraction=None):
+        """
+        Henter én listeside og (med details=True) alle detaljsidene
+        parallelt. Returnerer dokumentene i felles format, eller None
+        hvis listesiden ikke lot seg lese. timings: PageTimings.
+        extraction: "batch"/"handles" (standard: motorens).
+        """
+        t_start = time.perf_counter()
+        phases = {}
+        try:
+            raw = await self.fetch_listing(page_num, per_page, retries, timeout, phases, extraction)
+            if raw is None:
+                return None
+            docs = [make_doc(r, page_num) for r in raw]
+            if details:
+                t0 = time.perf_counter()
+                await self.fill_files(docs, extraction=extraction)
+                phases["detaljer"] = time.perf_counter() - t0
+            return docs
+        finally:
+            phases["total"] = time.perf_counter() - t_start
+            if timings is not None:
+                timings.record(page_num, **phases)
+
+    # ---------------------------------------------------------
+    # Detaljsider
+    # ---------------------------------------------------------
+    async def hent_filer(self, dokid, link, timeout=DETAIL_TIMEOUT_MS, extraction=None):
+        """Filene på én detaljside, eller None hvis siden ikke lot seg åpne."""
+        extraction = _check_extraction(extraction or self.extraction)
+        try:
+            async with self.details.page_for(link) as dp:
+                await self._throttle()
+                if not await goto_fresh(dp, link, retries=1, timeout=timeout):
+                    return None
+                # Ferdig når en fil-lenke finnes, eller når siden har hentet data og er stille
+                await wait_for_settled(dp, FILE_LINK_SELECTOR, timeout=timeout)
+                return await read_files(dp, extraction)
+        except Exception as e:
+            print(f"[WARN] Klarte ikke hente filer for {dokid}: {e}")
+            return None
+
+    async def fill_files(self, docs, timeout=DETAIL_TIMEOUT_MS, extraction=None):
+        """Fyller inn filer/status for dokumentene (detaljsidene hentes parallelt)."""
+        med_link = [d for d in docs if d.get("detalj_link")]
+        resultater = await asyncio.gather(*[
+            self.hent_filer(d["dokumentID"], d["detalj_link"], timeout, extraction) for d in med_link
+        ])
+        for d, filer in zip(med_link, resultater):
+            set_files(d, filer or [])
+        return docs
+
+
+@asynccontextmanager
+async def open_engine(cfg=None, policy=None, **kwargs):
+    engine = await ScrapeEngine.launch(cfg, policy=policy, **kwargs)
+    try:
+        yield engine
+    finally:
+        await engine.close()
+
+
+class SyncEngine:
+    """
+    Blokkerende inngang til ScrapeEngine. Motoren kjører i en egen tråd
+    med egen event-loop; run() venter på en korutine der.
+
+    Scraperne er async; denne finnes bare for at tools/bench_scraper.py
+    kan måle den synkrone hent_side mot samme motor.
+    """
+
+    def __init__(self, cfg=None, policy=None, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        try:
+            self.engine = self.run(ScrapeEngine.launch(cfg, policy=policy, **kwargs))
+        except Exception:
+            self._stop()
+            raise
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch_page(self, *args, **kwargs):
+        return self.run(self.engine.fetch_page(*args, **kwargs))
+
+    def _stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def close(self):
+        try:
+            self.run(self.engine.close())
+        finally:
+            self._stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,134 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from scraper_core_async import GLOBAL_RATE_PER_SEC, open_scraping, close_scraping, scrape_pages
+from utils_concurrency import SharedRateLimiter
+from utils_spill import JOURNAL_NAME, SpillWriter, CheckpointJournal, done_pages_in
+
+# Flerprosess-skraping for scraper_dates.py ("processes" > 1 i config
+# eller --processes).
+#
+# Sidene deles i biter på chunk_pages sider som ligger i en felles kø.
+# Hver arbeidsprosess har sin egen nettleser og scrapingmotor, henter
+# neste bit fra køen til den er tom og skriver til egne spill-filer og
+# egen journal (data/spill/<kjøring>/w<NN>/). Alle prosessene deler én
+# takt for sideinnlastinger (global_rate_per_sec, SharedRateLimiter), så
+# samlet trykk mot nettstedet er begrenset uansett antall prosesser.
+#
+# Koordinatoren leser bare journalene til slutt: sider som ikke er
+# ferdige (også etter en krasjet arbeider) regnes som feilet, og
+# --resume henter dem på nytt. iter_spill slår sammen arbeidernes filer.
+
+DEFAULT_CHUNK_PAGES = 25
+
+# Satt av _init_worker i hver arbeidsprosess
+_chunks = None
+_rate_slot = None
+
+
+def plan_chunks(pages, chunk_pages=DEFAULT_CHUNK_PAGES):
+    """Deler sidelisten i sammenhengende biter (rekkefølgen beholdes)."""
+    size = max(1, int(chunk_pages))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+def default_processes():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def _init_worker(chunks, rate_slot):
+    global _chunks, _rate_slot
+    _chunks = chunks
+    _rate_slot = rate_slot
+
+
+async def _worker_async(worker_id, spill_dir, cfg, rate_per_sec, per_page, start_date, end_date):
+    directory = spill_dir / f"w{worker_id:02d}"
+    spill = SpillWriter(directory, batch_size=int(cfg.get("spill_batch_size", 500)))
+    journal = CheckpointJournal(directory / JOURNAL_NAME)
+    rate = SharedRateLimiter(rate_per_sec, _rate_slot)
+
+    limiter, engine, api_client = await open_scraping(cfg, rate=rate)
+    failed = []
+    chunks = 0
+    try:
+        while True:
+            # Blokkerende kø-lesing utenfor event-loopen, så motorens
+            # sider og tidsavbrudd går videre mens arbeideren venter
+            chunk = await asyncio.to_thread(_chunks.get)
+            if chunk is None:
+                break
+            chunks += 1
+            print(f"[INFO] (w{worker_id:02d}) Sider {chunk[0]}–{chunk[-1]} ({len(chunk)} sider)")
+            failed += await scrape_pages(
+                engine, limiter, api_client, chunk, per_page, start_date, end_date, spill, journal,
+            )
+    finally:
+        await close_scraping(engine, api_client)
+
+    print(f"[INFO] (w{worker_id:02d}) Ferdig: {chunks} biter, {spill.count} dokumenter, "
+          f"{len(failed)} feilede sider. {limiter.summary()}")
+    return {"worker": worker_id, "chunks": chunks, "docs": spill.count, "failed": failed}
+
+
+def _worker_main(worker_id, spill_dir, cfg, rate_per_sec, per_page, start_date, end_date):
+    return asyncio.run(
+        _worker_async(worker_id, spill_dir, cfg, rate_per_sec, per_page, start_date, end_date)
+    )
+
+
+def run_parallel(pages, spill_dir, cfg, processes, per_page, start_date, end_date):
+    """
+    Scraper sidene med `processes` arbeidsprosesser. Blokkerer til alle
+    er ferdige. Returnerer (antall dokumenter, feilede sider).
+    """
+    chunk_pages = int(cfg.get("chunk_pages", DEFAULT_CHUNK_PAGES))
+    rate_per_sec = float(cfg.get("global_rate_per_sec", GLOBAL_RATE_PER_SEC))
+    chunks = plan_chunks(pages, chunk_pages)
+    if not chunks:
+        return 0, []
+    processes = min(processes, len(chunks))
+
+    print(f"[INFO] Flerprosess: {len(pages)} sider i {len(chunks)} biter à {chunk_pages}, "
+          f"{processes} prosesser, felles takt {rate_per_sec:g} sider/s")
+
+    # spawn: hver arbeider starter en ren prosess med egen Playwright
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    for chunk in chunks:
+        queue.put(chunk)
+    for _ in range(processes):
+        queue.put(None)
+    rate_slot = SharedRateLimiter.new_slot(ctx)
+
+    count = 0
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(queue, rate_slot),
+        ) as pool:
+            futures = [
+                pool.submit(_worker_main, i, spill_dir, cfg, rate_per_sec, per_page, start_date, end_date)
+                for i in range(processes)
+            ]
+            for future in futures:
+                try:
+                    count += future.result()["docs"]
+                except Exception as e:
+                    print(f"[ERROR] Arbeidsprosess feilet: {e}")
+    finally:
+        # Biter som ble liggende i køen (etter en krasj) skal ikke holde
+        # prosessen igjen ved avslutning
+        queue.cancel_join_thread()
+        queue.close()
+
+    # Journalene er fasiten: alt som ikke er ferdig, også sider en
+    # krasjet arbeider ikke rakk, regnes som feilet
+    done = done_pages_in(spill_dir)
+    failed_pages = [pn for pn in pages if pn not in done]
+    return count, failed_pages
+
@@ -0,0 +1,154 @@
+import marshal
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from utils_files import read_docs
+
+# Felles leser for arkivfilene (data/archive/postliste_*.json / .plc).
+#
+# - Filer som ikke er i cachen parses i en prosesspool (én fil per jobb)
+#   og leveres som en strøm i filrekkefølge.
+# - Parsede dokumenter caches i <arkiv>/.cache/ med nøkkel (filnavn,
+#   mtime, størrelse). marshal er raskere å lese enn JSON, og cachen
+#   skrives bare lokalt (ikke commitet), så formatet kan være
+#   Python-versjonsavhengig.
+# - map_archive() cacher i tillegg resultatet av en funksjon per fil
+#   (f.eks. en verifisering), slik at en ny kjøring uten endringer bare
+#   leser små resultatfiler.
+
+CACHE_DIRNAME = ".cache"
+_PY_TAG = f"py{sys.version_info[0]}{sys.version_info[1]}"
+
+
+def default_workers(n_files):
+    return max(1, min(n_files, (os.cpu_count() or 2)))
+
+
+def _cache_dir(path):
+    return path.parent / CACHE_DIRNAME / _PY_TAG
+
+
+def _cache_path(path, tag):
+    st = path.stat()
+    return _cache_dir(path) / f"{path.name}.{st.st_mtime_ns}.{st.st_size}.{tag}"
+
+
+def _cache_load(path, tag):
+    try:
+        return marshal.loads(_cache_path(path, tag).read_bytes())
+    except (FileNotFoundError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _cache_store(path, tag, value):
+    target = _cache_path(path, tag)
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Fjern utdaterte oppføringer for samme fil og tag
+        for old in target.parent.glob(f"{path.name}.*.{tag}"):
+            if old != target:
+                old.unlink(missing_ok=True)
+        tmp = target.with_name(target.name + f".{os.getpid()}.tmp")
+        tmp.write_bytes(marshal.dumps(value))
+        tmp.replace(target)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Klarte ikke skrive arkiv-cache for {path.name}: {e}")
+
+
+def _load_docs(path, use_cache):
+    docs = _cache_load(path, "docs") if use_cache else None
+    if docs is None:
+        docs = read_docs(path)
+        if use_cache:
+            _cache_store(path, "docs", docs)
+    return docs
+
+
+def _docs_job(path, use_cache):
+    try:
+        return _load_docs(path, use_cache), None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+def _map_job(path, fn, tag, use_cache):
+    try:
+        result = fn(_load_docs(path, use_cache))
+        if use_cache:
+            _cache_store(path, tag, result)
+        return result, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _run(paths, job, args, cached, workers):
+    """Kjører job(path, *args) for filer uten cache-treff, i filrekkefølge."""
+    todo = [p for p in paths if p not in cached]
+    workers = default_workers(len(todo)) if workers is None else max(1, workers)
+
+    if len(todo) <= 1 or workers == 1:
+        results = (job(p, *args) for p in todo)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(job, todo, *[[a] * len(todo) for a in args])
+
+    try:
+        for p in paths:
+            if p in cached:
+                yield p, cached.pop(p), None
+            else:
+                value, error = next(results)
+                yield p, value, error
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def iter_archive(paths, workers=None, use_cache=True):
+    """
+    Gir (path, dokumenter) for hver fil, i samme rekkefølge som paths.
+    Filer som ikke kan leses gir en advarsel og en tom liste.
+    """
+    paths = [Path(p) for p in paths]
+    cached = {}
+    if use_cache:
+        for p in paths:
+            docs = _cache_load(p, "docs")
+            if docs is not None:
+                cached[p] = docs
+
+    for p, docs, error in _run(paths, _docs_job, (use_cache,), cached, workers):
+        if error:
+            print(f"[WARN] Klarte ikke å lese {p}: {error}")
+        yield p, docs
+
+
+def iter_archive_docs(paths, workers=None, use_cache=True):
+    """Som iter_archive, men gir dokumentene ett og ett."""
+    for _path, docs in iter_archive(paths, workers, use_cache):
+        yield from docs
+
+
+def map_archive(paths, fn, version=1, workers=None, use_cache=True):
+    """
+    Gir (path, fn(dokumenter)) for hver fil. fn må være en funksjon på
+    modulnivå og returnere enkle verdier (dict/list/str/tall/None).
+    Resultatet caches per fil; øk version når fn endres.
+    Filer som feiler gir (path, None) og en advarsel.
+    """
+    paths = [Path(p) for p in paths]
+    tag = f"{fn.__module__}.{fn.__qualname__}.v{version}"
+    cached = {}
+    if use_cache:
+        for p in paths:
+            result = _cache_load(p, tag)
+            if result is not None:
+                cached[p] = result
+
+    for p, result, error in _run(paths, _map_job, (fn, tag, use_cache), cached, workers):
+        if error:
+            print(f"[WARN] Klarte ikke å lese {p}: {error}")
+        yield p, result
@@ -0,0 +1,224 @@
+import json
+from collections import Counter
+from datetime import date, datetime
+
+from utils_files import CHANGES_DIR, _load_changes_manifest, load_changes
+
+# Ferdig aggregert endringsoversikt for web/endringer.html.
+#
+# Dashboardet laster bare data/changes/rollup.json (noen titalls kB) i
+# stedet for hele endringsloggen og alle shards. Filen oppdateres av
+# scraperne ved lagring, kun med de nye hendelsene fra kjøringen:
+#
+#   per_dag      {dato: {NEW, UPDATE, filer, status}}  siste ROLLUP_DAYS dager
+#   per_uke      {"YYYY-Www": {NEW, UPDATE}}          siste ROLLUP_WEEKS uker
+#   per_maned    {"YYYY-MM": {NEW, UPDATE, felt, typer, overganger}}
+#                                                     siste ROLLUP_MONTHS måneder
+#   siste        {NEW: [...], UPDATE: [...]}          nyeste ROLLUP_LATEST hendelser
+#   siste_filer  [...]                                nyeste hendelser med nye filer
+#   mest_endret  [[dokumentID, tittel, antall], ...]  innenfor per_maned-vinduet
+#
+# Tellere per dokument (for mest_endret) ligger i rollup_docs.json.
+# Stemmer ikke antall med manifestet for loggen, bygges oversikten på
+# nytt fra segmentene.
+
+ROLLUP_FILE = CHANGES_DIR / "rollup.json"
+ROLLUP_DOCS_FILE = CHANGES_DIR / "rollup_docs.json"
+
+ROLLUP_DAYS = 400
+ROLLUP_WEEKS = 260
+ROLLUP_MONTHS = 12
+ROLLUP_LATEST = 50
+ROLLUP_TOP = 20
+
+UNKNOWN = "Ukjent"
+
+
+def _week(day):
+    y, w, _ = date.fromisoformat(day).isocalendar()
+    return f"{y}-W{w:02d}"
+
+
+def _keep_last(d, n):
+    for k in sorted(d)[:-n]:
+        del d[k]
+
+
+def _read(path):
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return None
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+def changes_total():
+    """Antall hendelser i loggen ifølge manifestet."""
+    manifest = _load_changes_manifest() or {}
+    return sum(s.get("count", 0) for s in manifest.get("segments", []))
+
+
+class ChangeRollup:
+    def __init__(self, path=ROLLUP_FILE, docs_path=ROLLUP_DOCS_FILE, fresh=False):
+        self.path = path
+        self.docs_path = docs_path
+        self.data = None if fresh else _read(path)
+        self.doc_counts = (None if fresh else _read(docs_path)) or {}
+        if self.data is None:
+            self.data = {
+                "antall": 0,
+                "per_dag": {},
+                "per_uke": {},
+                "per_maned": {},
+                "siste": {"NEW": [], "UPDATE": []},
+                "siste_filer": [],
+            }
+
+    def add(self, change, doc_type=None):
+        self.data["antall"] += 1
+        ts = change.get("tidspunkt") or ""
+        day = ts[:10]
+        try:
+            week = _week(day)
+        except ValueError:
+            return
+        kind = change.get("type") or UNKNOWN
+        fields = change.get("endringer") or {}
+        d = self.data
+
+        files = fields.get("filer_count") or {}
+        new_files = (files.get("ny") or 0) > (files.get("gammel") or 0)
+        status = fields.get("status") if kind == "UPDATE" else None
+
+        per_day = d["per_dag"].setdefault(day, {})
+        per_day[kind] = per_day.get(kind, 0) + 1
+        if new_files:
+            per_day["filer"] = per_day.get("filer", 0) + 1
+        if status:
+            per_day["status"] = per_day.get("status", 0) + 1
+
+        per_week = d["per_uke"].setdefault(week, {})
+        per_week[kind] = per_week.get(kind, 0) + 1
+
+        month = d["per_maned"].setdefault(day[:7], {"felt": {}, "typer": {}, "overganger": {}})
+        month[kind] = month.get(kind, 0) + 1
+        for f in fields:
+            month["felt"][f] = month["felt"].get(f, 0) + 1
+        t = doc_type or UNKNOWN
+        month["typer"][t] = month["typer"].get(t, 0) + 1
+        if status:
+            key = f"{status.get('gammel') or UNKNOWN} → {status.get('ny') or UNKNOWN}"
+            month["overganger"][key] = month["overganger"].get(key, 0) + 1
+
+        d["siste"].setdefault(kind, []).append(change)
+        if new_files:
+            d["siste_filer"].append(change)
+
+        did = change.get("dokumentID")
+        if did:
+            counts = self.doc_counts.setdefault(day[:7], {})
+            n, _title = counts.get(did, (0, None))
+            counts[did] = [n + 1, change.get("tittel")]
+
+    def _trim(self):
+        d = self.data
+        _keep_last(d["per_dag"], ROLLUP_DAYS)
+        _keep_last(d["per_uke"], ROLLUP_WEEKS)
+        _keep_last(d["per_maned"], ROLLUP_MONTHS)
+        _keep_last(self.doc_counts, ROLLUP_MONTHS)
+
+        def newest(events):
+            return sorted(events, key=lambda c: c.get("tidspunkt") or "", reverse=True)[:ROLLUP_LATEST]
+
+        d["siste"] = {k: newest(v) for k, v in d["siste"].items()}
+        d["siste_filer"] = newest(d["siste_filer"])
+
+        totals = Counter()
+        titles = {}
+        for month in sorted(self.doc_counts):
+            for did, (n, title) in self.doc_counts[month].items():
+                totals[did] += n
+                titles[did] = title or titles.get(did)
+        d["mest_endret"] = [[did, titles.get(did), n] for did, n in totals.most_common(ROLLUP_TOP)]
+
+    def save(self):
+        self._trim()
+        self.data["oppdatert"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _write(self.docs_path, self.doc_counts)
+        _write(self.path, self.data)
+
+
+class _DocTypes:
+    """dokumenttype for en hendelse: fra kjøringens dokumenter, hendelsen selv eller shardene."""
+
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+        self.lookup = None
+
+    def __call__(self, change):
+        did = change.get("dokumentID")
+        doc = self.docs.get(did)
+        if doc is None:
+            new_type = ((change.get("endringer") or {}).get("dokumenttype") or {}).get("ny")
+            if new_type:
+                return new_type
+            if self.lookup is None:
+                from utils_shards import ShardDocLookup
+                self.lookup = ShardDocLookup()
+            doc = self.lookup.get(did)
+        return (doc or {}).get("dokumenttype") or UNKNOWN
+
+    def close(self):
+        if self.lookup is not None:
+            self.lookup.close()
+
+
+def rebuild_change_rollup(docs=None):
+    """Bygger oversikten fra endringsloggen (de siste ROLLUP_WEEKS ukene)."""
+    manifest = _load_changes_manifest() or {}
+    months = [s["month"] for s in manifest.get("segments", [])][-(ROLLUP_WEEKS // 4 + 2):]
+    rollup = ChangeRollup(fresh=True)
+    doc_type = _DocTypes(docs)
+    for c in sorted(load_changes(months), key=lambda c: c.get("tidspunkt") or ""):
+        rollup.add(c, doc_type(c))
+    doc_type.close()
+    rollup.data["antall"] = changes_total()
+    rollup.save()
+    print(f"[INFO] Bygget endringsoversikt fra loggen ({rollup.data['antall']} hendelser).")
+
+
+def update_change_rollup(new_changes, docs=None):
+    """
+    Legger nye hendelser (allerede skrevet med append_changes) til
+    oversikten. docs: {dokumentID: dokument} fra kjøringen, for dokumenttype.
+    """
+    rollup = ChangeRollup()
+    if rollup.data["antall"] + len(new_changes) != changes_total():
+        print("[INFO] Endringsoversikten er ute av takt med loggen – bygger på nytt.")
+        rebuild_change_rollup(docs)
+        return
+
+    if not new_changes:
+        return
+
+    doc_type = _DocTypes(docs)
+    for c in new_changes:
+        rollup.add(c, doc_type(c))
+    doc_type.close()
+    rollup.save()
+    print(f"[INFO] Oppdaterte endringsoversikten med {len(new_changes)} hendelser.")
+
+
+if __name__ == "__main__":
+    # Manuell ombygging: python utils_change_rollup.py (fra src/scrapers)
+    rebuild_change_rollup()
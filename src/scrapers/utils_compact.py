@@ -0,0 +1,197 @@
+import json
+import lzma
+import os
+import zlib
+
+# Kompakt lagringsformat for postliste-dokumenter (.plc).
+#
+# Dokumentene lagres kolonnevis i stedet for som én JSON-oppføring per
+# dokument:
+#   - Hvert felt blir en kolonne med verdiene i dokumentrekkefølge.
+#   - Nøkkelrekkefølgen per dokument lagres som et lite "skjema"-oppslag,
+#     slik at manglende felt og feltrekkefølge gjenskapes nøyaktig.
+#   - Kategoriske felt (dokumenttype, status, dato …) ordbokkodes:
+#     hver unike verdi lagres én gang, dokumentene får en heltallskode.
+#   - URL-er (journal_link, detalj_link, filer[].url) lagres uten felles
+#     prefiks per vert.
+#   - Lister av objekter (filer) kodes rekursivt på samme måte.
+# Resultatet serialiseres som kompakt JSON og komprimeres (zlib/lzma).
+#
+# Filformat: b"PLC1" + 1 byte komprimering (z/x/-) + komprimert JSON.
+# decode_docs(encode_docs(docs)) == docs, inkludert nøkkelrekkefølge og typer.
+
+MAGIC = b"PLC1"
+
+COMPRESSIONS = {
+    "zlib": (b"z", lambda b: zlib.compress(b, 6), zlib.decompress),
+    "lzma": (b"x", lambda b: lzma.compress(b, preset=6), lzma.decompress),
+    "none": (b"-", lambda b: b, lambda b: b),
+}
+_BY_TAG = {tag: dec for tag, _enc, dec in COMPRESSIONS.values()}
+
+
+# ------------------------------------------------------------------
+#  Kolonnekoding
+# ------------------------------------------------------------------
+
+def _is_scalar(v):
+    return v is None or isinstance(v, (str, int, float, bool))
+
+
+def _url_host(s):
+    if not s.startswith(("http://", "https://")):
+        return None
+    end = s.find("/", s.find("//") + 2)
+    return s if end < 0 else s[:end]
+
+
+def _encode_prefixed(values):
+    """Stripper felles prefiks per vert. Kode -1: ingen prefiks."""
+    groups = {}
+    for s in values:
+        host = _url_host(s)
+        if host is not None:
+            groups.setdefault(host, []).append(s)
+
+    prefixes = []
+    by_host = {}
+    for host, members in groups.items():
+        if len(members) < 2:
+            continue
+        prefix = os.path.commonprefix(members)
+        by_host[host] = (len(prefixes), len(prefix))
+        prefixes.append(prefix)
+
+    codes, rest = [], []
+    for s in values:
+        hit = by_host.get(_url_host(s))
+        if hit is None:
+            codes.append(-1)
+            rest.append(s)
+        else:
+            codes.append(hit[0])
+            rest.append(s[hit[1]:])
+    return {"enc": "prefix", "prefixes": prefixes, "codes": codes, "rest": rest}
+
+
+def _encode_dict(values):
+    table, index, codes = [], {}, []
+    for v in values:
+        # Typen er med i nøkkelen: 1, 1.0 og True er like som dict-nøkler
+        key = (type(v).__name__, v)
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(table)
+            table.append(v)
+        codes.append(code)
+    return {"enc": "dict", "values": table, "codes": codes}
+
+
+def _encode_column(values):
+    if values and all(isinstance(v, list) and all(isinstance(x, dict) for x in v) for v in values):
+        flat = [x for v in values for x in v]
+        return {"enc": "nested", "lengths": [len(v) for v in values], "block": _encode_records(flat)}
+
+    if values and all(isinstance(v, str) for v in values):
+        urls = sum(1 for v in values if _url_host(v) is not None)
+        if urls * 2 >= len(values):
+            return _encode_prefixed(values)
+
+    if values and all(_is_scalar(v) for v in values):
+        distinct = len({(type(v).__name__, v) for v in values})
+        if distinct * 2 <= len(values):
+            return _encode_dict(values)
+
+    return {"enc": "raw", "values": values}
+
+
+def _decode_column(col):
+    enc = col["enc"]
+    if enc == "raw":
+        return col["values"]
+    if enc == "dict":
+        return list(map(col["values"].__getitem__, col["codes"]))
+    if enc == "prefix":
+        prefixes = col["prefixes"]
+        return [r if c < 0 else prefixes[c] + r for c, r in zip(col["codes"], col["rest"])]
+    if enc == "nested":
+        flat = _decode_records(col["block"])
+        out, pos = [], 0
+        for n in col["lengths"]:
+            out.append(flat[pos:pos + n])
+            pos += n
+        return out
+    raise ValueError(f"Ukjent kolonnekoding: {enc}")
+
+
+def _encode_records(records):
+    schemas, schema_ids, schema_codes = [], {}, []
+    columns = {}
+    for r in records:
+        keys = tuple(r)
+        sid = schema_ids.get(keys)
+        if sid is None:
+            sid = schema_ids[keys] = len(schemas)
+            schemas.append(list(keys))
+        schema_codes.append(sid)
+        for k, v in r.items():
+            columns.setdefault(k, []).append(v)
+
+    return {
+        "schemas": schemas,
+        "schema": schema_codes,
+        "columns": {k: _encode_column(vals) for k, vals in columns.items()},
+    }
+
+
+def _decode_records(block):
+    # Antall poster er lengden av skjemakodene, ikke kolonnene: poster
+    # uten felt ({}) har ingen kolonneverdier
+    count = len(block["schema"])
+    if len(block["schemas"]) == 1:
+        # Vanligste tilfelle: alle dokumentene har samme felt
+        keys = block["schemas"][0]
+        if not keys:
+            return [{} for _ in range(count)]
+        cols = [_decode_column(block["columns"][k]) for k in keys]
+        return [dict(zip(keys, row)) for row in zip(*cols)]
+
+    cols = {k: iter(_decode_column(c)) for k, c in block["columns"].items()}
+    schemas = [[(k, cols[k]) for k in keys] for keys in block["schemas"]]
+    return [{k: next(it) for k, it in schemas[sid]} for sid in block["schema"]]
+
+
+# ------------------------------------------------------------------
+#  Offentlig API
+# ------------------------------------------------------------------
+
+def encode_docs(docs):
+    """Liste med dokumenter (dict) -> .plc-innhold uten komprimering."""
+    return {"format": "postliste-compact", "version": 1, "count": len(docs), **_encode_records(docs)}
+
+
+def decode_docs(block):
+    if block.get("format") != "postliste-compact" or block.get("version") != 1:
+        raise ValueError("Ukjent kompaktformat")
+    docs = _decode_records(block)
+    if len(docs) != block.get("count"):
+        raise ValueError(f"Kompaktformat: {len(docs)} dokumenter, ventet {block.get('count')}")
+    return docs
+
+
+def dumps_compact(docs, compression="zlib"):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Ukjent komprimering: {compression} (gyldige: {', '.join(COMPRESSIONS)})")
+    tag, compress, _dec = COMPRESSIONS[compression]
+    raw = json.dumps(encode_docs(list(docs)), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return MAGIC + tag + compress(raw)
+
+
+def loads_compact(data):
+    if data[:4] != MAGIC or data[4:5] not in _BY_TAG:
+        raise ValueError("Ikke en .plc-fil")
+    return decode_docs(json.loads(_BY_TAG[data[4:5]](data[5:])))
+
+
+def is_compact_bytes(head):
+    return head[:4] == MAGIC
@@ -1,4 +1,9 @@
+import asyncio
 import os
+import time
+from collections import deque
+from urllib.parse import urlparse
+
 
 def compute_concurrency(min_workers=2, max_workers=6):
     """
@@ -7,3 +12,196 @@ def compute_concurrency(min_workers=2, max_workers=6):
     """
     cpu = os.cpu_count() or 2
     return min(max_workers, max(min_workers, cpu - 1))
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * 95 // 100) - 1)]
+
+
+class AdaptiveLimiter:
+    """
+    AIMD-styrt concurrency-grense som brukes som en semafor
+    (`async with limiter:`).
+
+    - Additiv økning: +1 etter en full runde (limit fullførte sider) uten
+      feil og med p95-latens under target_latency.
+    - Multiplikativ reduksjon: limit * decrease ved feil, timeouts eller
+      429/5xx-svar fra nettstedet, og når p95 går over target_latency.
+    - Latens fra sider som startet før forrige justering ignoreres, og
+      etter en reduksjon ignoreres nye feilsignaler i target_latency
+      sekunder (omtrent én side), slik at én feilbølge ikke halverer
+      grensen flere ganger.
+
+    min_limit == max_limit gir en vanlig, statisk semafor.
+    """
+
+    def __init__(self, min_limit=2, max_limit=12, initial=None, target_latency=20.0,
+                 decrease=0.5, window=20, min_samples=5):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        start = initial if initial is not None else self.min_limit
+        self.limit = min(self.max_limit, max(self.min_limit, int(start)))
+        self.target_latency = float(target_latency)
+        self.decrease = float(decrease)
+        self.min_samples = min_samples
+
+        self._latencies = deque(maxlen=window)
+        self._inflight = 0
+        self._cond = asyncio.Condition()
+        self._since_change = 0
+        self._cooldown_until = 0.0
+        self._changed_at = 0.0
+        self.adjustments = []
+
+    @classmethod
+    def from_config(cls, cfg, initial=None):
+        if not cfg.get("adaptive_concurrency", True):
+            fixed = int(cfg.get("concurrency", initial or compute_concurrency()))
+            return cls(min_limit=fixed, max_limit=fixed, initial=fixed)
+        return cls(
+            min_limit=int(cfg.get("concurrency_min", 2)),
+            max_limit=int(cfg.get("concurrency_max", 12)),
+            initial=int(cfg.get("concurrency", initial or compute_concurrency())),
+            target_latency=float(cfg.get("target_page_seconds", 20.0)),
+        )
+
+    @property
+    def adaptive(self):
+        return self.min_limit != self.max_limit
+
+    # --------------------------------------------------------------
+    #  Semafor
+    # --------------------------------------------------------------
+
+    async def acquire(self):
+        async with self._cond:
+            while self._inflight >= self.limit:
+                await self._cond.wait()
+            self._inflight += 1
+
+    async def release(self):
+        async with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.release()
+
+    # --------------------------------------------------------------
+    #  Signaler
+    # --------------------------------------------------------------
+
+    def _set_limit(self, new, reason):
+        new = min(self.max_limit, max(self.min_limit, new))
+        if new == self.limit:
+            return
+        print(f"[INFO] Concurrency {self.limit} → {new} ({reason})")
+        self.adjustments.append((time.time(), self.limit, new, reason))
+        if new < self.limit:
+            self._cooldown_until = time.monotonic() + self.target_latency
+        self.limit = new
+        self._since_change = 0
+        self._changed_at = time.monotonic()
+        self._latencies.clear()
+        # Vekk ventende arbeidere når grensen økes
+        asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._cond:
+            self._cond.notify_all()
+
+    def record_success(self, latency):
+        """Registrerer en fullført side med latens i sekunder."""
+        if not self.adaptive:
+            return
+        if time.monotonic() - latency < self._changed_at:
+            # Siden startet under forrige grense og sier lite om den nye
+            return
+        self._latencies.append(latency)
+        self._since_change += 1
+        if len(self._latencies) < self.min_samples:
+            return
+
+        p95 = _p95(self._latencies)
+        if p95 > self.target_latency:
+            self._set_limit(int(self.limit * self.decrease), f"p95 {p95:.1f}s > {self.target_latency:.1f}s")
+        elif self._since_change >= self.limit:
+            self._set_limit(self.limit + 1, f"p95 {p95:.1f}s ≤ {self.target_latency:.1f}s")
+
+    def record_error(self, reason):
+        """Registrerer feil/timeout/429/5xx. Gir multiplikativ reduksjon."""
+        if not self.adaptive or time.monotonic() < self._cooldown_until:
+            return
+        self._set_limit(int(self.limit * self.decrease), reason)
+
+    def watch_responses(self, context, host):
+        """
+        Lytter på alle svar i en Playwright-context (også SPA-ens egne
+        API-kall) og reduserer ved 429/5xx fra nettstedet.
+        """
+        def on_response(response):
+            status = response.status
+            if (status == 429 or status >= 500) and urlparse(response.url).netloc == host:
+                self.record_error(f"HTTP {status}")
+
+        context.on("response", on_response)
+
+    def summary(self):
+        ups = sum(1 for _t, old, new, _r in self.adjustments if new > old)
+        downs = len(self.adjustments) - ups
+        return f"concurrency {self.limit} (min {self.min_limit}, maks {self.max_limit}), {ups} opp / {downs} ned"
+
+
+class RateLimiter:
+    """
+    Enkel takt-begrensning: maks rate_per_sec starter per sekund, uansett
+    hvor mange arbeidere som venter (`await limiter.wait()`).
+    """
+
+    def __init__(self, rate_per_sec=1.0):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class SharedRateLimiter:
+    """
+    RateLimiter delt mellom prosesser (scraper_parallel.py): neste ledige
+    starttid ligger i delt minne, så maks rate_per_sec starter per sekund
+    gjelder samlet for alle arbeidsprosessene.
+
+    slot er en multiprocessing.Value("d") fra new_slot(); den gis til
+    arbeidsprosessene ved oppstart (initargs), ikke per oppgave.
+    """
+
+    def __init__(self, rate_per_sec, slot):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self.slot = slot
+
+    @staticmethod
+    def new_slot(mp_context):
+        return mp_context.Value("d", 0.0)
+
+    async def wait(self):
+        if not self.interval:
+            return
+        # Veggklokke: samme tidslinje i alle prosessene
+        with self.slot.get_lock():
+            now = time.time()
+            delay = self.slot.value - now
+            self.slot.value = max(now, self.slot.value) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,144 @@
+import json
+from datetime import date, datetime, timedelta
+
+from utils_files import DATA_DIR
+
+# Kø for detalj-backfill (fase to i listing-only-modus).
+#
+# scraper.py med "detail_mode": "deferred" henter bare listesidene og
+# legger nye dokumenter (som trenger detaljsiden) her. scraper_details.py
+# tømmer køen i sitt eget tempo og fyller inn filer/status. Ny sjekk av
+# kjente dokumenter som står som "Må bes om innsyn" er utils_revisit.py
+# sin jobb.
+#
+# Ventende dokumenter lagres uten status, med detalj_status "venter".
+# Statusen settes først av backfillen, og regnes som en del av
+# NEW-hendelsen, ikke som en endring.
+#
+# Oppføringer fjernes bare når detaljsiden er hentet. Revisit-planen
+# hopper over ventende dokumenter, så køen er det eneste som henter dem:
+# etter en feil venter oppføringen 1, 2, 4 … dager (maks
+# RETRY_MAX_DAYS) før neste forsøk, i stedet for å bli forkastet.
+#
+# Filformat (data/detail_queue.json):
+#   {dokumentID: {"link": ..., "prioritet": 0, "lagt_til": iso, "forsøk": n,
+#                 "neste": "YYYY-MM-DD" (bare etter feil)}}
+
+DETAIL_QUEUE_FILE = DATA_DIR / "detail_queue.json"
+
+# Markør på dokumenter som ennå ikke har fått detaljsiden hentet
+DETAIL_STATUS_KEY = "detalj_status"
+DETAIL_PENDING = "venter"
+
+PRIORITY_NEW = 0  # nye dokumenter uten detaljer
+
+# Back-off etter mislykkede forsøk
+RETRY_BASE_DAYS = 1
+RETRY_MAX_DAYS = 30
+
+
+def doc_link(doc):
+    return doc.get("detalj_link") or doc.get("journal_link") or ""
+
+
+def is_pending(doc):
+    return bool(doc) and doc.get(DETAIL_STATUS_KEY) == DETAIL_PENDING
+
+
+class DetailQueue:
+    """Persistent prioritetskø over dokumenter som venter på detaljsiden."""
+
+    def __init__(self, path=DETAIL_QUEUE_FILE):
+        self.path = path
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {self.path}: {e}")
+            return {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, did):
+        return did in self.entries
+
+    def add(self, doc, priority):
+        """Legger til (eller oppgraderer prioriteten til) et dokument."""
+        did = doc["dokumentID"]
+        link = doc_link(doc)
+        if not link:
+            return
+        cur = self.entries.get(did)
+        if cur is None:
+            self.entries[did] = {
+                "link": link,
+                "prioritet": priority,
+                "dato_iso": doc.get("dato_iso"),
+                "lagt_til": datetime.now().isoformat(timespec="seconds"),
+                "forsøk": 0,
+            }
+        else:
+            cur["link"] = link
+            cur["prioritet"] = min(cur["prioritet"], priority)
+
+    def take(self, n, today=None):
+        """
+        De n viktigste av oppføringene som er klare (ikke i back-off):
+        lavest prioritet først, deretter nyeste dokumentdato.
+        """
+        today = (today or date.today()).isoformat()
+        ready = [(did, e) for did, e in self.entries.items() if (e.get("neste") or "") <= today]
+        ready.sort(key=lambda kv: (kv[1]["prioritet"], -_date_ord(kv[1].get("dato_iso"))))
+        return ready[:n]
+
+    def done(self, did):
+        self.entries.pop(did, None)
+
+    def failed(self, did, today=None):
+        """Teller et mislykket forsøk og utsetter neste med økende back-off."""
+        entry = self.entries.get(did)
+        if entry is None:
+            return
+        entry["forsøk"] = entry.get("forsøk", 0) + 1
+        days = min(RETRY_MAX_DAYS, RETRY_BASE_DAYS * 2 ** (entry["forsøk"] - 1))
+        entry["neste"] = ((today or date.today()) + timedelta(days=days)).isoformat()
+        if days == RETRY_MAX_DAYS:
+            print(f"[WARN] Detaljer for {did} har feilet {entry['forsøk']} ganger – prøver igjen om {days} dager.")
+
+
+def _date_ord(iso):
+    try:
+        return datetime.fromisoformat(iso).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def apply_listing_only(doc, old, queue):
+    """
+    Forbereder et dokument hentet uten detaljside (details=False).
+
+    - Kjent dokument med detaljer: filer/status beholdes fra forrige
+      versjon, slik at endringsdeteksjonen bare ser på listefeltene.
+    - Nytt dokument (eller fortsatt ventende): merkes "venter", får ingen
+      status (den er ukjent til detaljsiden er hentet) og køes.
+    """
+    if old and not is_pending(old):
+        doc["filer"] = old.get("filer", [])
+        doc["status"] = old.get("status")
+    else:
+        doc["filer"] = []
+        doc.pop("status", None)
+        doc[DETAIL_STATUS_KEY] = DETAIL_PENDING
+        queue.add(doc, PRIORITY_NEW)
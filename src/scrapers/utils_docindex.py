@@ -0,0 +1,293 @@
+import hashlib
+import json
+import mmap
+import struct
+
+from utils_files import DATA_DIR, list_shard_paths
+from utils_jsonstream import iter_json_array_spans
+
+# Kompakt binærindeks dokumentID → (shard, byte-offset, lengde).
+#
+# Brukes for raske medlemssjekker og oppslag av enkeltdokumenter uten å
+# parse hele shard-filer. Filen mmappes og slås opp med binærsøk.
+#
+# Format (little-endian):
+#   header:      b"PLDX", u16 versjon, u16 antall shards, u32 antall poster
+#   shard-tabell: per shard u16 navnelengde, navn (utf-8), u64 filstørrelse
+#   poster:      sortert på nøkkel, "<QHII" = (nøkkel, shard-nr, offset, lengde)
+#
+# Nøkkelen er de første 8 bytene av sha1(dokumentID). Ved lesing av
+# dokumentet sjekkes dokumentID, så en eventuell kollisjon gir aldri feil
+# dokument.
+#
+# Filen ligger ikke i git (.gitignore): sortert på hash endres den over
+# alt ved hver skriving. ensure_doc_index/update_doc_index bygger den fra
+# shardene når den mangler, f.eks. i en ny CI-kjøring.
+
+DOCINDEX_FILE = DATA_DIR / "postliste_docindex.bin"
+
+_MAGIC = b"PLDX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+_NAME_LEN = struct.Struct("<H")
+_FILE_SIZE = struct.Struct("<Q")
+_RECORD = struct.Struct("<QHII")
+
+
+def doc_key(did):
+    return int.from_bytes(hashlib.sha1(did.encode("utf-8")).digest()[:8], "little")
+
+
+def scan_shard_locations(path):
+    """
+    Finner byte-posisjonen til hvert element i en eksisterende shard-fil.
+    Returnerer [(dokumentID, offset, lengde), ...].
+    """
+    return [
+        (obj["dokumentID"], offset, nbytes)
+        for obj, offset, nbytes in iter_json_array_spans(path)
+        if isinstance(obj, dict) and obj.get("dokumentID")
+    ]
+
+
+def _file_size(name):
+    p = DATA_DIR / name
+    return p.stat().st_size if p.exists() else 0
+
+
+def write_doc_index(shard_locs):
+    """
+    Skriver indeksen atomisk. shard_locs er [(shardnavn, [(dokumentID,
+    offset, lengde), ...]), ...] i shard-rekkefølge. I stedet for
+    dokumentID kan ferdig nøkkel (int) oppgis.
+    """
+    names = [name for name, _locs in shard_locs]
+    records = []
+    for shard_no, (_name, locs) in enumerate(shard_locs):
+        for did, offset, length in locs:
+            if isinstance(did, int):
+                records.append((did, shard_no, offset, length))
+            elif did:
+                records.append((doc_key(did), shard_no, offset, length))
+    records.sort()
+
+    parts = [_HEADER.pack(_MAGIC, _VERSION, len(names), len(records))]
+    for name in names:
+        encoded = name.encode("utf-8")
+        parts.append(_NAME_LEN.pack(len(encoded)))
+        parts.append(encoded)
+        parts.append(_FILE_SIZE.pack(_file_size(name)))
+    parts.extend(_RECORD.pack(*r) for r in records)
+
+    DOCINDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = DOCINDEX_FILE.with_suffix(".tmp")
+    tmp.write_bytes(b"".join(parts))
+    tmp.replace(DOCINDEX_FILE)
+    print(f"[INFO] Skrev dokumentindeks med {len(records)} poster for {len(names)} shards.")
+
+
+def build_doc_index():
+    """Bygger indeksen fra alle shards (full skanning)."""
+    print("[INFO] Bygger dokumentindeks fra shards…")
+    shard_locs = []
+    for p in list_shard_paths():
+        if not p.exists():
+            continue
+        try:
+            shard_locs.append((p.name, scan_shard_locations(p)))
+        except Exception as e:
+            print(f"[WARN] Klarte ikke indeksere {p}: {e}")
+    write_doc_index(shard_locs)
+
+
+def update_doc_index(names, rewritten):
+    """
+    Oppdaterer indeksen etter at et utvalg shards er skrevet.
+    names er alle shardnavn i rekkefølge, rewritten er {navn: locations}
+    for shardene som ble skrevet. Poster for uberørte shards gjenbrukes;
+    mangler de eller er utdatert, bygges hele indeksen på nytt.
+    """
+    old = DocIndex.open()
+    try:
+        kept = {}
+        if old is not None:
+            for name in names:
+                if name in rewritten:
+                    continue
+                if not old.is_current(name):
+                    old.close()
+                    old = None
+                    break
+            if old is not None:
+                kept = old.locations_by_shard()
+
+        if old is None:
+            build_doc_index()
+            return
+
+        shard_locs = []
+        for name in names:
+            if name in rewritten:
+                shard_locs.append((name, rewritten[name]))
+            else:
+                shard_locs.append((name, kept.get(name, [])))
+    finally:
+        if old is not None:
+            old.close()
+
+    write_doc_index(shard_locs)
+
+
+class DocIndex:
+    """
+    Oppslag i postliste_docindex.bin via mmap. Bruk DocIndex.open() eller
+    ensure_doc_index(); husk close() (eller with-blokk).
+    """
+
+    def __init__(self, path=DOCINDEX_FILE):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._shard_files = {}
+
+        magic, version, nshards, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"Ukjent format i {path}")
+
+        pos = _HEADER.size
+        self.shards = []
+        for _ in range(nshards):
+            (ln,) = _NAME_LEN.unpack_from(self._mm, pos)
+            pos += _NAME_LEN.size
+            name = self._mm[pos:pos + ln].decode("utf-8")
+            pos += ln
+            (size,) = _FILE_SIZE.unpack_from(self._mm, pos)
+            pos += _FILE_SIZE.size
+            self.shards.append((name, size))
+
+        self.count = count
+        self._records_at = pos
+        if pos + count * _RECORD.size > len(self._mm):
+            self.close()
+            raise ValueError(f"Avkuttet dokumentindeks {path}")
+
+    @classmethod
+    def open(cls, path=DOCINDEX_FILE):
+        """Returnerer DocIndex, eller None hvis filen mangler eller er ugyldig."""
+        if not path.exists() or path.stat().st_size < _HEADER.size:
+            return None
+        try:
+            return cls(path)
+        except Exception as e:
+            print(f"[WARN] Klarte ikke åpne dokumentindeks: {e}")
+            return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for f in self._shard_files.values():
+            f.close()
+        self._shard_files = {}
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --------------------------------------------------------------
+    #  Validering
+    # --------------------------------------------------------------
+
+    def is_current(self, name):
+        """Sann hvis shard-en finnes i indeksen med samme filstørrelse som på disk."""
+        for shard_name, size in self.shards:
+            if shard_name == name:
+                return size == _file_size(name)
+        return False
+
+    def matches_disk(self):
+        names = [p.name for p in list_shard_paths() if p.exists()]
+        return [n for n, _s in self.shards] == names and all(self.is_current(n) for n in names)
+
+    # --------------------------------------------------------------
+    #  Oppslag
+    # --------------------------------------------------------------
+
+    def _record(self, i):
+        return _RECORD.unpack_from(self._mm, self._records_at + i * _RECORD.size)
+
+    def _first_at_or_after(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _candidates(self, did):
+        key = doc_key(did)
+        i = self._first_at_or_after(key)
+        while i < self.count:
+            rec = self._record(i)
+            if rec[0] != key:
+                break
+            yield rec
+            i += 1
+
+    def __contains__(self, did):
+        return next(self._candidates(did), None) is not None
+
+    def locate(self, did):
+        """Returnerer (shardnavn, offset, lengde) eller None."""
+        for _key, shard_no, offset, length in self._candidates(did):
+            return self.shards[shard_no][0], offset, length
+        return None
+
+    def _read_at(self, name, offset, length):
+        f = self._shard_files.get(name)
+        if f is None:
+            f = open(DATA_DIR / name, "rb")
+            self._shard_files[name] = f
+        f.seek(offset)
+        return json.loads(f.read(length).decode("utf-8"))
+
+    def read_doc(self, did, default=None):
+        """Leser ett dokument direkte fra shard-filen."""
+        for _key, shard_no, offset, length in self._candidates(did):
+            try:
+                doc = self._read_at(self.shards[shard_no][0], offset, length)
+            except (OSError, ValueError):
+                continue
+            if isinstance(doc, dict) and doc.get("dokumentID") == did:
+                return doc
+        return default
+
+    def locations_by_shard(self):
+        """
+        {shardnavn: [(nøkkel, offset, lengde), ...]} for gjenbruk ved
+        oppdatering.
+        """
+        out = {name: [] for name, _s in self.shards}
+        for i in range(self.count):
+            key, shard_no, offset, length = self._record(i)
+            out[self.shards[shard_no][0]].append((key, offset, length))
+        return out
+
+
+def ensure_doc_index():
+    """Åpner indeksen; bygger den på nytt hvis den mangler eller ikke stemmer med shardene."""
+    index = DocIndex.open()
+    if index is not None and index.matches_disk():
+        return index
+    if index is not None:
+        index.close()
+    build_doc_index()
+    return DocIndex.open()
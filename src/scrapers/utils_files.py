@@ -1,18 +1,39 @@
 import os
+import re
 import json
+import hashlib
 from datetime import datetime, date
 from pathlib import Path
 
+from utils_sharding import SHARD_MAX_BYTES, write_sharded
+from utils_compact import MAGIC as COMPACT_MAGIC, dumps_compact, loads_compact
+from utils_jsonstream import iter_json_array
+
 # Rot for datafiler
 DATA_DIR = Path("../../data")
 
-# Endringslogg
+# Endringslogg: append-only NDJSON-segmenter per måned + manifest.
+# changes.json er det gamle formatet og migreres automatisk.
 CHANGES_FILE = DATA_DIR / "changes.json"
+CHANGES_DIR = DATA_DIR / "changes"
+CHANGES_MANIFEST = CHANGES_DIR / "manifest.json"
 
 # Sharding-konfig
 SHARD_PREFIX = "postliste_"
 SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
-SHARD_MAX_BYTES = 50 * 1024 * 1024  # 50 MB margin mot GitHubs 100 MB-grense
+SHARD_MANIFEST_FILE = DATA_DIR / "postliste_shards.json"
+SHARD_HASH_FILE = DATA_DIR / "postliste_hashes.json"
+SHARD_NAME_RE = re.compile(rf"^{SHARD_PREFIX}(\d+)\.json$")
+
+# Felt som bare sier hvor dokumentet sto i listen (endres daglig) og
+# derfor ikke inngår i innholdsavtrykket
+FINGERPRINT_IGNORED_FIELDS = ("side",)
+
+# Kompakt lagring (utils_compact): arkivfiler kan ligge som .plc i stedet
+# for (eller ved siden av) .json. Hele korpuset kan pakkes i én fil.
+ARCHIVE_DIR = DATA_DIR / "archive"
+COMPACT_SUFFIX = ".plc"
+COMPACT_CORPUS_FILE = DATA_DIR / "postliste_corpus.plc"
 
 
 def ensure_directories():
@@ -38,7 +59,14 @@ def load_config(path):
 
 
 def atomic_write(path, data):
-    """Skriver JSON atomisk for å unngå korrupte filer."""
+    """
+    Skriver JSON atomisk for å unngå korrupte filer. Lister skrives
+    element for element (atomic_write_stream), med samme format.
+    """
+    if isinstance(data, list):
+        atomic_write_stream(path, data)
+        return
+
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -47,6 +75,95 @@ def atomic_write(path, data):
     tmp.replace(path)
 
 
+def atomic_write_stream(path, docs):
+    """
+    Som atomic_write, men skriver en JSON-liste element for element fra
+    en iterator. Gir samme format som json.dumps(liste, indent=2).
+    Returnerer antall skrevne elementer.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    count = 0
+    with tmp.open("w", encoding="utf-8") as f:
+        for d in docs:
+            f.write("[\n  " if count == 0 else ",\n  ")
+            f.write(json.dumps(d, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+            count += 1
+        f.write("\n]" if count else "[]")
+    tmp.replace(path)
+    return count
+
+
+# ------------------------------------------------------------------
+#  Kompakt format (.plc)
+# ------------------------------------------------------------------
+
+def write_compact(path, docs, compression="zlib"):
+    """Skriver dokumenter atomisk i kompaktformatet. Returnerer antall bytes."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    data = dumps_compact(docs, compression)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return len(data)
+
+
+def read_compact(path):
+    return loads_compact(Path(path).read_bytes())
+
+
+def iter_docs(path):
+    """
+    Gir dokumentene i en .json- eller .plc-fil (gjenkjennes på innholdet,
+    ikke filendelsen). JSON leses strømmende; .plc er komprimert som en
+    helhet og dekodes samlet. ValueError hvis innholdet ikke er en liste.
+    """
+    path = Path(path)
+    with path.open("rb") as f:
+        compact = f.read(len(COMPACT_MAGIC)) == COMPACT_MAGIC
+    if compact:
+        yield from read_compact(path)
+    else:
+        yield from iter_json_array(path)
+
+
+def read_docs(path):
+    return list(iter_docs(path))
+
+
+def archive_files(pattern="postliste_*", archive_dir=ARCHIVE_DIR):
+    """
+    Arkivfiler som matcher pattern (uten endelse), .json eller .plc.
+    Finnes samme fil i begge formater, brukes alltid .plc. Valget
+    avhenger ikke av mtime, som er tilfeldig etter en git checkout;
+    de som skriver en arkivfil fjerner den i det andre formatet
+    (drop_archive_sibling).
+    """
+    chosen = {}
+    for suffix in (".json", COMPACT_SUFFIX):
+        for p in Path(archive_dir).glob(pattern + suffix):
+            chosen[p.stem] = p
+    return [chosen[stem] for stem in sorted(chosen)]
+
+
+def archive_sibling(path):
+    """Samme arkivfil i det andre formatet (.json <-> .plc)."""
+    path = Path(path)
+    return path.with_suffix(".json" if path.suffix == COMPACT_SUFFIX else COMPACT_SUFFIX)
+
+
+def drop_archive_sibling(path):
+    """Fjerner arkivfilen i det andre formatet, så bare path gjelder."""
+    other = archive_sibling(path)
+    if other.exists():
+        other.unlink()
+        print(f"[INFO] Fjernet {other.name} ({Path(path).name} gjelder).")
+
+
 # ------------------------------------------------------------------
 #  Archive-hjelpere
 # ------------------------------------------------------------------
@@ -54,29 +171,23 @@ def atomic_write(path, data):
 def load_archive_year(year):
     """
     Leser alle archive-filer for et gitt år:
-      data/archive/postliste_<year>_*.json
+      data/archive/postliste_<year>_*.json (eller .plc)
 
     Returnerer:
       dict { dokumentID: dokument }
     """
-    archive_dir = DATA_DIR / "archive"
-    archive_files = sorted(archive_dir.glob(f"postliste_{year}_*.json"))
+    from utils_archive import iter_archive_docs
+
     existing = {}
 
     print(f"[INFO] Leser archive-filer for år {year}…")
 
-    for f in archive_files:
-        try:
-            with f.open("r", encoding="utf-8") as infile:
-                docs = json.load(infile)
-                for d in docs:
-                    if not isinstance(d, dict):
-                        continue
-                    dokid = d.get("dokumentID")
-                    if dokid:
-                        existing[dokid] = d
-        except Exception as e:
-            print(f"[WARN] Klarte ikke å lese {f}: {e}")
+    for d in iter_archive_docs(archive_files(f"postliste_{year}_*")):
+        if not isinstance(d, dict):
+            continue
+        dokid = d.get("dokumentID")
+        if dokid:
+            existing[dokid] = d
 
     print(f"[INFO] Totalt {len(existing)} dokumenter funnet i archive for {year}")
     return existing
@@ -114,9 +225,7 @@ def append_missing(year, new_docs):
     existing_docs = []
     if missing_path.exists():
         try:
-            existing_docs = json.loads(missing_path.read_text(encoding="utf-8"))
-            if not isinstance(existing_docs, list):
-                existing_docs = []
+            existing_docs = list(iter_json_array(missing_path))
         except Exception as e:
             print(f"[WARN] Klarte ikke å lese eksisterende missing-fil {missing_path}: {e}")
             existing_docs = []
@@ -161,7 +270,7 @@ def save_failed_pages(year, failed_pages):
 #  Sharding: postliste_1.json, postliste_2.json, ...
 # ------------------------------------------------------------------
 
-def _list_shard_paths():
+def list_shard_paths():
     """Returnerer alle postliste_N.json som Path-objekter, sortert på N."""
     if SHARD_INDEX_FILE.exists():
         try:
@@ -169,8 +278,122 @@ def _list_shard_paths():
             return [DATA_DIR / name for name in names]
         except Exception:
             print("[WARN] Klarte ikke lese shard-index, faller tilbake til glob.")
-    shards = sorted(DATA_DIR.glob(f"{SHARD_PREFIX}*.json"))
-    return shards
+    shards = [p for p in DATA_DIR.glob(f"{SHARD_PREFIX}*.json") if SHARD_NAME_RE.match(p.name)]
+    return sorted(shards, key=lambda p: int(SHARD_NAME_RE.match(p.name).group(1)))
+
+
+def shard_path(idx):
+    return DATA_DIR / f"{SHARD_PREFIX}{idx}.json"
+
+
+def doc_sort_key(x):
+    """Sorteringsnøkkel (ekte dato) for dokumenter. Ukjent dato gir date.min."""
+    for key in ("dato_iso", "dato"):
+        v = x.get(key)
+        if not v:
+            continue
+        try:
+            if key == "dato_iso":
+                return datetime.fromisoformat(v).date()
+            else:
+                return datetime.strptime(v, "%d.%m.%Y").date()
+        except Exception:
+            continue
+    return date.min
+
+
+def shard_manifest_entry(name, docs, nbytes):
+    """
+    Metadata for én shard: antall, størrelse, datointervall og ID-sett.
+    docs forventes sortert nyest først.
+    """
+    keys = [doc_sort_key(d) for d in docs]
+    return {
+        "name": name,
+        "count": len(docs),
+        "bytes": nbytes,
+        "date_max": max(keys).isoformat() if keys else None,
+        "date_min": min(keys).isoformat() if keys else None,
+        "ids": [d.get("dokumentID") for d in docs],
+    }
+
+
+def load_shard_manifest():
+    """Leser postliste_shards.json. Returnerer None hvis den mangler/er ugyldig."""
+    if not SHARD_MANIFEST_FILE.exists():
+        return None
+    try:
+        data = json.loads(SHARD_MANIFEST_FILE.read_text(encoding="utf-8"))
+        return data if isinstance(data, list) else None
+    except Exception:
+        print("[WARN] Klarte ikke lese shard-manifest.")
+        return None
+
+
+def write_shard_manifest(entries):
+    # Én verdi (og én dokumentID) per linje: en daglig kjøring gir bare
+    # lokale endringer i git-diffen, ikke en ny linje med alle ID-ene
+    SHARD_MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SHARD_MANIFEST_FILE.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(entries, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(SHARD_MANIFEST_FILE)
+
+
+def doc_fingerprint(doc):
+    """
+    Stabilt innholdsavtrykk for et dokument: sha1 av kanonisk JSON
+    (sorterte nøkler), forkortet til 16 hex-tegn. Posisjonsfelt
+    (FINGERPRINT_IGNORED_FIELDS) er ikke med.
+    """
+    content = {k: v for k, v in doc.items() if k not in FINGERPRINT_IGNORED_FIELDS}
+    canon = json.dumps(content, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canon.encode("utf-8")).hexdigest()[:16]
+
+
+def _shard_stamp(names=None):
+    """[[navn, bytes], ...] for shardene på disk, i indeks-rekkefølge."""
+    if names is None:
+        names = [p.name for p in list_shard_paths()]
+    stamp = []
+    for name in names:
+        p = DATA_DIR / name
+        if p.exists():
+            stamp.append([name, p.stat().st_size])
+    return stamp
+
+
+def load_hash_index():
+    """
+    Leser postliste_hashes.json ({dokumentID: avtrykk}). None hvis den
+    mangler, er ugyldig eller ikke stemmer med shardene på disk (navn og
+    filstørrelser), f.eks. etter at et verktøy har skrevet shardene på nytt.
+    """
+    if not SHARD_HASH_FILE.exists():
+        return None
+    try:
+        data = json.loads(SHARD_HASH_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        print("[WARN] Klarte ikke lese hash-indeks.")
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("hashes"), dict):
+        return None
+    if data.get("shards") != _shard_stamp():
+        print("[INFO] Hash-indeksen stemmer ikke med shardene.")
+        return None
+    return data["hashes"]
+
+
+def write_hash_index(index, names=None):
+    """
+    Skriver hash-indeksen sammen med navn og størrelse på shardene den
+    gjelder for. Ett dokument per linje, sortert på ID, så git-diffen
+    bare viser de nye og endrede dokumentene.
+    """
+    SHARD_HASH_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SHARD_HASH_FILE.with_suffix(".json.tmp")
+    data = {"shards": _shard_stamp(names), "hashes": index}
+    tmp.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True, indent=1), encoding="utf-8")
+    tmp.replace(SHARD_HASH_FILE)
 
 
 def _write_shard_index(paths):
@@ -187,7 +410,7 @@ def load_all_postliste():
       - og en flat liste
     """
     ensure_directories()
-    shards = _list_shard_paths()
+    shards = list_shard_paths()
     merged = {}
     all_list = []
 
@@ -196,9 +419,7 @@ def load_all_postliste():
 
     for path in shards:
         try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            if not isinstance(data, list):
-                continue
+            data = list(iter_json_array(path))
             for d in data:
                 if not isinstance(d, dict):
                     continue
@@ -213,90 +434,232 @@ def load_all_postliste():
     return merged, all_list
 
 
+def _remove_unused_shards(keep):
+    """Sletter postliste_N.json som ikke er blant keep (rester etter en eldre oppdeling)."""
+    for p in DATA_DIR.glob(f"{SHARD_PREFIX}*.json"):
+        if SHARD_NAME_RE.match(p.name) and p.name not in keep:
+            p.unlink()
+            print(f"[INFO] Fjernet ubrukt shard {p}")
+
+
 def save_postliste_sharded(all_docs):
     """
-    Tar en liste med dokumenter (allerede sortert nyest først)
-    og skriver dem ut til postliste_N.json-filer under DATA_DIR.
+    Tar en liste med dokumenter og skriver dem ut til postliste_N.json
+    under DATA_DIR, sammen med shard-indeks, manifest, dokumentindeks og
+    hash-indeks. Shard-filer fra en tidligere oppdeling som ikke lenger
+    brukes, slettes. Verktøy som skriver shards skal gå via denne.
     """
     ensure_directories()
 
-    def sort_key(x):
-        for key in ("dato_iso", "dato"):
-            v = x.get(key)
-            if not v:
-                continue
-            try:
-                if key == "dato_iso":
-                    return datetime.fromisoformat(v).date()
-                else:
-                    return datetime.strptime(v, "%d.%m.%Y").date()
-            except Exception:
-                continue
-        return date.min
-
-    all_docs_sorted = sorted(all_docs, key=sort_key, reverse=True)
+    all_docs_sorted = sorted(all_docs, key=doc_sort_key, reverse=True)
+
+    from utils_docindex import write_doc_index
 
     shards = []
-    current = []
-    current_index = 1
-
-    def current_path(idx):
-        return DATA_DIR / f"{SHARD_PREFIX}{idx}.json"
-
-    for doc in all_docs_sorted:
-        current.append(doc)
-        serialized = json.dumps(current, ensure_ascii=False)
-        if len(serialized.encode("utf-8")) > SHARD_MAX_BYTES:
-            last = current.pop()
-            path = current_path(current_index)
-            atomic_write(path, current)
-            shards.append(path)
-            print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
-            current_index += 1
-            current = [last]
-
-    if current:
-        path = current_path(current_index)
-        atomic_write(path, current)
+    manifest = []
+    locations = []
+    for path, docs, nbytes, locs in write_sharded(all_docs_sorted, shard_path):
         shards.append(path)
-        print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
+        manifest.append(shard_manifest_entry(path.name, docs, nbytes))
+        locations.append((path.name, locs))
 
+    _remove_unused_shards({p.name for p in shards})
     _write_shard_index(shards)
-    total = sum(len(json.loads(p.read_text(encoding="utf-8"))) for p in shards)
+    write_shard_manifest(manifest)
+    write_doc_index(locations)
+    write_hash_index({
+        d["dokumentID"]: doc_fingerprint(d)
+        for d in all_docs_sorted
+        if isinstance(d, dict) and d.get("dokumentID")
+    }, [p.name for p in shards])
+    total = sum(e["count"] for e in manifest)
     print(f"[INFO] Totalt {total} dokumenter fordelt på {len(shards)} shards.")
 
 
 def merge_and_save_sharded(existing_dict, new_docs):
-    """Slår sammen eksisterende dokumenter (dict) med nye dokumenter (liste)."""
-    updated = dict(existing_dict)
+    """
+    Slår sammen eksisterende dokumenter (dict) med nye dokumenter (liste).
+    Kun dokumenter som faktisk er nye eller endret sendes videre, og kun
+    shardene de havner i skrives på nytt (se utils_shards.ShardManager).
+    """
+    from utils_shards import ShardManager
+
+    delta = {}
+    for d in new_docs:
+        did = d.get("dokumentID")
+        if did and existing_dict.get(did) != d:
+            delta[did] = d
+
+    if not delta:
+        print("[INFO] Ingen nye eller endrede dokumenter – shards er uendret.")
+        return
+
+    ShardManager().apply(list(delta.values()))
+
+
+def upsert_sharded(new_docs):
+    """
+    Som merge_and_save_sharded, men uten å laste shardene: nye/endrede
+    dokumenter finnes via hash-indeksen (postliste_hashes.json).
+    """
+    from utils_shards import ShardManager, ensure_hash_index
+
+    hashes = ensure_hash_index()
+
+    delta = {}
     for d in new_docs:
-        updated[d["dokumentID"]] = d
+        did = d.get("dokumentID")
+        if did and hashes.get(did) != doc_fingerprint(d):
+            delta[did] = d
+
+    if not delta:
+        print("[INFO] Ingen nye eller endrede dokumenter – shards er uendret.")
+        return
 
-    save_postliste_sharded(list(updated.values()))
+    ShardManager().apply(list(delta.values()))
 
 
 # ---------------------------------------------------------
 #   Endringslogg-funksjoner for incremental scraper
 # ---------------------------------------------------------
 
-def load_changes():
-    """Laster tidligere endringslogg fra changes.json."""
-    path = CHANGES_FILE
-    if not path.exists():
-        return []
+def _load_changes_manifest():
+    if not CHANGES_MANIFEST.exists():
+        return None
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        data = json.loads(CHANGES_MANIFEST.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else None
     except Exception:
-        return []
+        print("[WARN] Klarte ikke lese manifest for endringslogg.")
+        return None
 
 
-def save_changes(changes):
-    """Lagrer endringslogg til changes.json."""
-    path = CHANGES_FILE
-    path.parent.mkdir(parents=True, exist_ok=True)
+def _write_changes_manifest(manifest):
+    CHANGES_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CHANGES_MANIFEST.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(CHANGES_MANIFEST)
+
+
+def _append_to_segments(changes, manifest):
+    """Append'er hendelser til changes_YYYY-MM.ndjson og oppdaterer tellerne."""
+    segments = {s["month"]: s for s in manifest.get("segments", [])}
+    by_month = {}
+    for c in changes:
+        month = (c.get("tidspunkt") or "")[:7] or "ukjent"
+        by_month.setdefault(month, []).append(c)
+
+    CHANGES_DIR.mkdir(parents=True, exist_ok=True)
+    for month, entries in by_month.items():
+        seg = segments.setdefault(month, {"month": month, "file": f"changes_{month}.ndjson", "count": 0})
+        with (CHANGES_DIR / seg["file"]).open("a", encoding="utf-8") as f:
+            for c in entries:
+                f.write(json.dumps(c, ensure_ascii=False))
+                f.write("\n")
+        seg["count"] += len(entries)
+
+    manifest["segments"] = [segments[m] for m in sorted(segments)]
+    return manifest
+
+
+def _write_ndjson(path, entries):
+    """Skriver et helt segment (én hendelse per linje) atomisk."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for c in entries:
+            f.write(json.dumps(c, ensure_ascii=False))
+            f.write("\n")
+    tmp.replace(path)
+
+
+def _count_lines(path):
+    with path.open("r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def _migrate_legacy_changes():
+    """
+    Deler en gammel changes.json opp i månedssegmenter (én gang).
+
+    Segmentene skrives hele (ikke append) og manifestet til slutt, så en
+    avbrutt migrering kan kjøres på nytt uten doble hendelser. Den gamle
+    filen slettes først når segmentene og manifestet er skrevet og
+    kontrollert. Kan den ikke leses, avbrytes det uten å røre noe.
+    """
+    try:
+        legacy = json.loads(CHANGES_FILE.read_text(encoding="utf-8"))
+    except Exception as e:
+        raise RuntimeError(f"Klarte ikke lese gammel {CHANGES_FILE}, migrerer ikke: {e}") from e
+    if not isinstance(legacy, list):
+        raise RuntimeError(f"{CHANGES_FILE} er ikke en liste, migrerer ikke.")
+
+    by_month = {}
+    for c in legacy:
+        month = (c.get("tidspunkt") or "")[:7] or "ukjent"
+        by_month.setdefault(month, []).append(c)
+
+    CHANGES_DIR.mkdir(parents=True, exist_ok=True)
+    segments = []
+    for month in sorted(by_month):
+        seg = {"month": month, "file": f"changes_{month}.ndjson", "count": len(by_month[month])}
+        path = CHANGES_DIR / seg["file"]
+        _write_ndjson(path, by_month[month])
+        if _count_lines(path) != seg["count"]:
+            raise RuntimeError(f"Kontroll av {path} feilet, beholder {CHANGES_FILE}.")
+        segments.append(seg)
+
+    manifest = {"segments": segments}
+    _write_changes_manifest(manifest)
+    if _load_changes_manifest() != manifest:
+        raise RuntimeError(f"Kontroll av {CHANGES_MANIFEST} feilet, beholder {CHANGES_FILE}.")
+
+    CHANGES_FILE.unlink()
+    print(f"[INFO] Migrerte {len(legacy)} hendelser fra {CHANGES_FILE} til {CHANGES_DIR}/")
+    return manifest
+
+
+def load_changes(months=None):
+    """
+    Laster endringsloggen fra månedssegmentene.
+    months: liste med "YYYY-MM" som skal leses (None = alle).
+    """
+    manifest = _load_changes_manifest()
+    if manifest is None:
+        if not CHANGES_FILE.exists():
+            return []
+        try:
+            return json.loads(CHANGES_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            return []
+
+    changes = []
+    for seg in manifest.get("segments", []):
+        if months is not None and seg["month"] not in months:
+            continue
+        path = CHANGES_DIR / seg["file"]
+        if not path.exists():
+            continue
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    changes.append(json.loads(line))
+    return changes
+
+
+def append_changes(new_changes):
+    """
+    Legger nye endringshendelser til loggen. Skriver kun de nye linjene
+    (append) til riktig månedssegment, pluss det lille manifestet.
+    """
+    manifest = _load_changes_manifest()
+    if manifest is None:
+        manifest = _migrate_legacy_changes() if CHANGES_FILE.exists() else {"segments": []}
+
+    if not new_changes:
+        print("[INFO] Ingen nye endringshendelser.")
+        return
 
-    path.write_text(
-        json.dumps(changes, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
-    print(f"[INFO] Lagret {len(changes)} endringshendelser i {CHANGES_FILE}")
+    manifest = _append_to_segments(new_changes, manifest)
+    _write_changes_manifest(manifest)
+    print(f"[INFO] La til {len(new_changes)} endringshendelser i {CHANGES_DIR}/")
@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+
+# Strømmende lesing av JSON-lister (shards, arkivfiler).
+#
+# json.loads(path.read_text()) holder råteksten, den dekodede strengen og
+# hele objektgrafen i minnet samtidig. iter_json_array leser filen i
+# biter og gir elementene ett og ett med JSONDecoder.raw_decode, så
+# minnebruken avhenger av største element (pluss én bit), ikke av filen.
+#
+# Skriving skjer element for element via utils_files.atomic_write_stream.
+#
+# Filene åpnes med newline="" (ingen linjeskift-oversettelse), ellers
+# ville \r\n bli lest som ett tegn og byte-offsetene for CRLF-filer
+# bli feil.
+
+CHUNK_SIZE = 1 << 16
+
+_WS = " \t\r\n"
+_AFTER = _WS + ",]"
+_decoder = json.JSONDecoder()
+
+
+class _ArrayReader:
+    def __init__(self, f, chunk_size, track_bytes=False):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.consumed = 0  # tegn før buf[0], for feilmeldinger
+        # Bytetelling: mark er en posisjon i buf med kjent byte-offset
+        self.track_bytes = track_bytes
+        self.mark = 0
+        self.mark_bytes = 0
+
+    def fill(self):
+        """Leser én bit til. Returnerer False ved slutten av filen."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        cut = min(self.pos, self.mark) if self.track_bytes else self.pos
+        if cut > self.chunk_size:
+            self.buf = self.buf[cut:]
+            self.pos -= cut
+            self.mark -= cut
+            self.consumed += cut
+        self.buf += chunk
+        return True
+
+    def byte_at(self, p):
+        """Byte-offset i filen for posisjon p i buf (p må ikke gå bakover)."""
+        self.mark_bytes += len(self.buf[self.mark:p].encode("utf-8"))
+        self.mark = p
+        return self.mark_bytes
+
+    def skip_ws(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill():
+                return
+
+    def peek(self):
+        self.skip_ws()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ""
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Forventet '{ch}' ved tegn {self.consumed + self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Dekoder neste JSON-verdi. Returnerer (verdi, start, slutt) i buf."""
+        self.skip_ws()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Et tall kan fortsette i neste bit ("1" + ".5"): godta bare
+            # verdien når den etterfølges av skilletegn eller filslutt
+            if (end == len(self.buf) or self.buf[end] not in _AFTER) and self.fill():
+                continue
+            start, self.pos = self.pos, end
+            return obj, start, end
+
+
+def _iter_array(f, chunk_size, spans):
+    r = _ArrayReader(f, chunk_size, track_bytes=spans)
+    r.expect("[")
+
+    first = True
+    while True:
+        if r.peek() == "]":
+            r.pos += 1
+            break
+        if not first:
+            r.expect(",")
+        first = False
+
+        obj, start, end = r.value()
+        if spans:
+            offset = r.byte_at(start)
+            yield obj, offset, r.byte_at(end) - offset
+        else:
+            yield obj
+
+    if r.peek() != "":
+        raise ValueError(f"Ekstra data etter JSON-listen ved tegn {r.consumed + r.pos}")
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """Gir elementene i en JSON-liste ett og ett."""
+    with Path(path).open("r", encoding="utf-8", newline="") as f:
+        yield from _iter_array(f, chunk_size, spans=False)
+
+
+def iter_json_array_spans(path, chunk_size=CHUNK_SIZE):
+    """
+    Som iter_json_array, men gir (element, byte_offset, byte_lengde) for
+    hvert element i filen.
+    """
+    with Path(path).open("r", encoding="utf-8", newline="") as f:
+        yield from _iter_array(f, chunk_size, spans=True)
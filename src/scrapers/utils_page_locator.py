@@ -0,0 +1,186 @@
+import asyncio
+import json
+from datetime import date, datetime
+
+from utils_files import DATA_DIR
+
+# Finner hvilke sider i postlisten som dekker et datointervall.
+#
+# Listen er sortert nyest først, så for en side p med datoene
+# (nyeste, eldste) gjelder:
+#   - første relevante side = minste p der eldste <= end_date
+#   - siste relevante side  = største p der nyeste >= start_date
+# Begge predikatene er monotone i p og finnes med galopperende søk fra
+# et hint (forrige resultat eller config) etterfulgt av binærsøk.
+#
+# Sidetall forskyves etter hvert som nye dokumenter kommer inn, så
+# cachen brukes bare som startpunkt: stemmer den fortsatt, koster det to
+# sideoppslag per grense.
+#
+# En side som ikke lot seg hente er ikke det samme som en tom side: den
+# hentes på nytt (PROBE_RETRIES), og feiler den fortsatt, avbrytes søket
+# med LocateError i stedet for å korte inn intervallet.
+
+PAGE_LOCATOR_FILE = DATA_DIR / "page_locator.json"
+
+# Nye forsøk per sideoppslag (i tillegg til hentefunksjonens egne)
+PROBE_RETRIES = 2
+
+
+class ProbeFailed(Exception):
+    """En side i sideoppslaget lot seg ikke hente (ikke: siden er tom)."""
+
+
+class LocateError(Exception):
+    """Sideintervallet kunne ikke fastslås fordi et sideoppslag feilet."""
+
+
+def _cache_key(per_page, start_date, end_date):
+    return f"{per_page}:{start_date.isoformat() if start_date else ''}:{end_date.isoformat() if end_date else ''}"
+
+
+def load_locator_cache():
+    try:
+        data = json.loads(PAGE_LOCATOR_FILE.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {PAGE_LOCATOR_FILE}: {e}")
+        return {}
+
+
+def write_locator_cache(cache):
+    PAGE_LOCATOR_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = PAGE_LOCATOR_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(PAGE_LOCATOR_FILE)
+
+
+class PageLocator:
+    """
+    fetch_bounds(page_num) -> (nyeste, eldste) som date, eller None for en
+    tom side (forbi slutten av listen). Feil kastes som unntak
+    (ProbeFailed). Hver side hentes maks én gang når den lykkes.
+    """
+
+    def __init__(self, fetch_bounds, per_page):
+        self.fetch_bounds = fetch_bounds
+        self.per_page = per_page
+        self._bounds = {}
+
+    async def bounds(self, page_num):
+        if page_num not in self._bounds:
+            b = await self._probe(page_num)
+            self._bounds[page_num] = b
+            if b:
+                print(f"[INFO] Locator: side {page_num} dekker {b[1]} – {b[0]}")
+            else:
+                print(f"[INFO] Locator: side {page_num} er tom")
+        return self._bounds[page_num]
+
+    async def _probe(self, page_num):
+        for attempt in range(PROBE_RETRIES + 1):
+            try:
+                return await self.fetch_bounds(page_num)
+            except Exception as e:
+                error = e
+                print(f"[WARN] Locator: side {page_num} feilet (forsøk {attempt + 1}/{PROBE_RETRIES + 1}): {e!r}")
+            if attempt < PROBE_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+        raise LocateError(f"side {page_num} lot seg ikke hente") from error
+
+    @property
+    def fetched(self):
+        return len(self._bounds)
+
+    async def _smallest_true(self, pred, hint):
+        """Minste side >= 1 der pred er sann (pred er usann, så sann)."""
+        h = max(1, hint)
+        if await pred(h):
+            hi = h
+            step = 1
+            lo = h - step
+            while lo >= 1 and await pred(lo):
+                hi = lo
+                step *= 2
+                lo = h - step
+            lo = max(lo, 0)
+        else:
+            lo = h
+            step = 1
+            while True:
+                cand = h + step
+                if await pred(cand):
+                    hi = cand
+                    break
+                lo = cand
+                step *= 2
+
+        # pred(lo) er usann (eller lo == 0), pred(hi) er sann
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if await pred(mid):
+                hi = mid
+            else:
+                lo = mid
+        return hi
+
+    async def locate(self, start_date, end_date, hint_first=1, hint_last=None):
+        """
+        Returnerer (første_side, siste_side) for intervallet, eller None
+        hvis ingen sider har dokumenter i intervallet. LocateError hvis et
+        sideoppslag feiler.
+        """
+        async def covers_end(p):
+            # Siden har dokumenter som ikke er nyere enn end_date (tom side: sann)
+            b = await self.bounds(p)
+            return b is None or end_date is None or b[1] <= end_date
+
+        async def before_start(p):
+            # Alle dokumentene på siden er eldre enn start_date (tom side: sann)
+            b = await self.bounds(p)
+            return b is None or (start_date is not None and b[0] < start_date)
+
+        first = await self._smallest_true(covers_end, hint_first or 1)
+        last = await self._smallest_true(before_start, (hint_last or first) + 1) - 1
+
+        if last < first or await self.bounds(first) is None:
+            return None
+        return first, last
+
+
+async def locate_page_range(fetch_bounds, per_page, start_date, end_date, hint_first=None, hint_last=None):
+    """
+    Finner sideintervallet for [start_date, end_date] og oppdaterer cachen.
+    Hint fra cachen prioriteres over hint fra config. LocateError (og
+    ingen cache-oppdatering) hvis et sideoppslag feiler.
+    """
+    cache = load_locator_cache()
+    key = _cache_key(per_page, start_date, end_date)
+    cached = cache.get(key)
+    if cached:
+        hint_first, hint_last = cached["first"], cached["last"]
+        print(f"[INFO] Locator: bruker cachet intervall {hint_first}–{hint_last} som startpunkt")
+
+    locator = PageLocator(fetch_bounds, per_page)
+    result = await locator.locate(start_date, end_date, hint_first or 1, hint_last)
+    print(f"[INFO] Locator: {locator.fetched} sideoppslag → "
+          f"{'ingen sider' if result is None else f'side {result[0]}–{result[1]}'}")
+
+    if result is not None:
+        cache[key] = {
+            "first": result[0],
+            "last": result[1],
+            "checked": datetime.now().isoformat(timespec="seconds"),
+        }
+        write_locator_cache(cache)
+    return result
+
+
+def bounds_from_dates(dates):
+    """(nyeste, eldste) fra en liste med date/None, eller None hvis tom."""
+    dates = [d for d in dates if isinstance(d, date)]
+    if not dates:
+        return None
+    return max(dates), min(dates)
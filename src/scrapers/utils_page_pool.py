@@ -0,0 +1,118 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+
+class PagePool:
+    """
+    Begrenset pool av gjenbrukbare Playwright-sider i en delt context.
+
+    - Oppretter maks `size` sider (lazy, ved behov)
+    - Sider leveres tilbake og gjenbrukes i stedet for å lukkes
+    - Maks `per_host` samtidige forespørsler mot samme vert
+    """
+
+    def __init__(self, context, size=4, per_host=4):
+        self.context = context
+        self.size = max(1, int(size))
+        self.per_host = max(1, int(per_host))
+        self._idle = []
+        self._created = 0
+        self.pages_created = 0
+        # Vekker ventende når en side leveres tilbake eller en plass blir
+        # ledig (ødelagt side, mislykket new_page), så de kan lage en ny
+        self._cond = asyncio.Condition()
+        self._host_limits = {}
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc or "_"
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.per_host)
+            self._host_limits[host] = sem
+        return sem
+
+    async def _acquire(self):
+        async with self._cond:
+            while not self._idle and self._created >= self.size:
+                await self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            page = await self.context.new_page()
+        except BaseException:
+            async with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        self.pages_created += 1
+        return page
+
+    async def _release(self, page):
+        async with self._cond:
+            if page.is_closed():
+                # Ødelagt side: frigjør plassen slik at en ventende kan lage en ny
+                self._created -= 1
+            else:
+                self._idle.append(page)
+            self._cond.notify()
+
+    @asynccontextmanager
+    async def page_for(self, url):
+        """Låner en side fra poolen for en gitt URL (respekterer vert-grensen)."""
+        async with self._host_semaphore(url):
+            page = await self._acquire()
+            try:
+                yield page
+            finally:
+                await self._release(page)
+
+    async def close(self):
+        """Lukker alle ledige sider i poolen."""
+        async with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for page in idle:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+
+def _pct(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)] if ordered else 0.0
+
+
+class PageTimings:
+    """
+    Tid per listeside fordelt på faser (f.eks. liste, parsing,
+    detaljer), for loggen og benchmarken.
+    """
+
+    def __init__(self):
+        self.pages = []
+
+    def record(self, page_num, **phases):
+        self.pages.append({"side": page_num, **{k: round(v, 3) for k, v in phases.items()}})
+
+    def report(self):
+        names = list(dict.fromkeys(k for p in self.pages for k in p if k != "side"))
+        return {
+            name: {
+                "sum_s": round(sum(p.get(name, 0) for p in self.pages), 3),
+                "p50_s": _pct([p.get(name, 0) for p in self.pages], 50),
+                "p95_s": _pct([p.get(name, 0) for p in self.pages], 95),
+            }
+            for name in names
+        }
+
+    def log_report(self):
+        if not self.pages:
+            return
+        print(f"[INFO] Tid per side ({len(self.pages)} sider):")
+        for name, r in self.report().items():
+            print(f"       {name:10} sum {r['sum_s']:>8.2f}s  p50 {r['p50_s']:>6.2f}s  p95 {r['p95_s']:>6.2f}s")
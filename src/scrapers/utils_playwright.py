@@ -1,21 +1,37 @@
-import time
+# Tilstandsbasert venting i stedet for faste pauser.
+#
+# ACTIVITY_SCRIPT legges på contexten (install_activity_tracker i
+# utils_playwright_async) og teller pågående fetch/XHR i siden.
+# wait_for_settled venter til en selector finnes, eller til SPA-en har
+# hentet data og vært stille i quiet_ms.
+SETTLE_QUIET_MS = 200
+SETTLE_TIMEOUT_MS = 10_000
 
-def safe_goto(page, url, retries=4):
-    for attempt in range(1, retries + 1):
-        try:
-            page.goto(url, timeout=60000, wait_until="domcontentloaded")
-            return True
-        except Exception as e:
-            print(f"[WARN] goto-feil (forsøk {attempt}/{retries}) mot {url}: {e}")
-            if attempt < retries:
-                time.sleep(2 * attempt)
-            else:
-                print(f"[ERROR] Klarte ikke åpne URL etter {retries} forsøk: {url}")
-                return False
+ACTIVITY_SCRIPT = """
+(() => {
+  if (window.__plActivity) return;
+  const a = window.__plActivity = { pending: 0, started: 0, last: performance.now() };
+  const done = () => { a.pending--; a.last = performance.now(); };
+  if (window.fetch) {
+    const origFetch = window.fetch;
+    window.fetch = function (...args) {
+      a.pending++; a.started++;
+      return origFetch.apply(this, args).finally(done);
+    };
+  }
+  const origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function (...args) {
+    a.pending++; a.started++;
+    this.addEventListener("loadend", done, { once: true });
+    return origSend.apply(this, args);
+  };
+})();
+"""
+
+SETTLED_JS = """([selector, quietMs]) => {
+  if (selector && document.querySelector(selector)) return true;
+  const a = window.__plActivity;
+  return !!a && document.readyState === "complete" && a.started > 0 && a.pending === 0
+    && performance.now() - a.last >= quietMs;
+}"""
 
-def safe_text(el, sel):
-    try:
-        node = el.query_selector(sel)
-        return node.inner_text().strip() if node else ""
-    except:
-        return ""
@@ -1,5 +1,8 @@
 # utils_playwright_async.py
 
+from utils_playwright import ACTIVITY_SCRIPT, SETTLED_JS, SETTLE_QUIET_MS, SETTLE_TIMEOUT_MS
+
+
 async def safe_text(element, selector):
     """
     Robust async-versjon av safe_text:
@@ -53,3 +56,39 @@ async def safe_goto(page, url, retries=3, timeout=10000):
 
     print(f"[ERROR] safe_goto: Klarte ikke åpne URL etter {retries} forsøk: {url}")
     return False
+
+
+async def install_activity_tracker(context):
+    """Legger aktivitetssporingen på en context (en Browser har ikke init-skript)."""
+    if hasattr(context, "add_init_script"):
+        await context.add_init_script(ACTIVITY_SCRIPT)
+
+
+async def goto_fresh(page, url, retries=3, timeout=10000):
+    """
+    safe_goto for gjenbrukte sider: går via about:blank slik at dokumentet
+    alltid lastes på nytt (også når bare #-delen av URL-en er ny).
+    """
+    if page.url != "about:blank":
+        try:
+            await page.goto("about:blank")
+        except Exception:
+            pass
+    return await safe_goto(page, url, retries=retries, timeout=timeout)
+
+
+async def wait_for_settled(page, selector=None, quiet_ms=SETTLE_QUIET_MS, timeout=SETTLE_TIMEOUT_MS):
+    """
+    Venter til selector finnes, eller til siden har gjort minst én
+    fetch/XHR og ikke har noen pågående på quiet_ms. Uten sporing
+    (install_activity_tracker) brukes Playwrights networkidle.
+    Returnerer False ved tidsavbrudd.
+    """
+    try:
+        if await page.evaluate("() => !!window.__plActivity"):
+            await page.wait_for_function(SETTLED_JS, arg=[selector, quiet_ms], timeout=timeout, polling=50)
+        else:
+            await page.wait_for_load_state("networkidle", timeout=timeout)
+        return True
+    except Exception:
+        return False
@@ -1,9 +1,14 @@
 from playwright.async_api import async_playwright
 
-async def create_playwright_context(block_resources=True):
+from utils_resources import ResourcePolicy
+
+
+async def create_playwright_context(block_resources=True, policy=None):
     """
     Oppretter Playwright browser + context med optimaliserte innstillinger.
-    Returnerer (browser, context).
+    Ressurser filtreres med policy (utils_resources.ResourcePolicy);
+    uten policy brukes standard allowlist hvis block_resources er satt.
+    Returnerer (playwright, browser, context).
     """
 
     p = await async_playwright().start()
@@ -22,13 +27,9 @@ async def create_playwright_context(block_resources=True):
 
     context = await browser.new_context()
 
-    if block_resources:
-        async def _block(route):
-            if route.request.resource_type in ["image", "media"]:
-                await route.abort()
-            else:
-                await route.continue_()
-
-        await context.route("**/*", _block)
+    if policy is None and block_resources:
+        policy = ResourcePolicy()
+    if policy is not None:
+        await policy.install_async(context)
 
     return p, browser, context
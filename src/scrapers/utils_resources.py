@@ -0,0 +1,169 @@
+import re
+from collections import Counter
+from urllib.parse import urlparse
+
+from utils_site import SITE_URL
+
+# Felles ressurspolicy for Playwright-contexter (sync og async).
+#
+# Allowlist: bare dokumenter, skript og API-kall (xhr/fetch) mot
+# nettstedets egen vert slippes gjennom. Fonter, CSS, bilder, sporing og
+# alle andre verter blokkeres. Policyen teller forespørsler og bytes per
+# kjøring slik at vi ser hvor mye båndbredde som brukes og spares.
+#
+# Config:
+#   "resource_policy": "enforce" (standard) | "audit" | "off"
+#   "resource_allow_hosts": ["cdn.example.no", ...]   # ekstra tillatte verter
+#
+# audit slipper alt gjennom, men teller hva som ville blitt blokkert –
+# inkludert bytes, som ikke kan måles for forespørsler som faktisk avbrytes.
+
+ALLOWED_TYPES = {"document", "script", "xhr", "fetch"}
+
+TRACKER_RE = re.compile(
+    r"google-analytics|googletagmanager|gtag/js|doubleclick|siteimprove|"
+    r"hotjar|matomo|piwik|facebook\.net|cookiebot|consent\.",
+    re.IGNORECASE,
+)
+
+MODES = ("enforce", "audit", "off")
+
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def _response_bytes(sizes):
+    if not sizes:
+        return 0
+    return max(0, sizes.get("responseBodySize", 0)) + max(0, sizes.get("responseHeadersSize", 0))
+
+
+class ResourcePolicy:
+    """
+    Avgjør hvilke forespørsler som tillates og fører statistikk.
+    install() brukes for sync-contexter, install_async() for async.
+    """
+
+    def __init__(self, mode="enforce", allow_hosts=None):
+        if mode not in MODES:
+            raise ValueError(f"Ukjent resource_policy: {mode} (gyldige: {', '.join(MODES)})")
+        self.mode = mode
+        self.allow_hosts = {urlparse(SITE_URL).netloc, *(allow_hosts or [])}
+        self.allowed = Counter()
+        self.allowed_bytes = Counter()
+        self.blocked = Counter()
+        self.blocked_bytes = Counter()
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(
+            mode=cfg.get("resource_policy", "enforce"),
+            allow_hosts=cfg.get("resource_allow_hosts", []),
+        )
+
+    def classify(self, url, resource_type):
+        """Returnerer None hvis forespørselen er tillatt, ellers en grunn."""
+        if url.startswith(("data:", "blob:")):
+            return None
+        if TRACKER_RE.search(url):
+            return "sporing"
+        if urlparse(url).netloc not in self.allow_hosts:
+            return "tredjepart"
+        if resource_type not in ALLOWED_TYPES:
+            return resource_type
+        return None
+
+    def _record_finished(self, request, sizes):
+        nbytes = _response_bytes(sizes)
+        reason = self.classify(request.url, request.resource_type)
+        if reason is None:
+            self.allowed[request.resource_type] += 1
+            self.allowed_bytes[request.resource_type] += nbytes
+        else:
+            # Kun i audit-modus: i enforce-modus avbrytes disse i route
+            self.blocked[reason] += 1
+            self.blocked_bytes[reason] += nbytes
+
+    def _should_abort(self, request):
+        reason = self.classify(request.url, request.resource_type)
+        if reason is None:
+            return False
+        self.blocked[reason] += 1
+        return True
+
+    # --------------------------------------------------------------
+    #  Sync
+    # --------------------------------------------------------------
+
+    def install(self, context):
+        if self.mode == "off":
+            return
+        if self.mode == "enforce":
+            context.route("**/*", self._route_sync)
+        context.on("requestfinished", self._finished_sync)
+
+    def _route_sync(self, route):
+        if self._should_abort(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    def _finished_sync(self, request):
+        try:
+            sizes = request.sizes()
+        except Exception:
+            sizes = None
+        self._record_finished(request, sizes)
+
+    # --------------------------------------------------------------
+    #  Async
+    # --------------------------------------------------------------
+
+    async def install_async(self, context):
+        if self.mode == "off":
+            return
+        if self.mode == "enforce":
+            await context.route("**/*", self._route_async)
+        context.on("requestfinished", self._finished_async)
+
+    async def _route_async(self, route):
+        if self._should_abort(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _finished_async(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            sizes = None
+        self._record_finished(request, sizes)
+
+    # --------------------------------------------------------------
+    #  Rapport
+    # --------------------------------------------------------------
+
+    def report(self):
+        return {
+            "mode": self.mode,
+            "allowed_requests": sum(self.allowed.values()),
+            "allowed_bytes": sum(self.allowed_bytes.values()),
+            "blocked_requests": sum(self.blocked.values()),
+            "blocked_bytes": sum(self.blocked_bytes.values()),
+            "allowed_by_type": dict(self.allowed),
+            "blocked_by_reason": dict(self.blocked),
+        }
+
+    def log_report(self):
+        if self.mode == "off":
+            return
+        r = self.report()
+        verb = "ville blokkert" if self.mode == "audit" else "blokkert"
+        print(f"[INFO] Ressurser ({self.mode}): tillatt {r['allowed_requests']} forespørsler "
+              f"({_mb(r['allowed_bytes'])}), {verb} {r['blocked_requests']}.")
+        for rtype, count in self.allowed.most_common():
+            print(f"       tillatt  {rtype:12} {count:>7}  {_mb(self.allowed_bytes[rtype])}")
+        for reason, count in self.blocked.most_common():
+            extra = f"  {_mb(self.blocked_bytes[reason])}" if self.mode == "audit" else ""
+            print(f"       {verb} {reason:12} {count:>7}{extra}")
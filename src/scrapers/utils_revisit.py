@@ -0,0 +1,169 @@
+import hashlib
+import json
+from datetime import date, timedelta
+
+from utils_files import DATA_DIR
+from utils_shards import ShardManager, ensure_hash_index, shard_path_for, read_shard
+from utils_detail_queue import doc_link, is_pending
+
+# Planlegger for ny sjekk av dokumenter som står som "Må bes om innsyn".
+#
+# Dokumenter går fra "Må bes om innsyn" til "Publisert" når filene blir
+# lagt ut, ofte lenge etter at de dukket opp i postlisten. I stedet for
+# å skanne hele listen på nytt holder vi en plan over alle upubliserte
+# dokumenter i arkivet og bruker et fast antall detaljsider per kjøring
+# på de som står for tur:
+#
+#   - Forfalte dokumenter sjekkes nyeste først (nye dokumenter blir
+#     oftest publisert).
+#   - Fortsatt upublisert: neste sjekk om base * 2^n dager (maks max_days).
+#
+# Filformat (data/revisit_schedule.json):
+#   {"shards": {navn: signatur}, "docs": {dokumentID: {"link", "dato_iso", "sjekket", "neste"}}}
+#
+# Signaturen per shard er sha1 over avtrykkene (postliste_hashes.json) til
+# dokumentene i shardens manifest-oppføring, så bare endrede shards leses
+# når planen synkroniseres mot arkivet.
+
+REVISIT_FILE = DATA_DIR / "revisit_schedule.json"
+
+UNPUBLISHED = "Må bes om innsyn"
+
+
+def _shard_signature(entry, hashes):
+    h = hashlib.sha1()
+    for did in entry.get("ids", []):
+        h.update(f"{did}:{hashes.get(did, '')}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class RevisitSchedule:
+    """Plan over upubliserte dokumenter med eksponentiell back-off."""
+
+    def __init__(self, path=REVISIT_FILE, base_days=1, max_days=90):
+        self.path = path
+        self.base_days = base_days
+        self.max_days = max_days
+        data = self._load()
+        self.shards = data.get("shards", {})
+        self.docs = data.get("docs", {})
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(
+            base_days=int(cfg.get("revisit_base_days", 1)),
+            max_days=int(cfg.get("revisit_max_days", 90)),
+        )
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[WARN] Klarte ikke lese {self.path}: {e}")
+            return {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            # Én verdi per linje, sortert: git-diffen viser bare endrede dokumenter
+            json.dumps({"shards": self.shards, "docs": self.docs}, ensure_ascii=False, sort_keys=True, indent=0),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+
+    def __len__(self):
+        return len(self.docs)
+
+    # --------------------------------------------------------------
+    #  Synkronisering mot arkivet
+    # --------------------------------------------------------------
+
+    def sync(self, today=None):
+        """
+        Leser shards som er endret siden forrige kjøring og legger til/
+        fjerner dokumenter etter status. Returnerer antall shards lest.
+        """
+        today = today or date.today()
+        hashes = ensure_hash_index()
+        entries = ShardManager().entries
+
+        signatures = {}
+        scanned = 0
+        for entry in entries:
+            sig = _shard_signature(entry, hashes)
+            signatures[entry["name"]] = sig
+            if self.shards.get(entry["name"]) == sig:
+                continue
+
+            scanned += 1
+            for d in read_shard(shard_path_for(entry)):
+                if not isinstance(d, dict) or not d.get("dokumentID"):
+                    continue
+                self._observe(d, today)
+
+        # Dokumenter som er borte fra arkivet
+        for did in [did for did in self.docs if did not in hashes]:
+            del self.docs[did]
+
+        self.shards = signatures
+        if scanned:
+            print(f"[INFO] Revisit: leste {scanned} av {len(entries)} shards, "
+                  f"{len(self.docs)} upubliserte dokumenter i planen.")
+        return scanned
+
+    def _observe(self, doc, today):
+        did = doc["dokumentID"]
+        link = doc_link(doc)
+        # Ventende dokumenter håndteres av detaljkøen (utils_detail_queue)
+        if doc.get("status") != UNPUBLISHED or is_pending(doc) or not link:
+            self.docs.pop(did, None)
+            return
+        cur = self.docs.get(did)
+        if cur is None:
+            self.docs[did] = {
+                "link": link,
+                "dato_iso": doc.get("dato_iso"),
+                "sjekket": 0,
+                "neste": today.isoformat(),
+            }
+        else:
+            cur["link"] = link
+            cur["dato_iso"] = doc.get("dato_iso")
+
+    # --------------------------------------------------------------
+    #  Planlegging
+    # --------------------------------------------------------------
+
+    def due(self, n, today=None, exclude=()):
+        """De n forfalte dokumentene med nyest dokumentdato først."""
+        today = (today or date.today()).isoformat()
+        ready = [
+            (did, e) for did, e in self.docs.items()
+            if e["neste"] <= today and did not in exclude
+        ]
+        ready.sort(key=lambda kv: (kv[1].get("dato_iso") or ""), reverse=True)
+        return ready[:n]
+
+    def interval(self, checks):
+        return min(self.max_days, self.base_days * 2 ** max(0, checks - 1))
+
+    def still_unpublished(self, did, today=None):
+        entry = self.docs.get(did)
+        if entry is None:
+            return
+        today = today or date.today()
+        entry["sjekket"] += 1
+        entry["neste"] = (today + timedelta(days=self.interval(entry["sjekket"]))).isoformat()
+
+    def failed(self, did, today=None):
+        """Siden lot seg ikke åpne: prøv igjen i morgen uten å øke back-off."""
+        entry = self.docs.get(did)
+        if entry is not None:
+            entry["neste"] = ((today or date.today()) + timedelta(days=1)).isoformat()
+
+    def published(self, did):
+        self.docs.pop(did, None)
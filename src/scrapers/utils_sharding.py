@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+# Felles sharding-motor for utils_files, utils_shards og tools/.
+#
+# Hvert dokument serialiseres nøyaktig én gang, og størrelsen på en shard
+# regnes ut fra løpende bytetelling i stedet for å serialisere hele
+# listen på nytt for hvert dokument. Størrelsen er eksakt lik filen som
+# skrives (json.dumps(liste, ensure_ascii=False, indent=2)).
+
+SHARD_MAX_BYTES = 50 * 1024 * 1024  # 50 MB margin mot GitHubs 100 MB-grense
+
+# "[\n  " + elementer adskilt med ",\n  " + "\n]"
+_OPEN = "[\n  "
+_SEP = ",\n  "
+_CLOSE = "\n]"
+_EMPTY = "[]"
+
+
+def serialize_doc(doc):
+    """
+    Serialiserer ett dokument slik det ser ut inne i en indent=2-liste.
+    Returnerer (doc, tekst, antall_bytes).
+    """
+    text = json.dumps(doc, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+    return doc, text, len(text.encode("utf-8"))
+
+
+def serialize_docs(docs):
+    return [serialize_doc(d) for d in docs]
+
+
+def shard_bytes(items):
+    """Eksakt filstørrelse for en liste med serialiserte elementer."""
+    if not items:
+        return len(_EMPTY)
+    return len(_OPEN) + len(_CLOSE) + sum(n for _d, _t, n in items) + len(_SEP) * (len(items) - 1)
+
+
+def shard_locations(items):
+    """
+    Byte-posisjon for hvert element i filen write_shard skriver.
+    Returnerer [(dokumentID, offset, lengde), ...].
+    """
+    locs = []
+    pos = len(_OPEN)
+    for doc, _text, nbytes in items:
+        locs.append((doc.get("dokumentID") if isinstance(doc, dict) else None, pos, nbytes))
+        pos += nbytes + len(_SEP)
+    return locs
+
+
+def pack_shards(items, max_bytes=None, from_end=False):
+    """
+    Deler serialiserte elementer (i sortert rekkefølge) i sammenhengende
+    shards som hver er <= max_bytes. Et element som alene er større enn
+    grensen får en egen shard.
+
+    from_end=True fyller fra slutten (eldste dokumenter) slik at den
+    siste shard-en blir full og eventuell rest havner først.
+
+    Lineær tid: bytetellingen oppdateres per element.
+    """
+    max_bytes = max_bytes or SHARD_MAX_BYTES
+    seq = list(reversed(items)) if from_end else items
+    shards = []
+    current = []
+    size = len(_OPEN) + len(_CLOSE)
+
+    for item in seq:
+        extra = item[2] + (len(_SEP) if current else 0)
+        if current and size + extra > max_bytes:
+            shards.append(current)
+            current = []
+            size = len(_OPEN) + len(_CLOSE)
+            extra = item[2]
+        current.append(item)
+        size += extra
+
+    if current:
+        shards.append(current)
+
+    if from_end:
+        shards = [list(reversed(s)) for s in reversed(shards)]
+    return shards
+
+
+def write_shard(path, items):
+    """Skriver ferdig serialiserte elementer atomisk. Returnerer antall bytes."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        if not items:
+            f.write(_EMPTY)
+        else:
+            f.write(_OPEN)
+            for i, (_d, text, _n) in enumerate(items):
+                if i:
+                    f.write(_SEP)
+                f.write(text)
+            f.write(_CLOSE)
+    tmp.replace(path)
+    return shard_bytes(items)
+
+
+def write_sharded(docs_sorted, path_for_index, max_bytes=None):
+    """
+    Skriver en sortert dokumentliste til shard-filer.
+    path_for_index(n) gir filstien for shard nr. n (1-basert).
+    Returnerer liste med (path, docs, bytes, locations).
+    """
+    written = []
+    for n, shard in enumerate(pack_shards(serialize_docs(docs_sorted), max_bytes), start=1):
+        path = path_for_index(n)
+        nbytes = write_shard(path, shard)
+        docs = [d for d, _t, _n in shard]
+        print(f"[INFO] Skrev shard {path} med {len(docs)} dokumenter.")
+        written.append((path, docs, nbytes, shard_locations(shard)))
+    return written
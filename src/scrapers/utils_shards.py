@@ -0,0 +1,291 @@
+from datetime import date
+
+from utils_files import (
+    DATA_DIR,
+    SHARD_NAME_RE,
+    doc_fingerprint,
+    doc_sort_key,
+    ensure_directories,
+    list_shard_paths,
+    load_hash_index,
+    load_shard_manifest,
+    shard_manifest_entry,
+    shard_path,
+    write_hash_index,
+    write_shard_manifest,
+    _write_shard_index,
+)
+from utils_docindex import ensure_doc_index, update_doc_index
+from utils_jsonstream import iter_json_array
+from utils_sharding import (
+    SHARD_MAX_BYTES,
+    pack_shards,
+    serialize_docs,
+    shard_bytes,
+    shard_locations,
+    write_shard,
+)
+
+# En shard som havner under denne grensen etter en endring slås sammen
+# med naboen hvis de får plass i én fil.
+SHARD_MIN_BYTES = SHARD_MAX_BYTES // 4
+
+
+def read_shard(path, strict=False):
+    """
+    Dokumentene i en shard ([] hvis filen mangler). En shard som ikke
+    lar seg lese gir en advarsel og [] for lesere; med strict=True
+    (ShardManager.apply, som skriver shardene på nytt) kastes feilen,
+    så en avkuttet shard aldri erstattes av bare de nye dokumentene.
+    """
+    try:
+        return list(iter_json_array(path))
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        if strict:
+            print(f"[ERROR] Klarte ikke lese shard {path}: {e} – skriver ikke over den.")
+            raise
+        print(f"[WARN] Klarte ikke lese shard {path}: {e}")
+        return []
+
+
+def shard_path_for(entry):
+    return DATA_DIR / entry["name"]
+
+
+def ensure_hash_index():
+    """
+    Returnerer {dokumentID: avtrykk}. Bygges fra shardene hvis filen
+    mangler eller ikke stemmer med shardene på disk.
+    """
+    index = load_hash_index()
+    if index is not None:
+        return index
+
+    print("[INFO] Bygger hash-indeks fra shards…")
+    index = {}
+    for p in list_shard_paths():
+        for d in read_shard(p):
+            if isinstance(d, dict) and d.get("dokumentID"):
+                index[d["dokumentID"]] = doc_fingerprint(d)
+    write_hash_index(index)
+    return index
+
+
+class ShardManager:
+    """
+    Holder oversikt over postliste_N.json via postliste_shards.json
+    (datointervall, størrelse og ID-sett per shard) og skriver bare
+    shardene som berøres av et sett med upserts.
+
+    Shardene er sortert nyest først: postliste_1 har de nyeste dokumentene.
+    """
+
+    def __init__(self):
+        ensure_directories()
+        self.entries = self._load_entries()
+
+    def _load_entries(self):
+        paths = list_shard_paths()
+        names = [p.name for p in paths]
+
+        manifest = load_shard_manifest()
+        if manifest is not None and [e.get("name") for e in manifest] == names and all(
+            (p.stat().st_size if p.exists() else 0) == e.get("bytes") for p, e in zip(paths, manifest)
+        ):
+            return manifest
+
+        print("[INFO] Shard-manifest mangler eller er utdatert – bygger fra shards…")
+        entries = []
+        for p in paths:
+            docs = read_shard(p)
+            entries.append(shard_manifest_entry(p.name, docs, p.stat().st_size if p.exists() else 0))
+        return entries
+
+    # --------------------------------------------------------------
+    #  Ruting
+    # --------------------------------------------------------------
+
+    @staticmethod
+    def _bounds(entry):
+        lo = entry.get("date_min")
+        hi = entry.get("date_max")
+        return (
+            date.fromisoformat(lo) if lo else None,
+            date.fromisoformat(hi) if hi else None,
+        )
+
+    def _fits(self, i, key):
+        lo, hi = self._bounds(self.entries[i])
+        return lo is None or lo <= key <= hi
+
+    def _route(self, key):
+        """Første shard (nyest først) der dokumentet ikke er eldre enn shardens eldste."""
+        for i, entry in enumerate(self.entries):
+            lo, _hi = self._bounds(entry)
+            if lo is None or key >= lo:
+                return i
+        return len(self.entries) - 1
+
+    # --------------------------------------------------------------
+    #  Upsert
+    # --------------------------------------------------------------
+
+    def apply(self, upserts):
+        """Legger inn/oppdaterer dokumenter og skriver kun berørte shards."""
+        if not self.entries:
+            self.entries.append(shard_manifest_entry(shard_path(1).name, [], 0))
+
+        id_to_shard = {}
+        for i, entry in enumerate(self.entries):
+            for did in entry.get("ids", []):
+                id_to_shard[did] = i
+
+        # Hentes før shardene skrives, mens indeksen fortsatt stemmer med disk
+        hashes = ensure_hash_index()
+        loaded = {}
+
+        def load(i):
+            if i not in loaded:
+                docs = read_shard(shard_path_for(self.entries[i]), strict=True)
+                loaded[i] = {
+                    (d.get("dokumentID") or ("__uten_id__", n)): d
+                    for n, d in enumerate(docs)
+                    if isinstance(d, dict)
+                }
+            return loaded[i]
+
+        for d in upserts:
+            did = d["dokumentID"]
+            key = doc_sort_key(d)
+            cur = id_to_shard.get(did)
+
+            if cur is not None and self._fits(cur, key):
+                load(cur)[did] = d
+                continue
+
+            if cur is not None:
+                load(cur).pop(did, None)
+
+            target = self._route(key)
+            load(target)[did] = d
+            id_to_shard[did] = target
+
+        self._write(loaded)
+
+        for d in upserts:
+            hashes[d["dokumentID"]] = doc_fingerprint(d)
+        write_hash_index(hashes, [e["name"] for e in self.entries])
+
+    def _new_name(self, used):
+        n = 1
+        for name in used:
+            m = SHARD_NAME_RE.match(name)
+            if m:
+                n = max(n, int(m.group(1)) + 1)
+        return shard_path(n).name
+
+    def _write(self, loaded):
+        """
+        Skriver berørte shards. Filnavn er stabile: rekkefølgen (nyest
+        først) ligger i postliste_index.json, og nye shards fra en splitt
+        får neste ledige nummer. Uberørte shards røres ikke.
+        """
+        used = {e.get("name") for e in self.entries}
+
+        # 1) Berørte shards sorteres og deles ved behov. Den eldste biten
+        #    beholder shardens navn.
+        slots = []
+        for i, entry in enumerate(self.entries):
+            if i not in loaded:
+                slots.append({"name": entry["name"], "entry": entry, "docs": None})
+                continue
+            docs = sorted(loaded[i].values(), key=doc_sort_key, reverse=True)
+            # Fyll fra eldste ende: eldre innhold blir liggende, bare de
+            # nyeste dokumentene flyttes til en ny shard.
+            pieces = pack_shards(serialize_docs(docs), SHARD_MAX_BYTES, from_end=True)
+            for n, piece in enumerate(pieces):
+                if n == len(pieces) - 1:
+                    name = entry["name"]
+                else:
+                    name = self._new_name(used)
+                    used.add(name)
+                    print(f"[INFO] Shard {entry['name']} er full – nyeste dokumenter flyttes til {name}.")
+                slots.append({"name": name, "entry": None, "docs": piece})
+
+        # 2) Slå sammen små, berørte shards med neste shard hvis de får plass
+        merged = []
+        idx = 0
+        while idx < len(slots):
+            slot = slots[idx]
+            nxt = slots[idx + 1] if idx + 1 < len(slots) else None
+            if slot["docs"] is not None and nxt is not None and shard_bytes(slot["docs"]) < SHARD_MIN_BYTES:
+                nxt_docs = nxt["docs"]
+                if nxt_docs is None:
+                    nxt_docs = serialize_docs(read_shard(shard_path_for(nxt["entry"]), strict=True))
+                combined = slot["docs"] + nxt_docs
+                if shard_bytes(combined) <= SHARD_MAX_BYTES:
+                    print(f"[INFO] Slår sammen {slot['name']} inn i {nxt['name']} ({len(combined)} dokumenter).")
+                    slots[idx + 1] = {"name": nxt["name"], "entry": None, "docs": combined}
+                    idx += 1
+                    continue
+            merged.append(slot)
+            idx += 1
+        slots = merged
+
+        # 3) Skriv berørte shards
+        new_entries = []
+        rewritten = {}
+        written = 0
+        for slot in slots:
+            if slot["docs"] is None:
+                new_entries.append(slot["entry"])
+                continue
+            target = DATA_DIR / slot["name"]
+            nbytes = write_shard(target, slot["docs"])
+            docs = [d for d, _t, _n in slot["docs"]]
+            rewritten[target.name] = shard_locations(slot["docs"])
+            written += 1
+            print(f"[INFO] Skrev shard {target} med {len(docs)} dokumenter.")
+            new_entries.append(shard_manifest_entry(target.name, docs, nbytes))
+
+        # 4) Fjern shard-filer som ikke lenger er i bruk (tomme/sammenslåtte)
+        final_names = {e["name"] for e in new_entries}
+        for name in {e.get("name") for e in self.entries} - final_names:
+            stale = DATA_DIR / name
+            if stale.exists():
+                stale.unlink()
+                print(f"[INFO] Fjernet ubrukt shard {stale}")
+
+        self.entries = new_entries
+        _write_shard_index([DATA_DIR / e["name"] for e in new_entries])
+        write_shard_manifest(new_entries)
+        update_doc_index([e["name"] for e in new_entries], rewritten)
+
+        total = sum(e["count"] for e in new_entries)
+        print(f"[INFO] Skrev {written} av {len(new_entries)} shards ({total} dokumenter totalt).")
+
+
+class ShardDocLookup:
+    """
+    Dict-lignende oppslag av enkeltdokumenter via dokumentindeksen
+    (postliste_docindex.bin): medlemssjekk er et binærsøk i en mmappet
+    fil, og get() leser bare dokumentets egne bytes fra shard-filen.
+    """
+
+    def __init__(self):
+        self._index = ensure_doc_index()
+
+    def __contains__(self, did):
+        return self._index is not None and did in self._index
+
+    def get(self, did, default=None):
+        if self._index is None:
+            return default
+        return self._index.read_doc(did, default)
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+            self._index = None
@@ -0,0 +1,11 @@
+import os
+
+# Felles URL-er for nettstedet. Rot-URL-en kan overstyres med
+# POSTLISTE_SITE_URL, f.eks. mot fixture-siden i tools/bench_scraper.py.
+SITE_URL = os.environ.get("POSTLISTE_SITE_URL", "https://www.strand.kommune.no").rstrip("/")
+
+SEARCH_PATH = (
+    "/tjenester/politikk-innsyn-og-medvirkning/"
+    "postliste-dokumenter-og-vedtak/sok-i-post-dokumenter-og-saker/"
+)
+LISTING_URL = SITE_URL + SEARCH_PATH + "#/?page={page}&pageSize={page_size}"
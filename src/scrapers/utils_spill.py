@@ -0,0 +1,161 @@
+import json
+import shutil
+from pathlib import Path
+
+from utils_files import DATA_DIR
+
+# Spill-filer for lange scrapinger: ferdige batcher skrives fortløpende
+# til NDJSON (ett dokument per linje) i stedet for å holdes i minnet.
+#
+# En kjøring bruker data/spill/<kjøring>/. Med flere prosesser
+# (scraper_parallel.py) har hver arbeider en egen underkatalog med egne
+# part-filer og egen journal; iter_spill og done_pages_in leser alle.
+SPILL_DIR = DATA_DIR / "spill"
+JOURNAL_NAME = "journal.ndjson"
+
+
+class SpillWriter:
+    """
+    Samler dokumenter i små batcher og skriver hver batch til en egen
+    part_NNNNN.ndjson-fil. Filene er komplette så snart de er skrevet,
+    så et krasj sent i kjøringen mister maks én batch.
+    """
+
+    def __init__(self, directory, batch_size=500):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._buffer = []
+        self._pending_pages = []
+        self._part = len(list(self.directory.glob("part_*.ndjson")))
+        self.count = 0
+
+    def add(self, docs, page_num=None):
+        """
+        Legger til dokumenter. Returnerer sidene som ble skrevet til disk
+        i denne operasjonen som [(page_num, [dokumentID, ...]), ...].
+        """
+        self._buffer.extend(docs)
+        self.count += len(docs)
+        if page_num is not None:
+            self._pending_pages.append((page_num, [d.get("dokumentID") for d in docs]))
+        if len(self._buffer) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        flushed = self._pending_pages
+        self._pending_pages = []
+        if not self._buffer:
+            return flushed
+        self._part += 1
+        path = self.directory / f"part_{self._part:05d}.ndjson"
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for d in self._buffer:
+                f.write(json.dumps(d, ensure_ascii=False))
+                f.write("\n")
+        tmp.replace(path)
+        self._buffer = []
+        return flushed
+
+
+def _part_files(directory):
+    directory = Path(directory)
+    return sorted(directory.glob("part_*.ndjson")) + sorted(directory.glob("*/part_*.ndjson"))
+
+
+def iter_spill(directory):
+    """
+    Leser alle spill-filer i rekkefølge (også arbeidernes underkataloger)
+    og yielder ett dokument om gangen. Dokumenter som finnes flere ganger
+    (f.eks. etter resume) gis kun én gang.
+    """
+    seen = set()
+    for path in _part_files(directory):
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                d = json.loads(line)
+                did = d.get("dokumentID")
+                if did in seen:
+                    continue
+                if did:
+                    seen.add(did)
+                yield d
+
+
+class CheckpointJournal:
+    """
+    Append-only journal (NDJSON) over ferdige og feilede sider:
+      {"page": 3301, "status": "done", "ids": ["2009/123", ...]}
+      {"page": 3302, "status": "failed"}
+
+    En side regnes som ferdig først når dokumentene er skrevet til
+    spill-filene, så --resume kan trygt hoppe over den.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._end_truncated_line()
+
+    def _end_truncated_line(self):
+        # Et krasj midt i en skriving etterlater en linje uten linjeskift;
+        # uten dette ville første nye oppføring ved --resume havnet på
+        # samme linje og blitt forkastet sammen med den avkuttede.
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with self.path.open("rb+") as f:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def _append(self, entry):
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write("\n")
+            f.flush()
+
+    def mark_done(self, page_num, ids):
+        self._append({"page": page_num, "status": "done", "ids": ids})
+
+    def mark_failed(self, page_num):
+        self._append({"page": page_num, "status": "failed"})
+
+    def load(self):
+        """Returnerer {page_num: siste status} fra journalen."""
+        state = {}
+        if not self.path.exists():
+            return state
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Avkuttet siste linje etter krasj
+                    continue
+                state[entry["page"]] = entry["status"]
+        return state
+
+    def done_pages(self):
+        return {p for p, status in self.load().items() if status == "done"}
+
+
+def done_pages_in(directory):
+    """Ferdige sider ifølge journalen i directory og i arbeidernes underkataloger."""
+    directory = Path(directory)
+    done = set()
+    for path in [directory / JOURNAL_NAME, *sorted(directory.glob(f"*/{JOURNAL_NAME}"))]:
+        done |= CheckpointJournal(path).done_pages()
+    return done
+
+
+def spill_dir_for(run_key):
+    return SPILL_DIR / run_key
+
+
+def clear_spill(directory):
+    shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,232 @@
+import json
+import os
+import re
+import sys
+from array import array
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+# Forhåndsberegnede datafiler for postliste.html (data/web/).
+#
+# Nettsiden henter bare filene et oppslag trenger, i stedet for alle shards:
+#
+#   meta.json           antall, skivestørrelse, dager (datoteller), typer,
+#                       statuser og listen over søkebøtter
+#   sider/side_N.json   dokumentene sortert etter dato (eldst først), N * SLICE_SIZE
+#                       til (N + 1) * SLICE_SIZE. Posisjonen i denne rekkefølgen
+#                       er dokumentets nummer i alle andre filer.
+#   lister/type_N.json  posisjoner per dokumenttype (meta.typer[N])
+#   lister/status_N.json posisjoner per status (meta.statuser[N])
+#   sok/<prefiks>.json  invertert indeks {ord: posisjoner} for ord i tittel,
+#                       avsender_mottaker og dokumentID, delt i bøtter etter
+#                       ordets første tegn. Store bøtter deles videre på
+#                       lengre prefiks.
+#
+# Posisjonslister er sortert stigende og delta-kodet ([3, 1, 5] = 3, 4, 9).
+# Nye dokumenter får de høyeste posisjonene, så de eldre skivene skrives
+# ikke på nytt når det kommer nye dokumenter. Filer skrives bare når
+# innholdet er endret.
+#
+# Kjøres fra rotmappen: python src/utils/generate_search_index.py
+
+SCRAPERS_DIR = Path(__file__).resolve().parent.parent / "scrapers"
+sys.path.insert(0, str(SCRAPERS_DIR))
+
+from utils_files import DATA_DIR, doc_sort_key, list_shard_paths  # noqa: E402
+from utils_jsonstream import iter_json_array  # noqa: E402
+
+WEB_DIR = DATA_DIR / "web"
+SLICE_SIZE = 200
+BUCKET_MIN_PREFIX = 2
+BUCKET_MAX_PREFIX = 4
+BUCKET_MAX_POSTINGS = 20000  # større bøtter deles på lengre prefiks
+
+SEARCH_FIELDS = ("tittel", "avsender_mottaker", "dokumentID")
+
+# Samme ordgrense som tokenize() i web/java/postliste_index.js
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+def doc_tokens(doc):
+    tokens = set()
+    for field in SEARCH_FIELDS:
+        tokens.update(tokenize(doc.get(field)))
+    return tokens
+
+
+def delta_encode(positions):
+    out, prev = [], 0
+    for p in sorted(positions):
+        out.append(p - prev)
+        prev = p
+    return out
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class _Writer:
+    """Skriver bare filer som er endret, og fjerner filer som ikke lenger finnes."""
+
+    def __init__(self, root):
+        self.root = root
+        self.kept = set()
+        self.written = 0
+
+    def write(self, rel, data):
+        path = self.root / rel
+        self.kept.add(path)
+        text = _dumps(data)
+        try:
+            if path.read_text(encoding="utf-8") == text:
+                return
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+        self.written += 1
+
+    def remove_stale(self):
+        removed = 0
+        for sub in ("sider", "lister", "sok"):
+            for path in (self.root / sub).glob("*.json"):
+                if path not in self.kept:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+def _iter_shard_docs():
+    for path in list_shard_paths():
+        try:
+            for d in iter_json_array(path):
+                if isinstance(d, dict):
+                    yield d
+        except FileNotFoundError:
+            print(f"[WARN] Fant ikke shard {path}")
+
+
+def _positions():
+    """
+    Første gjennomgang: dato for hvert dokument i shard-rekkefølge.
+    Returnerer posisjon per løpenummer og sortert liste med datoer.
+    """
+    keys = array("l", (doc_sort_key(d).toordinal() for d in _iter_shard_docs()))
+    # Stigende dato; ved lik dato beholdes shard-rekkefølgen (nyest først)
+    order = sorted(range(len(keys)), key=lambda g: (keys[g], -g))
+    pos_of = array("l", [0]) * len(order)
+    for pos, g in enumerate(order):
+        pos_of[g] = pos
+    return pos_of, keys
+
+
+def _days(keys):
+    counts = Counter(keys)
+    return [[date.fromordinal(k).isoformat(), counts[k]] for k in sorted(counts)]
+
+
+def _buckets(postings):
+    """Deler ordene i bøtter {prefiks: [ord]} med begrenset antall posisjoner."""
+    result = {}
+
+    def split(prefix, tokens):
+        size = sum(len(postings[t]) for t in tokens)
+        depth = len(prefix)
+        if size <= BUCKET_MAX_POSTINGS or depth >= BUCKET_MAX_PREFIX:
+            result[prefix] = tokens
+            return
+        groups = defaultdict(list)
+        short = []
+        for t in tokens:
+            if len(t) > depth:
+                groups[t[:depth + 1]].append(t)
+            else:
+                short.append(t)
+        if short:
+            result[prefix] = short
+        for p, ts in groups.items():
+            split(p, ts)
+
+    top = defaultdict(list)
+    for t in postings:
+        top[t[:BUCKET_MIN_PREFIX]].append(t)
+    for p, ts in top.items():
+        split(p, ts)
+    return result
+
+
+def generate_search_index():
+    pos_of, keys = _positions()
+    total = len(pos_of)
+    n_slices = (total + SLICE_SIZE - 1) // SLICE_SIZE
+
+    writer = _Writer(WEB_DIR)
+    pending = defaultdict(list)  # skive -> [(posisjon, dokument)]
+    postings = defaultdict(lambda: array("l"))
+    by_type = defaultdict(lambda: array("l"))
+    by_status = defaultdict(lambda: array("l"))
+
+    seen = 0
+    for g, doc in enumerate(_iter_shard_docs()):
+        if g >= total:
+            raise RuntimeError("Shardene endret seg under indekseringen – kjør på nytt.")
+        pos = pos_of[g]
+        seen += 1
+
+        for t in doc_tokens(doc):
+            postings[t].append(pos)
+        by_type[doc.get("dokumenttype") or ""].append(pos)
+        by_status[doc.get("status") or ""].append(pos)
+
+        n = pos // SLICE_SIZE
+        pending[n].append((pos, doc))
+        expected = min(SLICE_SIZE, total - n * SLICE_SIZE)
+        if len(pending[n]) == expected:
+            items = sorted(pending.pop(n), key=lambda x: x[0])
+            writer.write(f"sider/side_{n}.json", [d for _p, d in items])
+
+    if seen != total or pending:
+        raise RuntimeError("Shardene endret seg under indekseringen – kjør på nytt.")
+
+    types = sorted(by_type)
+    for i, t in enumerate(types):
+        writer.write(f"lister/type_{i}.json", delta_encode(by_type[t]))
+    statuses = sorted(by_status)
+    for i, s in enumerate(statuses):
+        writer.write(f"lister/status_{i}.json", delta_encode(by_status[s]))
+
+    buckets = _buckets(postings)
+    for prefix, tokens in buckets.items():
+        writer.write(f"sok/{prefix}.json", {t: delta_encode(postings[t]) for t in sorted(tokens)})
+
+    removed = writer.remove_stale()
+
+    writer.write("meta.json", {
+        "oppdatert": datetime.now(ZoneInfo("Europe/Oslo")).strftime("%d.%m.%Y %H:%M"),
+        "antall": total,
+        "skive": SLICE_SIZE,
+        "skiver": n_slices,
+        "dager": _days(keys),
+        "typer": [[t, len(by_type[t])] for t in types],
+        "statuser": [[s, len(by_status[s])] for s in statuses],
+        "sok": sorted(buckets),
+    })
+
+    print(f"[INFO] Søkeindeks: {total} dokumenter, {n_slices} skiver, "
+          f"{len(postings)} ord i {len(buckets)} bøtter.")
+    print(f"[INFO] Skrev {writer.written} filer og fjernet {removed} i {WEB_DIR}.")
+
+
+if __name__ == "__main__":
+    # DATA_DIR er relativ til src/scrapers
+    os.chdir(SCRAPERS_DIR)
+    generate_search_index()
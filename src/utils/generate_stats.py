@@ -0,0 +1,187 @@
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+# Forhåndsberegnet statistikk for web/statistikk.html (data/stats.json).
+#
+# stats.json inneholder bare aggregatene (per måned, type, status og år),
+# så statistikksiden laster noen kilobyte i stedet for alle shards.
+#
+# Oppdateres inkrementelt: data/stats_state.json husker avtrykket
+# (fra postliste_hashes.json) og statistikk-nøkkelen til hvert dokument.
+# Bare dokumenter med nytt/endret avtrykk leses (via dokumentindeksen),
+# og tellerne justeres med differansen. Mangler tilstanden, bygges alt
+# fra shardene.
+#
+# Kjøres fra rotmappen: python src/utils/generate_stats.py [--rebuild]
+
+SCRAPERS_DIR = Path(__file__).resolve().parent.parent / "scrapers"
+sys.path.insert(0, str(SCRAPERS_DIR))
+
+from utils_files import DATA_DIR, atomic_write, list_shard_paths  # noqa: E402
+from utils_jsonstream import iter_json_array  # noqa: E402
+from utils_shards import ShardDocLookup, ensure_hash_index  # noqa: E402
+
+STATS_FILE = DATA_DIR / "stats.json"
+STATS_STATE_FILE = DATA_DIR / "stats_state.json"
+
+PUBLISHED = "Publisert"
+UNPUBLISHED = "Må bes om innsyn"
+
+
+def stats_key(doc):
+    """
+    (måned "YYYY-MM" eller None, type, status) – samme regler som
+    web/java/stats.js: dato er dd.mm.yyyy, tom type er "Ukjent", alt
+    som ikke er "Publisert" telles som "Må bes om innsyn".
+    """
+    month = None
+    try:
+        month = datetime.strptime(doc.get("dato") or "", "%d.%m.%Y").strftime("%Y-%m")
+    except ValueError:
+        pass
+    status = PUBLISHED if doc.get("status") == PUBLISHED else UNPUBLISHED
+    return month, doc.get("dokumenttype") or "Ukjent", status
+
+
+class StatsCounts:
+    def __init__(self):
+        self.per_month = Counter()
+        self.per_type = Counter()
+        self.per_status = Counter({PUBLISHED: 0, UNPUBLISHED: 0})
+        self.total = 0
+
+    @classmethod
+    def from_json(cls, data):
+        c = cls()
+        c.per_month.update(data.get("per_maned", {}))
+        c.per_type.update(data.get("per_type", {}))
+        c.per_status.update(data.get("per_status", {}))
+        c.total = data.get("antall", 0)
+        return c
+
+    def apply(self, key, sign):
+        month, dtype, status = key
+        if month:
+            self.per_month[month] += sign
+        self.per_type[dtype] += sign
+        self.per_status[status] += sign
+        self.total += sign
+
+    def to_json(self):
+        per_year = Counter()
+        for month, n in self.per_month.items():
+            per_year[month[:4]] += n
+
+        def clean(counter):
+            return {k: counter[k] for k in sorted(counter) if counter[k] > 0}
+
+        return {
+            "oppdatert": datetime.now(ZoneInfo("Europe/Oslo")).strftime("%d.%m.%Y %H:%M"),
+            "antall": self.total,
+            "per_maned": clean(self.per_month),
+            "per_type": clean(self.per_type),
+            "per_status": {k: self.per_status[k] for k in (PUBLISHED, UNPUBLISHED)},
+            "per_ar": clean(per_year),
+        }
+
+
+def _load_json(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[WARN] Klarte ikke lese {path}: {e}")
+        return None
+
+
+def _rebuild(hashes):
+    print("[INFO] Bygger statistikk fra alle shards…")
+    state = {}
+    for path in list_shard_paths():
+        for d in iter_json_array(path):
+            did = d.get("dokumentID") if isinstance(d, dict) else None
+            if did and did in hashes:
+                state[did] = [hashes[did], *stats_key(d)]
+    return state
+
+
+def _read_from_shards(ids):
+    found = {}
+    for path in list_shard_paths():
+        for d in iter_json_array(path):
+            did = d.get("dokumentID") if isinstance(d, dict) else None
+            if did in ids:
+                found[did] = d
+    return found
+
+
+def update_stats(rebuild=False):
+    hashes = ensure_hash_index()
+    state = None if rebuild else _load_json(STATS_STATE_FILE)
+    stats = None if rebuild else _load_json(STATS_FILE)
+
+    if not isinstance(state, dict):
+        state = _rebuild(hashes)
+        counts = StatsCounts()
+        for _fp, *key in state.values():
+            counts.apply(key, +1)
+    else:
+        counts = StatsCounts.from_json(stats or {})
+        if stats is None or counts.total != len(state):
+            # stats.json mangler eller er ute av takt: tell opp fra tilstanden
+            counts = StatsCounts()
+            for _fp, *key in state.values():
+                counts.apply(key, +1)
+
+        changed = [did for did, fp in hashes.items() if state.get(did, (None,))[0] != fp]
+        removed = [did for did in state if did not in hashes]
+
+        lookup = ShardDocLookup()
+        docs = {did: lookup.get(did) for did in changed}
+        lookup.close()
+
+        missing = {did for did, doc in docs.items() if doc is None}
+        if missing:
+            # Dokumentindeksen fant dem ikke: les shardene én gang i stedet
+            print(f"[WARN] {len(missing)} dokumenter mangler i dokumentindeksen – leser shardene.")
+            docs.update(_read_from_shards(missing))
+
+        for did in changed:
+            doc = docs.get(did)
+            old = state.get(did)
+            if doc is None:
+                # Finnes ikke i shardene: avtrykket lagres likevel (med
+                # gammel nøkkel), så dokumentet ikke prøves på nytt hver gang
+                print(f"[WARN] Fant ikke {did} i shardene.")
+                if old is not None:
+                    state[did] = [hashes[did], *old[1:]]
+                continue
+            if old is not None:
+                counts.apply(old[1:], -1)
+            state[did] = [hashes[did], *stats_key(doc)]
+            counts.apply(state[did][1:], +1)
+
+        for did in removed:
+            counts.apply(state.pop(did)[1:], -1)
+
+        print(f"[INFO] Statistikk: {len(changed)} nye/endrede og {len(removed)} fjernede dokumenter.")
+
+    atomic_write(STATS_FILE, counts.to_json())
+    tmp = STATS_STATE_FILE.with_suffix(".json.tmp")
+    # Én verdi per linje, sortert på ID: git-diffen viser bare endrede dokumenter
+    tmp.write_text(json.dumps(state, ensure_ascii=False, sort_keys=True, indent=0, separators=(",", ":")),
+                   encoding="utf-8")
+    tmp.replace(STATS_STATE_FILE)
+    print(f"[INFO] Lagret {STATS_FILE} ({counts.total} dokumenter).")
+
+
+if __name__ == "__main__":
+    # DATA_DIR er relativ til src/scrapers
+    os.chdir(SCRAPERS_DIR)
+    update_stats(rebuild="--rebuild" in sys.argv[1:])
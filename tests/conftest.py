@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+# Modulene importeres flatt, som når scraperne kjøres fra src/scrapers
+for sub in ("src/scrapers", "src/utils", "tools"):
+    sys.path.insert(0, str(ROOT / sub))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Tom datamappe for testen. DATA_DIR er relativ (../../data fra
+    src/scrapers), så testen kjøres fra <tmp>/src/scrapers.
+    """
+    cwd = tmp_path / "src" / "scrapers"
+    cwd.mkdir(parents=True)
+    monkeypatch.chdir(cwd)
+    data = tmp_path / "data"
+    data.mkdir()
+    return data
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from conftest import FIXTURES
+
+pytest.importorskip("aiohttp")
+
+from innsyn_stub_server import load_recording, make_handler  # noqa: E402
+from scraper_core_api import API_FIELDS, InnsynApiClient, api_item_to_doc, has_file_data, hent_side_api  # noqa: E402
+
+# Syntetisk svar i skjemaet API_FIELDS beskriver, ikke et opptak av det
+# ekte endepunktet (det lages med innsyn_stub_server.py --record)
+RECORDING = FIXTURES / "innsyn_api_synthetic.json"
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(load_recording(RECORDING)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch(base_url, page_num, per_page=3, retries=1, fields=None):
+    async def run():
+        async with InnsynApiClient(base_url=base_url, fields=fields) as client:
+            return await hent_side_api(page_num, client, per_page, retries=retries)
+    return asyncio.run(run())
+
+
+def test_api_page_against_stub(stub_url):
+    docs = fetch(stub_url, 1)
+    by_id = {d["dokumentID"]: d for d in docs}
+    assert list(by_id) == ["24001", "24002", "24003"]
+
+    published = by_id["24001"]
+    assert published["status"] == "Publisert"
+    assert published["filer"] == [
+        {"tekst": "Søknad.pdf", "url": f"{stub_url}/api/presentation/v2/nye-innsyn/filer/9001"},
+    ]
+    assert published["detalj_link"] == f"{stub_url}/innsyn/journalpost/24001"
+    assert published["dato_iso"] == "2025-02-03"
+    assert published["avsender_mottaker"] == "Avsender: Byggmester AS"
+    assert published["side"] == 1
+
+    # Tom filliste er fildata: ingen filer betyr at det må bes om innsyn
+    no_files = by_id["24002"]
+    assert no_files["status"] == "Må bes om innsyn"
+    assert no_files["avsender_mottaker"] == "Mottaker: Ola Nordmann"
+
+
+def test_missing_file_data_leaves_status_unset(stub_url):
+    doc = {d["dokumentID"]: d for d in fetch(stub_url, 1)}["24003"]
+    assert not has_file_data(doc)
+    assert "status" not in doc and "filer" not in doc
+
+
+def test_unknown_page_returns_none(stub_url):
+    assert fetch(stub_url, 2) is None
+
+
+def test_other_key_variants_are_not_guessed():
+    item = {"dokumentId": "1", "title": "Tittel", "date": "03.02.2025", "files": []}
+    doc = api_item_to_doc(item, 1, "https://example.org")
+    assert doc["dokumentID"] == "" and doc["tittel"] == "" and doc["dato"] == ""
+    assert not has_file_data(doc)
+
+
+def test_field_names_from_config(stub_url):
+    # Et endepunkt med andre navn: bare de overstyrte feltene endres
+    fields = {"tittel": "dokumenttype", "dokumenttype": "tittel"}
+    doc = {d["dokumentID"]: d for d in fetch(stub_url, 1, fields=fields)}["24001"]
+    assert doc["tittel"] == "Inngående"
+    assert doc["dokumenttype"].startswith("Søknad")
+    assert API_FIELDS["tittel"] == "tittel"
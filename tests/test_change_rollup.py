@@ -0,0 +1,99 @@
+import json
+from datetime import datetime, timedelta
+
+import utils_change_rollup
+from utils_change_rollup import rebuild_change_rollup, update_change_rollup
+from utils_files import append_changes, upsert_sharded
+
+TYPES = ["Inngående", "Utgående", "Notat"]
+STATUSES = ["Må bes om innsyn", "Publisert"]
+
+
+def make_doc(n):
+    day = datetime(2023, 1, 1) + timedelta(days=n % 900)
+    return {
+        "dokumentID": f"doc/{n}",
+        "tittel": f"Dokument {n}",
+        "dato": day.strftime("%d.%m.%Y"),
+        "dato_iso": day.date().isoformat(),
+        "dokumenttype": TYPES[n % 3],
+        "status": STATUSES[n % 2],
+        "filer": [],
+    }
+
+
+def make_changes(count):
+    """Kronologisk logg over ca. 2,5 år: NEW først, deretter UPDATE på et fåtall dokumenter."""
+    start = datetime(2023, 1, 1, 6, 0, 0)
+    changes = []
+    for i in range(count):
+        ts = (start + timedelta(hours=37 * i)).strftime("%Y-%m-%d %H:%M:%S")
+        if i % 3 == 0:
+            doc = make_doc(i)
+            changes.append({
+                "tidspunkt": ts, "type": "NEW", "dokumentID": doc["dokumentID"], "tittel": doc["tittel"],
+                "endringer": {
+                    "status": {"gammel": None, "ny": doc["status"]},
+                    "dokumenttype": {"gammel": None, "ny": doc["dokumenttype"]},
+                    "filer_count": {"gammel": 0, "ny": i % 2},
+                },
+            })
+        else:
+            did = f"doc/{(i % 40) * 3}"
+            endringer = {"tittel": {"gammel": "a", "ny": "b"}}
+            if i % 4 == 1:
+                endringer = {
+                    "status": {"gammel": STATUSES[0], "ny": STATUSES[1]},
+                    "filer_count": {"gammel": 0, "ny": 2},
+                }
+            changes.append({"tidspunkt": ts, "type": "UPDATE", "dokumentID": did,
+                            "tittel": f"Tittel {did}", "endringer": endringer})
+    return changes
+
+
+def read_rollup():
+    data = json.loads(utils_change_rollup.ROLLUP_FILE.read_text(encoding="utf-8"))
+    data.pop("oppdatert")
+    docs = json.loads(utils_change_rollup.ROLLUP_DOCS_FILE.read_text(encoding="utf-8"))
+    return data, docs
+
+
+def run_incremental(changes, batch=37):
+    for start in range(0, len(changes), batch):
+        part = changes[start:start + batch]
+        append_changes(part)
+        docs = {c["dokumentID"]: make_doc(int(c["dokumentID"].split("/")[1])) for c in part}
+        update_change_rollup(part, docs)
+
+
+def test_incremental_rollup_matches_full_rebuild(data_dir):
+    changes = make_changes(700)
+    upsert_sharded([make_doc(n) for n in range(0, 700, 3)])
+    run_incremental(changes)
+    incremental = read_rollup()
+
+    rebuild_change_rollup()
+    rebuilt = read_rollup()
+
+    assert incremental == rebuilt
+    data, _docs = rebuilt
+    assert data["antall"] == 700
+    # Vinduene er faktisk trimmet i testen
+    assert len(data["per_maned"]) == utils_change_rollup.ROLLUP_MONTHS
+    assert len(data["per_dag"]) == utils_change_rollup.ROLLUP_DAYS
+    assert len(data["siste"]["UPDATE"]) == utils_change_rollup.ROLLUP_LATEST
+
+
+def test_out_of_sync_rollup_is_rebuilt(data_dir):
+    changes = make_changes(120)
+    upsert_sharded([make_doc(n) for n in range(0, 120, 3)])
+    run_incremental(changes[:60])
+
+    # Hendelser lagt til loggen uten at oversikten ble oppdatert
+    append_changes(changes[60:90])
+    run_incremental(changes[90:])
+    incremental = read_rollup()
+
+    rebuild_change_rollup()
+    assert incremental == read_rollup()
+    assert incremental[0]["antall"] == 120
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import utils_files
+from utils_files import append_changes, load_changes
+
+
+def change(ts, did, kind="NEW"):
+    return {"tidspunkt": ts, "type": kind, "dokumentID": did, "tittel": f"Tittel {did}", "endringer": {}}
+
+
+def test_append_writes_monthly_segments_and_manifest(data_dir):
+    first = [change("2025-01-30 08:00:00", "a"), change("2025-02-01 08:00:00", "b")]
+    second = [change("2025-02-02 08:00:00", "c", "UPDATE")]
+    append_changes(first)
+    append_changes(second)
+
+    manifest = json.loads(utils_files.CHANGES_MANIFEST.read_text(encoding="utf-8"))
+    assert manifest["segments"] == [
+        {"month": "2025-01", "file": "changes_2025-01.ndjson", "count": 1},
+        {"month": "2025-02", "file": "changes_2025-02.ndjson", "count": 2},
+    ]
+    assert load_changes() == first + second
+    assert load_changes(["2025-02"]) == first[1:] + second
+
+
+def test_legacy_changes_json_is_migrated_once(data_dir):
+    legacy = [change("2024-12-31 23:59:00", "gammel")]
+    utils_files.CHANGES_FILE.write_text(json.dumps(legacy, ensure_ascii=False), encoding="utf-8")
+
+    # Før første append leses det gamle formatet direkte
+    assert load_changes() == legacy
+
+    append_changes([change("2025-01-01 00:00:01", "ny")])
+    assert not utils_files.CHANGES_FILE.exists()
+    assert [c["dokumentID"] for c in load_changes()] == ["gammel", "ny"]
+
+
+def test_empty_append_leaves_log_untouched(data_dir):
+    append_changes([change("2025-03-01 10:00:00", "a")])
+    segment = utils_files.CHANGES_DIR / "changes_2025-03.ndjson"
+    before = segment.read_bytes()
+    append_changes([])
+    assert segment.read_bytes() == before
+
+
+def test_corrupt_legacy_changes_json_is_kept(data_dir):
+    utils_files.CHANGES_FILE.write_text('[{"tidspunkt": "2024-12-31 23:59:00", "type": "NE', encoding="utf-8")
+    before = utils_files.CHANGES_FILE.read_bytes()
+
+    with pytest.raises(RuntimeError):
+        append_changes([change("2025-01-01 00:00:01", "ny")])
+
+    assert utils_files.CHANGES_FILE.read_bytes() == before
+    assert not utils_files.CHANGES_MANIFEST.exists()
+
+
+def test_interrupted_migration_reruns_without_duplicates(data_dir, monkeypatch):
+    legacy = [change("2024-11-30 10:00:00", "a"), change("2024-12-01 10:00:00", "b"),
+              change("2024-12-02 10:00:00", "c")]
+    utils_files.CHANGES_FILE.write_text(json.dumps(legacy, ensure_ascii=False), encoding="utf-8")
+
+    # Krasj etter at segmentene er skrevet, før manifestet
+    def crash(manifest):
+        raise OSError("disk full")
+    with monkeypatch.context() as m:
+        m.setattr(utils_files, "_write_changes_manifest", crash)
+        with pytest.raises(OSError):
+            append_changes([change("2025-01-01 00:00:01", "ny")])
+    assert utils_files.CHANGES_FILE.exists()
+    assert (utils_files.CHANGES_DIR / "changes_2024-12.ndjson").exists()
+
+    append_changes([change("2025-01-01 00:00:01", "ny")])
+    assert not utils_files.CHANGES_FILE.exists()
+    assert [c["dokumentID"] for c in load_changes()] == ["a", "b", "c", "ny"]
+    manifest = json.loads(utils_files.CHANGES_MANIFEST.read_text(encoding="utf-8"))
+    assert [s["count"] for s in manifest["segments"]] == [1, 2, 1]
@@ -0,0 +1,189 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from utils_compact import COMPRESSIONS, dumps_compact, loads_compact
+from utils_files import (
+    archive_files,
+    doc_sort_key,
+    iter_docs,
+    list_shard_paths,
+    load_all_postliste,
+    read_docs,
+    save_postliste_sharded,
+    write_compact,
+)
+
+SITE = "https://www.strand.kommune.no"
+
+
+def corpus():
+    docs = []
+    for i in range(300):
+        d = {
+            "tittel": f"Søknad om tillatelse {i} – gnr {i % 17}",
+            "dato": f"{i % 28 + 1:02d}.0{i % 9 + 1}.2024",
+            "dato_iso": f"2024-0{i % 9 + 1}-{i % 28 + 1:02d}",
+            "dokumentID": f"24/{i}",
+            "dokumenttype": ["Inngående", "Utgående", "Notat"][i % 3],
+            "avsender_mottaker": f"Avsender: Firma {i % 5} AS" if i % 4 else "",
+            "side": i // 100 + 1,
+            "detalj_link": f"{SITE}/innsyn/journalpost/{i}",
+            "filer": [
+                {"tekst": f"Vedlegg {n}.pdf", "url": f"{SITE}/api/presentation/v2/nye-innsyn/filer/{i}{n}"}
+                for n in range(i % 3)
+            ],
+            "status": "Publisert" if i % 3 else "Må bes om innsyn",
+        }
+        # Variasjon i skjema: eldre felt, manglende felt, annen rekkefølge og typer
+        if i % 7 == 0:
+            d["journal_link"] = d.pop("detalj_link")
+        if i % 11 == 0:
+            del d["avsender_mottaker"]
+        if i % 13 == 0:
+            d = dict(reversed(list(d.items())))
+        if i % 19 == 0:
+            d["side"] = None
+            d["ekstra"] = {"tall": 1.5, "flagg": True, "liste": [1, "to", None]}
+        docs.append(d)
+    return docs
+
+
+def as_json(docs):
+    # Sammenligner også nøkkelrekkefølge og typer (1 vs 1.0 vs True)
+    return json.dumps(docs, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("compression", sorted(COMPRESSIONS))
+def test_round_trip_is_lossless(compression):
+    docs = corpus()
+    assert as_json(loads_compact(dumps_compact(docs, compression))) == as_json(docs)
+
+
+@pytest.mark.parametrize("docs", [
+    [{}],
+    [{}, {}],
+    [{"a": [{}]}, {"a": []}],
+    [{"a": [{}, {}]}, {"a": [{}]}, {"a": []}],
+    [{}, {"a": 1}, {}],
+    [{"filer": []}, {"filer": [{}, {"url": "https://x.no/a"}]}],
+])
+def test_round_trip_empty_records(docs):
+    for compression in COMPRESSIONS:
+        assert as_json(loads_compact(dumps_compact(docs, compression))) == as_json(docs)
+
+
+def test_round_trip_empty_and_smaller_than_json():
+    assert loads_compact(dumps_compact([])) == []
+    docs = corpus()
+    assert len(dumps_compact(docs)) < len(json.dumps(docs, ensure_ascii=False, indent=2).encode("utf-8")) / 3
+
+
+def test_files_are_detected_by_content(tmp_path):
+    docs = corpus()
+    js = tmp_path / "postliste_2024_H1.json"
+    js.write_text(json.dumps(docs, ensure_ascii=False, indent=2), encoding="utf-8")
+    plc = tmp_path / "postliste_2024_H2.plc"
+    write_compact(plc, docs)
+
+    with js.open(encoding="utf-8") as f:
+        expected = json.load(f)
+    assert as_json(read_docs(js)) == as_json(expected)
+    assert as_json(list(iter_docs(plc))) == as_json(expected)
+
+    # Feil endelse: innholdet avgjør
+    renamed = tmp_path / "feil.json"
+    plc.rename(renamed)
+    assert as_json(read_docs(renamed)) == as_json(expected)
+
+
+def test_archive_files_prefers_plc_regardless_of_mtime(tmp_path):
+    docs = corpus()[:5]
+    js = tmp_path / "postliste_2024_H1.json"
+    js.write_text(json.dumps(docs), encoding="utf-8")
+    plc = tmp_path / "postliste_2024_H1.plc"
+    write_compact(plc, docs)
+    only_json = tmp_path / "postliste_2024_H2.json"
+    only_json.write_text("[]", encoding="utf-8")
+
+    for mtime_js, mtime_plc in ((1_000_000, 500_000), (500_000, 1_000_000)):
+        os.utime(js, (mtime_js, mtime_js))
+        os.utime(plc, (mtime_plc, mtime_plc))
+        assert archive_files("postliste_*", tmp_path) == [plc, only_json]
+
+
+@pytest.fixture
+def storage(data_dir, monkeypatch):
+    """compact_storage mot en midlertidig datamappe (kjøres ellers fra rotmappen)."""
+    import compact_storage
+    monkeypatch.setattr(compact_storage, "DATA_DIR", data_dir)
+    monkeypatch.setattr(compact_storage, "ARCHIVE_DIR", data_dir / "archive")
+    monkeypatch.setattr(compact_storage, "SHARD_INDEX_FILE", data_dir / "postliste_index.json")
+    monkeypatch.setattr(compact_storage, "CORPUS_FILE", data_dir / "postliste_corpus.plc")
+    monkeypatch.setattr(compact_storage, "SCRAPERS_DIR", Path.cwd())
+    (data_dir / "archive").mkdir()
+    return compact_storage
+
+
+def test_pack_and_export_keep_one_format(storage, data_dir):
+    archive = data_dir / "archive"
+    docs = corpus()
+    js = archive / "postliste_2024_H1.json"
+    js.write_text(json.dumps(docs, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    storage.pack("zlib", corpus=False, force=False)
+    assert [p.name for p in archive.iterdir()] == ["postliste_2024_H1.plc"]
+    assert as_json(read_docs(archive / "postliste_2024_H1.plc")) == as_json(docs)
+
+    storage.export(shards=False, force=False)
+    assert [p.name for p in archive.iterdir()] == ["postliste_2024_H1.json"]
+    assert as_json(read_docs(js)) == as_json(docs)
+
+
+def test_pack_does_not_overwrite_differing_plc(storage, data_dir):
+    archive = data_dir / "archive"
+    docs = corpus()
+    plc = archive / "postliste_2024_H1.plc"
+    write_compact(plc, docs)
+    js = archive / "postliste_2024_H1.json"
+    js.write_text(json.dumps(docs[:3]), encoding="utf-8")
+    # En nyere mtime på den gamle JSON-filen endrer ingenting
+    os.utime(plc, (500_000, 500_000))
+
+    storage.pack("zlib", corpus=False, force=False)
+    assert as_json(read_docs(plc)) == as_json(docs)
+    assert js.exists()
+
+    storage.pack("zlib", corpus=False, force=True)
+    assert as_json(read_docs(plc)) == as_json(docs[:3])
+    assert not js.exists()
+
+
+def test_export_shards_compares_content(storage, data_dir):
+    docs = sorted(corpus()[:40], key=doc_sort_key, reverse=True)
+    save_postliste_sharded(docs)
+    write_compact(storage.CORPUS_FILE, docs)
+
+    shard = list_shard_paths()[0]
+    before = shard.read_bytes()
+    storage.export(shards=True, force=False)
+    assert shard.read_bytes() == before
+
+    changed = [dict(d, tittel="Endret") for d in docs]
+    write_compact(storage.CORPUS_FILE, changed)
+    os.utime(storage.CORPUS_FILE, (500_000, 500_000))
+    storage.export(shards=True, force=False)
+    assert [d["tittel"] for d in read_docs(shard)] != ["Endret"] * len(read_docs(shard))
+
+    storage.export(shards=True, force=True)
+    _by_id, flat = load_all_postliste()
+    assert {d["tittel"] for d in flat} == {"Endret"}
+
+
+def test_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        loads_compact(b'[{"dokumentID": "1"}]')
+    with pytest.raises(ValueError):
+        dumps_compact([], "brotli")
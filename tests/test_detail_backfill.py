@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+
+import pytest
+
+pytest.importorskip("playwright")
+
+import scraper_details  # noqa: E402
+from scraper_changes import detect_changes  # noqa: E402
+from scraper_engine import STATUS_PUBLISHED, STATUS_REQUEST  # noqa: E402
+from utils_detail_queue import DETAIL_STATUS_KEY, DetailQueue, apply_listing_only, is_pending  # noqa: E402
+from utils_files import load_all_postliste, load_changes, upsert_sharded  # noqa: E402
+
+SITE = "https://www.strand.kommune.no/innsyn"
+FILES = [{"tekst": "Vedlegg.pdf", "url": f"{SITE}/filer/1"}]
+
+
+def listing_doc(did, day):
+    return {
+        "dokumentID": did,
+        "tittel": f"Dokument {did}",
+        "dato": f"{day:02d}.03.2024",
+        "dato_iso": f"2024-03-{day:02d}",
+        "dokumenttype": "Inngående",
+        "avsender_mottaker": "Firma AS",
+        "detalj_link": f"{SITE}/journalpost/{did}",
+        "side": 1,
+    }
+
+
+@pytest.fixture
+def archive(data_dir, monkeypatch):
+    """
+    Arkiv etter en listeskraping i deferred-modus: ett ferdig dokument,
+    ett som venter på detaljsiden (og står i køen) og ett upublisert.
+    """
+    queue = DetailQueue()
+    published = dict(listing_doc("24/1", 1), filer=FILES, status=STATUS_PUBLISHED)
+    unpublished = dict(listing_doc("24/2", 2), filer=[], status=STATUS_REQUEST)
+    pending = listing_doc("24/3", 3)
+    apply_listing_only(pending, None, queue)
+    queue.save()
+    upsert_sharded([published, unpublished, pending])
+
+    fetched = []
+
+    async def fake_hent_detaljer(entries, rate_per_sec, workers, cfg):
+        fetched.extend(did for did, _entry in entries)
+        return {did: list(FILES) for did, _entry in entries}
+
+    monkeypatch.setattr(scraper_details, "hent_detaljer", fake_hent_detaljer)
+    return fetched
+
+
+def test_listing_only_marks_new_doc_pending_without_status(data_dir):
+    queue = DetailQueue()
+    doc = listing_doc("24/9", 9)
+    apply_listing_only(doc, None, queue)
+    assert is_pending(doc) and "status" not in doc and doc["filer"] == []
+    assert "24/9" in queue
+
+    # Ny listeskraping av et fortsatt ventende dokument gir ingen UPDATE
+    again = listing_doc("24/9", 9)
+    apply_listing_only(again, doc, queue)
+    assert detect_changes({"24/9": doc}, again) == (False, {})
+
+
+def test_backfill_completes_new_event_and_logs_real_updates(archive):
+    scraper_details.main()
+
+    assert sorted(archive) == ["24/2", "24/3"]
+    docs, _ = load_all_postliste()
+    assert docs["24/3"]["status"] == STATUS_PUBLISHED
+    assert docs["24/3"]["filer"] == FILES
+    assert DETAIL_STATUS_KEY not in docs["24/3"]
+    assert docs["24/2"]["status"] == STATUS_PUBLISHED
+    assert len(DetailQueue()) == 0
+
+    # Det ventende dokumentet fikk status for første gang: ingen UPDATE.
+    # Det upubliserte ble publisert: én ekte statusendring.
+    changes = load_changes()
+    assert [(c["type"], c["dokumentID"]) for c in changes] == [("UPDATE", "24/2")]
+    assert changes[0]["endringer"] == {
+        "status": {"gammel": STATUS_REQUEST, "ny": STATUS_PUBLISHED},
+        "filer_count": {"gammel": 0, "ny": 1},
+    }
+
+
+def test_second_backfill_run_is_quiet(archive):
+    scraper_details.main()
+    before = load_changes()
+    del archive[:]
+
+    scraper_details.main()
+    assert archive == []
+    assert load_changes() == before
+
+
+def test_failed_details_stay_queued_with_back_off(data_dir):
+    queue = DetailQueue()
+    doc = listing_doc("24/9", 9)
+    apply_listing_only(doc, None, queue)
+    today = date(2025, 1, 1)
+
+    # Langt flere feil enn før ga opp: oppføringen blir stående
+    waits = []
+    for _ in range(8):
+        (did, _entry), = queue.take(10, today=today)
+        queue.failed(did, today=today)
+        nxt = date.fromisoformat(queue.entries[did]["neste"])
+        waits.append((nxt - today).days)
+        assert queue.take(10, today=nxt - timedelta(days=1)) == []
+        today = nxt
+    assert waits == [1, 2, 4, 8, 16, 30, 30, 30]
+    assert "24/9" in queue
+
+    queue.done("24/9")
+    assert len(queue) == 0
+
+
+def test_backfill_failure_keeps_document_pending_and_queued(archive, monkeypatch):
+    fetch_ok = scraper_details.hent_detaljer
+
+    async def failing(entries, rate_per_sec, workers, cfg):
+        archive.extend(did for did, _entry in entries)
+        return {}
+
+    monkeypatch.setattr(scraper_details, "hent_detaljer", failing)
+    scraper_details.main()
+    assert "24/3" in DetailQueue()
+    docs, _ = load_all_postliste()
+    assert is_pending(docs["24/3"])
+
+    # Samme dag: oppføringen er i back-off og hentes ikke
+    del archive[:]
+    scraper_details.main()
+    assert "24/3" not in archive
+
+    # Når back-off er over, hentes den og blir ferdig
+    queue = DetailQueue()
+    queue.entries["24/3"]["neste"] = "2000-01-01"
+    queue.save()
+    monkeypatch.setattr(scraper_details, "hent_detaljer", fetch_ok)
+    scraper_details.main()
+    docs, _ = load_all_postliste()
+    assert docs["24/3"]["status"] == STATUS_PUBLISHED
+    assert len(DetailQueue()) == 0
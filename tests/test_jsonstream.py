@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from utils_files import atomic_write_stream
+from utils_jsonstream import iter_json_array, iter_json_array_spans
+
+SAMPLES = [
+    [],
+    [1, 2.5, -3e-7, 12345678901234567890, True, False, None],
+    ["æøå ÆØÅ – “sitat” \u00e6", "\n\t\"\\", "\U0001F600" * 50],
+    [{"dokumentID": f"2025/{i}", "tittel": "Søknad " * i, "filer": [{"url": f"/f/{i}"}] * (i % 3)} for i in range(200)],
+    [[[[1]], {"a": {"b": [None]}}], {}, []],
+]
+
+
+def write(path, text, newline="\n"):
+    path.write_bytes(text.replace("\n", newline).encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_matches_json_load(tmp_path, sample, chunk_size, indent):
+    path = write(tmp_path / "a.json", json.dumps(sample, ensure_ascii=False, indent=indent))
+    with path.open(encoding="utf-8") as f:
+        expected = json.load(f)
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("chunk_size", [5, 97, 1 << 16])
+def test_spans_are_byte_exact(tmp_path, newline, chunk_size):
+    docs = SAMPLES[3] + SAMPLES[2]
+    path = write(tmp_path / "a.json", json.dumps(docs, ensure_ascii=False, indent=2), newline)
+    raw = path.read_bytes()
+
+    spans = list(iter_json_array_spans(path, chunk_size=chunk_size))
+    assert [obj for obj, _o, _n in spans] == docs
+    for obj, offset, length in spans:
+        assert json.loads(raw[offset:offset + length].decode("utf-8")) == obj
+
+
+def test_stream_writer_round_trip(tmp_path):
+    docs = SAMPLES[3]
+    path = tmp_path / "b.json"
+    assert atomic_write_stream(path, iter(docs)) == len(docs)
+    assert path.read_text(encoding="utf-8") == json.dumps(docs, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(path)) == docs
+
+    atomic_write_stream(path, [])
+    assert json.loads(path.read_text(encoding="utf-8")) == []
+
+
+@pytest.mark.parametrize("text", ["{}", "[1, 2", "[1,, 2]", "[1] [2]", "[1 2]"])
+def test_invalid_input_raises(tmp_path, text):
+    path = write(tmp_path / "bad.json", text)
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, chunk_size=2))
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+import utils_page_locator
+from utils_page_locator import LocateError, PageLocator, ProbeFailed
+
+# 200 sider med ti dager per side, nyest først
+PAGES = 200
+NEWEST = date(2025, 6, 30)
+
+
+def page_bounds(p):
+    if p > PAGES:
+        return None
+    newest = NEWEST - timedelta(days=10 * (p - 1))
+    return newest, newest - timedelta(days=9)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def sleep(_seconds):
+        pass
+    monkeypatch.setattr(utils_page_locator.asyncio, "sleep", sleep)
+
+
+def locate(fetch, start, end, hint_first=1, hint_last=None):
+    return asyncio.run(PageLocator(fetch, 100).locate(start, end, hint_first, hint_last))
+
+
+def expected(start, end):
+    pages = [p for p in range(1, PAGES + 1)
+             if page_bounds(p)[1] <= end and page_bounds(p)[0] >= start]
+    return pages[0], pages[-1]
+
+
+def test_locates_range_and_treats_empty_pages_as_end():
+    async def fetch(p):
+        return page_bounds(p)
+
+    start, end = date(2024, 1, 1), date(2024, 3, 31)
+    assert locate(fetch, start, end) == expected(start, end)
+    # Intervall som går forbi siste side
+    start = date(2000, 1, 1)
+    assert locate(fetch, start, end)[1] == PAGES
+
+
+def test_transient_failure_is_retried_not_treated_as_empty():
+    failures = {}
+
+    async def fetch(p):
+        # Hver side feiler første gang den hentes
+        if not failures.get(p):
+            failures[p] = True
+            raise ProbeFailed(p)
+        return page_bounds(p)
+
+    start, end = date(2022, 1, 1), date(2024, 3, 31)
+    assert locate(fetch, start, end, hint_first=5, hint_last=10) == expected(start, end)
+
+
+def test_persistent_failure_aborts_locate():
+    async def fetch(p):
+        if p >= 80:
+            raise ProbeFailed(p)
+        return page_bounds(p)
+
+    # Uten feilhåndtering ville side 80 sett ut som slutten av listen
+    with pytest.raises(LocateError):
+        locate(fetch, date(2000, 1, 1), date(2024, 3, 31))
+
+
+def test_failed_locate_does_not_update_cache(data_dir):
+    async def fetch(p):
+        raise ProbeFailed(p)
+
+    with pytest.raises(LocateError):
+        asyncio.run(utils_page_locator.locate_page_range(fetch, 100, date(2024, 1, 1), date(2024, 3, 31)))
+    assert utils_page_locator.load_locator_cache() == {}
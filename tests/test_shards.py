@@ -0,0 +1,175 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import utils_files
+import utils_sharding
+import utils_shards
+from utils_docindex import DocIndex
+from utils_files import doc_fingerprint, doc_sort_key, list_shard_paths, load_all_postliste, load_hash_index
+from utils_shards import ShardDocLookup, ShardManager, ensure_hash_index
+
+MAX_BYTES = 4000
+
+
+@pytest.fixture(autouse=True)
+def small_shards(data_dir, monkeypatch):
+    monkeypatch.setattr(utils_sharding, "SHARD_MAX_BYTES", MAX_BYTES)
+    monkeypatch.setattr(utils_shards, "SHARD_MAX_BYTES", MAX_BYTES)
+    monkeypatch.setattr(utils_shards, "SHARD_MIN_BYTES", MAX_BYTES // 4)
+
+
+def make_doc(i, day=None, tittel=None):
+    d = date(2024, 1, 1) + timedelta(days=day if day is not None else i)
+    return {
+        "dokumentID": f"2024/{i}",
+        "tittel": tittel if tittel is not None else f"Dokument {i} " + "x" * 80,
+        "dato": d.strftime("%d.%m.%Y"),
+        "dato_iso": d.isoformat(),
+        "status": "Publisert",
+        "filer": [],
+        "side": 1,
+    }
+
+
+def check_consistent():
+    """Shards, manifest, dokumentindeks og hash-indeks stemmer med hverandre og med disk."""
+    paths = list_shard_paths()
+    names = [p.name for p in paths]
+    on_disk = sorted(p.name for p in utils_files.DATA_DIR.glob("postliste_*.json")
+                     if utils_files.SHARD_NAME_RE.match(p.name))
+    assert sorted(names) == on_disk
+
+    shards = [json.loads(p.read_text(encoding="utf-8")) for p in paths]
+    for docs in shards:
+        assert len(json.dumps(docs, ensure_ascii=False, indent=2).encode("utf-8")) <= MAX_BYTES or len(docs) == 1
+
+    flat = [d for docs in shards for d in docs]
+    ids = [d["dokumentID"] for d in flat]
+    assert len(ids) == len(set(ids))
+    keys = [doc_sort_key(d) for d in flat]
+    assert keys == sorted(keys, reverse=True)
+
+    manifest = ShardManager().entries
+    assert [e["name"] for e in manifest] == names
+    assert [e["ids"] for e in manifest] == [[d["dokumentID"] for d in docs] for docs in shards]
+
+    with DocIndex.open() as index:
+        assert index.matches_disk()
+        for d in flat:
+            assert index.read_doc(d["dokumentID"]) == d
+
+    assert load_hash_index() == {d["dokumentID"]: doc_fingerprint(d) for d in flat}
+    return {d["dokumentID"]: d for d in flat}
+
+
+def test_save_then_upserts_split_full_shard():
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(40)])
+    before = len(list_shard_paths())
+    assert before > 1
+    check_consistent()
+
+    # Nye dokumenter i nyeste shard: den fylles og deles
+    new = [make_doc(i) for i in range(40, 70)]
+    ShardManager().apply(new)
+    docs = check_consistent()
+    assert len(list_shard_paths()) > before
+    assert len(docs) == 70
+
+    # Oppdatering og flytting mellom shards (ny dato)
+    moved = make_doc(3, day=200, tittel="Flyttet")
+    changed = dict(make_doc(50), status="Må bes om innsyn")
+    ShardManager().apply([moved, changed])
+    docs = check_consistent()
+    assert docs["2024/3"]["tittel"] == "Flyttet"
+    assert docs["2024/50"]["status"] == "Må bes om innsyn"
+    assert len(docs) == 70
+
+
+def test_shrunk_shard_is_merged_and_file_removed(monkeypatch):
+    monkeypatch.setattr(utils_shards, "SHARD_MIN_BYTES", MAX_BYTES // 2)
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(40)])
+    names = [p.name for p in list_shard_paths()]
+    assert len(names) == 3
+    middle = json.loads(list_shard_paths()[1].read_text(encoding="utf-8"))
+
+    # Krymp dokumentene i midterste shard så den havner under
+    # minstegrensen og får plass sammen med den eldste
+    ShardManager().apply([{"dokumentID": d["dokumentID"], "dato_iso": d["dato_iso"]} for d in middle])
+    docs = check_consistent()
+    assert [p.name for p in list_shard_paths()] == [names[0], names[2]]
+    assert not (utils_files.DATA_DIR / names[1]).exists()
+    assert len(docs) == 40
+
+
+def test_resplit_by_tool_removes_leftover_shards_and_refreshes_hashes():
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(60)])
+    assert len(list_shard_paths()) > 2
+
+    # Som build_sharded_postliste/compact_storage export: færre dokumenter
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(5)])
+    docs = check_consistent()
+    assert len(list_shard_paths()) == 1
+    assert set(docs) == {f"2024/{i}" for i in range(5)}
+
+
+def test_hash_index_rebuilt_when_shards_change_behind_its_back():
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(20)])
+    path = list_shard_paths()[0]
+    docs = json.loads(path.read_text(encoding="utf-8"))
+    docs[0]["tittel"] = "Endret utenfor ShardManager"
+    path.write_text(json.dumps(docs, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    assert load_hash_index() is None
+    hashes = ensure_hash_index()
+    assert hashes[docs[0]["dokumentID"]] == doc_fingerprint(docs[0])
+    assert load_hash_index() == hashes
+
+
+def test_unreadable_shard_is_not_overwritten_by_upsert():
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(40)])
+    paths = list_shard_paths()
+    newest = paths[0]
+    raw = newest.read_bytes()
+    newest.write_bytes(raw[: len(raw) // 2])
+    before = {p.name: p.read_bytes() for p in paths}
+
+    # Nyeste dato: havner i den avkuttede shardens intervall
+    with pytest.raises(ValueError):
+        ShardManager().apply([make_doc(999, day=100)])
+    assert {p.name: p.read_bytes() for p in list_shard_paths()} == before
+
+    # Lesere hopper fortsatt over shardene med en advarsel
+    assert utils_shards.read_shard(newest) == []
+
+
+def test_fingerprint_ignores_listing_position():
+    assert doc_fingerprint(make_doc(1)) == doc_fingerprint(dict(make_doc(1), side=7))
+    assert doc_fingerprint(make_doc(1)) != doc_fingerprint(dict(make_doc(1), status="Må bes om innsyn"))
+
+
+def test_upsert_sharded_skips_unchanged_and_moved_docs():
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(20)])
+    mtimes = {p.name: p.stat().st_mtime_ns for p in list_shard_paths()}
+
+    utils_files.upsert_sharded([dict(make_doc(i), side=5) for i in range(20)])
+    assert {p.name: p.stat().st_mtime_ns for p in list_shard_paths()} == mtimes
+
+    utils_files.upsert_sharded([dict(make_doc(4), tittel="Ny tittel")])
+    docs = check_consistent()
+    assert docs["2024/4"]["tittel"] == "Ny tittel"
+
+
+def test_lookup_and_load_all_agree():
+    utils_files.save_postliste_sharded([make_doc(i) for i in range(30)])
+    merged, flat = load_all_postliste()
+    lookup = ShardDocLookup()
+    try:
+        for did, d in merged.items():
+            assert did in lookup
+            assert lookup.get(did) == d
+        assert "finnes/ikke" not in lookup
+    finally:
+        lookup.close()
+    assert len(flat) == 30
@@ -0,0 +1,147 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from scraper_core_async import scrape_pages  # noqa: E402
+from utils_spill import (  # noqa: E402
+    JOURNAL_NAME,
+    CheckpointJournal,
+    SpillWriter,
+    done_pages_in,
+    iter_spill,
+)
+
+PER_PAGE = 3
+
+
+def page_docs(page_num):
+    return [
+        {
+            "dokumentID": f"24/{page_num * 10 + i}",
+            "tittel": f"Dokument {page_num}.{i}",
+            "dato": "15.03.2024",
+            "filer": [],
+            "status": "Publisert",
+        }
+        for i in range(PER_PAGE)
+    ]
+
+
+class FakeEngine:
+    """Gir faste dokumenter per side; sidene i fail feiler (None)."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.fetched = []
+
+    async def fetch_page(self, page_num, per_page, **kwargs):
+        self.fetched.append(page_num)
+        await asyncio.sleep(0)
+        if page_num in self.fail:
+            return None
+        return page_docs(page_num)
+
+    async def fill_files(self, docs):
+        raise AssertionError("alle dokumentene har fildata")
+
+
+class FakeLimiter:
+    max_limit = 3
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def run(engine, pages, directory, batch_size=4):
+    spill = SpillWriter(directory, batch_size=batch_size)
+    journal = CheckpointJournal(directory / JOURNAL_NAME)
+    failed = asyncio.run(
+        scrape_pages(engine, FakeLimiter(), None, pages, PER_PAGE, None, None, spill, journal)
+    )
+    return failed, spill
+
+
+def test_resume_skips_done_pages_and_keeps_all_docs(tmp_path):
+    directory = tmp_path / "spill" / "run"
+    pages = list(range(1, 11))
+
+    failed, _ = run(FakeEngine(fail={4, 7}), pages, directory)
+    assert sorted(failed) == [4, 7]
+    assert done_pages_in(directory) == set(pages) - {4, 7}
+    journal = CheckpointJournal(directory / JOURNAL_NAME).load()
+    assert journal[4] == journal[7] == "failed"
+
+    # Ferdige sider står i journalen med dokumentene som ble skrevet
+    for line in (directory / JOURNAL_NAME).read_text(encoding="utf-8").splitlines():
+        entry = json.loads(line)
+        if entry["status"] == "done":
+            assert entry["ids"] == [d["dokumentID"] for d in page_docs(entry["page"])]
+
+    # --resume: bare sidene som ikke er ferdige hentes på nytt
+    done = done_pages_in(directory)
+    engine = FakeEngine()
+    failed, _ = run(engine, [p for p in pages if p not in done], directory)
+    assert failed == []
+    assert sorted(engine.fetched) == [4, 7]
+    assert done_pages_in(directory) == set(pages)
+
+    expected = sorted(d["dokumentID"] for p in pages for d in page_docs(p))
+    assert sorted(d["dokumentID"] for d in iter_spill(directory)) == expected
+
+
+def test_page_is_done_only_after_spill_flush(tmp_path):
+    directory = tmp_path / "run"
+    spill = SpillWriter(directory, batch_size=100)
+    journal = CheckpointJournal(directory / JOURNAL_NAME)
+
+    # Under batch-størrelsen: ingenting på disk, ingenting i journalen
+    assert spill.add(page_docs(1), 1) == []
+    assert done_pages_in(directory) == set()
+    assert list(iter_spill(directory)) == []
+
+    for pn, ids in spill.flush():
+        journal.mark_done(pn, ids)
+    assert done_pages_in(directory) == {1}
+    assert [d["dokumentID"] for d in iter_spill(directory)] == [d["dokumentID"] for d in page_docs(1)]
+
+
+def test_truncated_journal_line_is_ignored(tmp_path):
+    journal = CheckpointJournal(tmp_path / JOURNAL_NAME)
+    journal.mark_done(1, ["a"])
+    journal.mark_failed(2)
+    with journal.path.open("a", encoding="utf-8") as f:
+        f.write('{"page": 3, "status": "do')
+    assert journal.load() == {1: "done", 2: "failed"}
+
+    # Ved --resume åpnes journalen på nytt; neste oppføring skal ikke
+    # havne på den avkuttede linjen. Et senere forsøk overstyrer statusen.
+    journal = CheckpointJournal(tmp_path / JOURNAL_NAME)
+    journal.mark_done(2, ["b"])
+    assert journal.done_pages() == {1, 2}
+
+
+def test_worker_subdirectories_are_merged(tmp_path):
+    directory = tmp_path / "run"
+    for worker, pages in ((0, [1, 2]), (1, [3, 2])):
+        sub = directory / f"w{worker:02d}"
+        spill = SpillWriter(sub, batch_size=1)
+        journal = CheckpointJournal(sub / JOURNAL_NAME)
+        for pn in pages:
+            for done_pn, ids in spill.add(page_docs(pn), pn):
+                journal.mark_done(done_pn, ids)
+        for done_pn, ids in spill.flush():
+            journal.mark_done(done_pn, ids)
+    # En side i rotjournalen (enkeltprosess) telles også
+    CheckpointJournal(directory / JOURNAL_NAME).mark_done(9, [])
+
+    assert done_pages_in(directory) == {1, 2, 3, 9}
+    ids = [d["dokumentID"] for d in iter_spill(directory)]
+    # Side 2 ble hentet av begge arbeiderne, men gis bare én gang
+    assert len(ids) == len(set(ids)) == 3 * PER_PAGE
+    assert set(ids) == {d["dokumentID"] for p in (1, 2, 3) for d in page_docs(p)}
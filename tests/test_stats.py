@@ -0,0 +1,95 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import generate_stats
+import utils_files
+import utils_sharding
+import utils_shards
+from generate_stats import update_stats
+from utils_files import load_all_postliste, save_postliste_sharded, upsert_sharded
+
+MAX_BYTES = 6000
+TYPES = ["Inngående", "Utgående", "Notat", ""]
+
+
+@pytest.fixture(autouse=True)
+def small_shards(data_dir, monkeypatch):
+    monkeypatch.setattr(utils_sharding, "SHARD_MAX_BYTES", MAX_BYTES)
+    monkeypatch.setattr(utils_shards, "SHARD_MAX_BYTES", MAX_BYTES)
+    monkeypatch.setattr(utils_shards, "SHARD_MIN_BYTES", MAX_BYTES // 4)
+
+
+def make_doc(i, **fields):
+    d = date(2023, 1, 1) + timedelta(days=i * 5)
+    doc = {
+        "dokumentID": f"2023/{i}",
+        "tittel": f"Dokument {i}",
+        "dato": d.strftime("%d.%m.%Y"),
+        "dato_iso": d.isoformat(),
+        "dokumenttype": TYPES[i % 4],
+        "status": "Publisert" if i % 3 else "Må bes om innsyn",
+        "filer": [],
+        "side": 1,
+    }
+    doc.update(fields)
+    return doc
+
+
+def snapshot():
+    stats = json.loads(generate_stats.STATS_FILE.read_text(encoding="utf-8"))
+    stats.pop("oppdatert")
+    state = json.loads(generate_stats.STATS_STATE_FILE.read_text(encoding="utf-8"))
+    return stats, state
+
+
+def check_matches_rebuild():
+    update_stats()
+    incremental = snapshot()
+    update_stats(rebuild=True)
+    assert incremental == snapshot()
+    return incremental[0]
+
+
+def test_incremental_stats_match_rebuild(data_dir):
+    upsert_sharded([make_doc(i) for i in range(120)])
+    stats = check_matches_rebuild()
+    assert stats["antall"] == 120
+    assert len(utils_files.list_shard_paths()) > 1
+
+    # Ny status, ny type, ny måned, ugyldig dato og nye dokumenter
+    upsert_sharded([
+        make_doc(0, status="Publisert"),
+        make_doc(1, dokumenttype="Notat"),
+        make_doc(2, dato="01.12.2020", dato_iso="2020-12-01"),
+        make_doc(3, dato=""),
+        *[make_doc(i) for i in range(120, 140)],
+    ])
+    stats = check_matches_rebuild()
+    assert stats["antall"] == 140
+    assert stats["per_ar"]["2020"] == 1
+
+    # Bare listeposisjonen endret: ingen endring i statistikken
+    upsert_sharded([make_doc(i, side=7) for i in range(10, 20)])
+    assert check_matches_rebuild() == stats
+
+    # Dokumenter fjernet ved full omskriving av shardene
+    _by_id, docs = load_all_postliste()
+    save_postliste_sharded([d for d in docs if not d["dokumentID"].endswith("5")])
+    stats = check_matches_rebuild()
+    assert stats["antall"] == 140 - 14
+
+
+def test_changed_docs_missing_from_doc_index(data_dir, monkeypatch):
+    upsert_sharded([make_doc(i) for i in range(60)])
+    update_stats()
+    upsert_sharded([make_doc(i, status="Publisert") for i in range(0, 60, 3)])
+
+    # Dokumentindeksen finner ingenting: shardene leses i stedet
+    monkeypatch.setattr(utils_shards.ShardDocLookup, "get", lambda self, did: None)
+    update_stats()
+    incremental = snapshot()
+    update_stats(rebuild=True)
+    assert incremental == snapshot()
+    assert incremental[0]["per_status"] == {"Publisert": 60, "Må bes om innsyn": 0}
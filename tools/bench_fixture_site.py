@@ -0,0 +1,302 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_site import SEARCH_PATH  # noqa: E402
+
+# Lokal fixture-side som etterligner innsyn-SPA-en godt nok til at
+# hent_side, hent_side_async og hent_side_incremental kan kjøres mot den.
+#
+# Søkesiden er et HTML-skall som leser location.hash og henter
+# liste/detaljer som JSON fra /__fixture/... (med valgfri forsinkelse og
+# feilinjeksjon), og rendrer samme CSS-klasser som den ekte siden.
+# Som på den ekte siden har hver visning en meny med vanlige lenker
+# (--nav-links), slik at detaljparseren må skille fil-lenkene fra resten.
+#
+#   python tools/bench_fixture_site.py --docs 500 --latency-ms 80 --error-rate 0.05
+#
+# Dokumentene leses fra --fixture (JSON-liste i postliste-format) eller
+# genereres syntetisk.
+
+DEFAULT_PORT = 8766
+DEFAULT_NAV_LINKS = 40
+FILER_PATH = "/api/presentation/v2/nye-innsyn/filer"
+
+SHELL_HTML = """<!doctype html>
+<html lang="no">
+<head><meta charset="utf-8"><title>Postliste (fixture)</title></head>
+<body>
+<main id="root"></main>
+<script>
+const SEARCH_PATH = %(search_path)s;
+const NAV_LINKS = %(nav_links)d;
+
+function el(tag, cls, text) {
+  const e = document.createElement(tag);
+  if (cls) e.className = cls;
+  if (text !== undefined) e.textContent = text;
+  return e;
+}
+
+function meta(name, value) {
+  const d = el("div", "bc-content-teaser-meta-property--" + name);
+  d.appendChild(el("dt", "", name));
+  d.appendChild(el("dd", "", value));
+  return d;
+}
+
+function nav(root) {
+  const n = el("nav", "bc-header-nav");
+  for (let i = 0; i < NAV_LINKS; i++) {
+    const a = el("a", "bc-header-nav-link", "Meny " + i);
+    a.href = "/tjenester/meny-" + i + "/";
+    n.appendChild(a);
+  }
+  root.appendChild(n);
+}
+
+async function render() {
+  const root = document.getElementById("root");
+  root.innerHTML = "";
+  const hash = location.hash || "#/";
+  nav(root);
+
+  if (hash.startsWith("#/details/")) {
+    const id = hash.slice("#/details/".length);
+    const r = await fetch("/__fixture/detail?id=" + id);
+    if (!r.ok) return;
+    for (const f of await r.json()) {
+      const a = el("a", "", f.tekst);
+      a.href = f.url;
+      root.appendChild(a);
+    }
+    return;
+  }
+
+  const q = new URLSearchParams(hash.slice(hash.indexOf("?") + 1));
+  const r = await fetch("/__fixture/listing?page=" + (q.get("page") || 1) +
+                        "&pageSize=" + (q.get("pageSize") || 10));
+  if (!r.ok) return;
+  for (const d of await r.json()) {
+    const link = el("a");
+    link.href = SEARCH_PATH + "#/details/" + encodeURIComponent(d.dokumentID);
+    const art = el("article", "bc-content-teaser--item");
+    art.appendChild(el("span", "bc-content-teaser-title-text", d.tittel));
+    art.appendChild(el("span", "SakListItem_sakListItemTypeText__16759c", d.dokumenttype));
+    const dl = el("dl");
+    dl.appendChild(meta("dokumentID", d.dokumentID));
+    dl.appendChild(meta("dato", d.dato));
+    if (d.avsender) dl.appendChild(meta("avsender", d.avsender));
+    if (d.mottaker) dl.appendChild(meta("mottaker", d.mottaker));
+    art.appendChild(dl);
+    link.appendChild(art);
+    root.appendChild(link);
+  }
+}
+
+window.addEventListener("hashchange", render);
+render();
+</script>
+</body>
+</html>
+"""
+
+
+def load_fixture_docs(path=None, n=500, seed=42):
+    """Leser fixture-dokumenter fra fil, eller lager n syntetiske."""
+    if path:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if not isinstance(data, list):
+            raise ValueError("Fixture-filen må være en JSON-liste med dokumenter")
+        return data
+
+    from bench_sharding import synthetic_docs
+    return synthetic_docs(n, seed=seed)
+
+
+def _listing_item(doc):
+    am = doc.get("avsender_mottaker") or ""
+    return {
+        "dokumentID": doc.get("dokumentID", ""),
+        "tittel": doc.get("tittel", ""),
+        "dato": doc.get("dato", ""),
+        "dokumenttype": doc.get("dokumenttype", ""),
+        "avsender": am[len("Avsender: "):] if am.startswith("Avsender: ") else "",
+        "mottaker": am[len("Mottaker: "):] if am.startswith("Mottaker: ") else "",
+    }
+
+
+class FixtureSite:
+    """
+    Tilstand for fixture-siden: dokumenter, forsinkelse, feilinjeksjon
+    og tellere per endepunkt (hentes via /__fixture/stats).
+    """
+
+    def __init__(self, docs, latency_ms=0, jitter_ms=0, error_rate=0.0, page_cap=None, seed=1,
+                 nav_links=DEFAULT_NAV_LINKS):
+        self.docs = docs
+        self.nav_links = int(nav_links)
+        self.by_id = {d.get("dokumentID"): d for d in docs}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.page_cap = page_cap
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = Counter()
+
+    def count(self, kind):
+        with self._lock:
+            self.counters[kind] += 1
+
+    def delay_and_maybe_fail(self, kind):
+        with self._lock:
+            self.counters[kind] += 1
+            jitter = self._rnd.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            fail = self._rnd.random() < self.error_rate
+            if fail:
+                self.counters[kind + "_error"] += 1
+        delay = max(0.0, self.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def listing(self, page, page_size):
+        start = (page - 1) * page_size
+        docs = self.docs[start:start + page_size]
+        if self.page_cap:
+            docs = docs[:self.page_cap]
+        return [_listing_item(d) for d in docs]
+
+    def detail(self, did):
+        doc = self.by_id.get(did) or {}
+        return [
+            {"tekst": f.get("tekst", ""), "url": FILER_PATH + "/" + f.get("url", "").rsplit("/", 1)[-1]}
+            for f in doc.get("filer") or []
+        ]
+
+    def expected_files(self, did):
+        return len((self.by_id.get(did) or {}).get("filer") or [])
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def reset_stats(self):
+        with self._lock:
+            self.counters.clear()
+
+
+def make_handler(site):
+    shell = (SHELL_HTML % {
+        "search_path": json.dumps(SEARCH_PATH),
+        "nav_links": site.nav_links,
+    }).encode("utf-8")
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body=b"", content_type="application/json; charset=utf-8"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, data):
+            self._send(200, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = parse_qs(url.query)
+
+            if url.path == SEARCH_PATH:
+                site.count("shell")
+                self._send(200, shell, "text/html; charset=utf-8")
+                return
+
+            if url.path == "/__fixture/listing":
+                if site.delay_and_maybe_fail("listing"):
+                    self._send(500)
+                    return
+                page = int(q.get("page", ["1"])[0])
+                page_size = int(q.get("pageSize", ["10"])[0])
+                self._send_json(site.listing(page, page_size))
+                return
+
+            if url.path == "/__fixture/detail":
+                if site.delay_and_maybe_fail("detail"):
+                    self._send(500)
+                    return
+                self._send_json(site.detail(q.get("id", [""])[0]))
+                return
+
+            if url.path == "/__fixture/stats":
+                self._send_json(site.stats())
+                return
+
+            if url.path.startswith(FILER_PATH):
+                self._send(200, b"%PDF-1.4\n", "application/pdf")
+                return
+
+            self._send(404)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_server(site, port=0):
+    """Starter serveren i en bakgrunnstråd. Returnerer (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(site))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", help="JSON-liste med dokumenter (standard: syntetiske)")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-cap", type=int, default=None)
+    parser.add_argument("--nav-links", type=int, default=DEFAULT_NAV_LINKS,
+                        help="Vanlige lenker (meny) på hver visning")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    site = FixtureSite(
+        load_fixture_docs(args.fixture, args.docs),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        page_cap=args.page_cap,
+        nav_links=args.nav_links,
+    )
+    server, base_url = start_server(site, args.port)
+    print(f"[INFO] Fixture-side på {base_url}{SEARCH_PATH} ({len(site.docs)} dokumenter)")
+    print(f"[INFO] Sett POSTLISTE_SITE_URL={base_url} for å kjøre scraperne mot den.")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
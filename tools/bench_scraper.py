@@ -0,0 +1,456 @@
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+from bench_fixture_site import DEFAULT_NAV_LINKS, FixtureSite, load_fixture_docs, start_server
+
+# Benchmark av scraperne mot en lokal fixture-side (tools/bench_fixture_site.py).
+# Kjører helt offline, så endringer i ventetider, concurrency og retry-løkker
+# kan måles mot en baseline:
+#
+#   python tools/bench_scraper.py --pages 3 --latency-ms 80 --out bench.json
+#   python tools/bench_scraper.py --pages 3 --latency-ms 80 --baseline bench.json
+#
+# --src peker på en annen scrapers-katalog (f.eks. en checkout av main),
+# slik at samme harness kan måle både gammel og ny kode.
+#
+# --extraction batch,handles kjører hvert mål med begge parsermodusene i
+# scraper_engine (ett evaluate-kall per side mot ett kall per felt).
+# handles-resultatene får nøkkelen "<mål>:handles" i rapporten.
+
+TARGETS = ("hent_side", "hent_side_async", "hent_side_incremental")
+EXTRACTION_MODES = ("batch", "handles")
+DEFAULT_SRC = Path(__file__).resolve().parent.parent / "src" / "scrapers"
+
+RETRY_RE = re.compile(r"forsøk (\d+)/\d+|prøver igjen")
+
+
+class LogCounter:
+    """
+    Erstatter sys.stdout under kjøringen og teller nye forsøk ut fra
+    scrapernes egne loggmeldinger ("forsøk 2/5", "prøver igjen").
+    """
+
+    def __init__(self, target, verbose=False):
+        self.target = target
+        self.verbose = verbose
+        self.retries = 0
+        self._partial = ""
+
+    def write(self, s):
+        self._partial += s
+        *lines, self._partial = self._partial.split("\n")
+        for line in lines:
+            for m in RETRY_RE.finditer(line):
+                if m.group(1) is None or int(m.group(1)) > 1:
+                    self.retries += 1
+        if self.verbose:
+            self.target.write(s)
+        return len(s)
+
+    def flush(self):
+        self.target.flush()
+
+
+class RssSampler:
+    """Måler maks RSS for denne prosessen og alle underprosesser (nettleseren)."""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _tree_rss():
+        proc = Path("/proc")
+        if not proc.exists():
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+        children = {}
+        rss = {}
+        for d in proc.iterdir():
+            if not d.name.isdigit():
+                continue
+            try:
+                stat = (d / "stat").read_text()
+                status = (d / "status").read_text()
+            except OSError:
+                continue
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(d.name))
+            m = re.search(r"VmRSS:\s+(\d+) kB", status)
+            rss[int(d.name)] = int(m.group(1)) * 1024 if m else 0
+
+        total = 0
+        stack = [os.getpid()]
+        while stack:
+            pid = stack.pop()
+            total += rss.get(pid, 0)
+            stack.extend(children.get(pid, []))
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._tree_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._tree_rss())
+
+
+def percentile(values, p):
+    """Nærmeste-rang-persentil (p i 0–100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+def import_scrapers(src):
+    """
+    Importerer scraper-modulene fra src (etter at POSTLISTE_SITE_URL er satt).
+    Den siste er scraper_engine, eller None i trær uten felles motor.
+    """
+    sys.path.insert(0, str(src))
+    for name in ("utils_site", "scraper_engine", "scraper_core", "scraper_core_async", "scraper_core_incremental"):
+        sys.modules.pop(name, None)
+
+    import scraper_core
+    import scraper_core_async
+    import scraper_core_incremental
+    try:
+        import scraper_engine
+    except ImportError:
+        scraper_engine = None
+
+    site_url = os.environ["POSTLISTE_SITE_URL"]
+    for mod in (scraper_core, scraper_core_async, scraper_core_incremental):
+        if not mod.BASE_URL.startswith(site_url):
+            raise SystemExit(
+                f"[ERROR] {mod.__name__} i {src} støtter ikke POSTLISTE_SITE_URL "
+                f"(BASE_URL={mod.BASE_URL})"
+            )
+    return scraper_core, scraper_core_async, scraper_core_incremental, scraper_engine
+
+
+def make_policy():
+    """Ressurspolicy som i produksjon, hvis scraperne under --src har den."""
+    try:
+        from utils_resources import ResourcePolicy
+    except ImportError:
+        return None
+    return ResourcePolicy()
+
+
+def summarize(site, page_docs, latencies, elapsed, retries, peak_rss, policy=None, phases=None):
+    docs = [d for docs in page_docs.values() if docs for d in docs]
+    filer_mismatch = sum(
+        1 for d in docs if len(d.get("filer") or []) != site.expected_files(d.get("dokumentID"))
+    )
+    return {
+        "pages": len(latencies),
+        "failed_pages": sum(1 for v in page_docs.values() if not v),
+        "docs": len(docs),
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(len(docs) / elapsed, 3) if elapsed else None,
+        "p50_page_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_page_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "retries": retries,
+        "filer_mismatch": filer_mismatch,
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+        "requests": site.stats(),
+        "resources": policy.report() if policy is not None else None,
+        "phases": phases,
+    }
+
+
+def run_engine_sync(modules, args, policy, extraction):
+    """hent_side via SyncEngine (felles motor i egen tråd)."""
+    from utils_page_pool import PageTimings
+
+    scraper_core, _async, _inc, scraper_engine = modules
+    page_docs = {}
+    latencies = []
+    timings = PageTimings()
+
+    with scraper_engine.SyncEngine(policy=policy) as engine:
+        for page_num in range(1, args.pages + 1):
+            t0 = time.perf_counter()
+            docs = scraper_core.hent_side(
+                page_num, engine, args.per_page,
+                retries=args.retries, timeout=args.timeout_ms, timings=timings, extraction=extraction,
+            )
+            latencies.append(time.perf_counter() - t0)
+            page_docs[page_num] = docs
+    return page_docs, latencies, timings.report()
+
+
+async def run_engine_async(target, modules, args, policy, extraction):
+    """hent_side_async / hent_side_incremental med felles motor."""
+    from utils_page_pool import PageTimings
+
+    _core, scraper_core_async, scraper_core_incremental, scraper_engine = modules
+    page_docs = {}
+    latencies = []
+    timings = PageTimings()
+
+    async with scraper_engine.open_engine(policy=policy) as engine:
+        for page_num in range(1, args.pages + 1):
+            t0 = time.perf_counter()
+            if target == "hent_side_async":
+                docs = await scraper_core_async.hent_side_async(
+                    page_num, engine, args.per_page,
+                    retries=args.retries, timeout=args.timeout_ms, timings=timings, extraction=extraction,
+                )
+            else:
+                docs = await scraper_core_incremental.hent_side_incremental(
+                    page_num, engine, timings=timings, extraction=extraction,
+                )
+            latencies.append(time.perf_counter() - t0)
+            page_docs[page_num] = docs
+    return page_docs, latencies, timings.report()
+
+
+def run_sync(target, modules, args, policy):
+    """Synkrone mål i trær uten scraper_engine (eldre --src)."""
+    from playwright.sync_api import sync_playwright
+
+    scraper_core, _async, scraper_core_incremental, _engine = modules
+    page_docs = {}
+    latencies = []
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
+        context = browser.new_context()
+        if policy is not None:
+            policy.install(context)
+        page = context.new_page() if target == "hent_side" else None
+
+        # Varm side-pool og fasetider hvis scraperne under --src har dem
+        inc_kwargs = {}
+        timings = None
+        if target == "hent_side_incremental" and \
+                "pool" in inspect.signature(scraper_core_incremental.hent_side_incremental).parameters:
+            from utils_page_pool import PageTimings, SyncPagePool
+            timings = PageTimings()
+            inc_kwargs = {"pool": SyncPagePool(context), "timings": timings}
+
+        for page_num in range(1, args.pages + 1):
+            t0 = time.perf_counter()
+            if target == "hent_side":
+                docs = scraper_core.hent_side(
+                    page_num, context, args.per_page, page=page,
+                    retries=args.retries, timeout=args.timeout_ms,
+                )
+            else:
+                docs = scraper_core_incremental.hent_side_incremental(page_num, context, **inc_kwargs)
+            latencies.append(time.perf_counter() - t0)
+            page_docs[page_num] = docs
+
+        if "pool" in inc_kwargs:
+            inc_kwargs["pool"].close()
+        context.close()
+        browser.close()
+    return page_docs, latencies, timings.report() if timings and timings.pages else None
+
+
+async def run_async(modules, args, policy):
+    """hent_side_async i trær uten scraper_engine (eldre --src)."""
+    from utils_playwright_setup import create_playwright_context
+
+    _core, scraper_core_async, _inc, _engine = modules
+    page_docs = {}
+    latencies = []
+
+    if policy is not None:
+        p, browser, context = await create_playwright_context(policy=policy)
+    else:
+        p, browser, context = await create_playwright_context()
+    try:
+        page = await context.new_page()
+        for page_num in range(1, args.pages + 1):
+            t0 = time.perf_counter()
+            docs = await scraper_core_async.hent_side_async(
+                page_num, page, args.per_page,
+                retries=args.retries, timeout=args.timeout_ms,
+            )
+            latencies.append(time.perf_counter() - t0)
+            page_docs[page_num] = docs
+    finally:
+        await browser.close()
+        await p.stop()
+    return page_docs, latencies, None
+
+
+def run_target(target, modules, site, args, extraction="batch"):
+    site.reset_stats()
+    policy = make_policy()
+    log = LogCounter(sys.stdout, verbose=args.verbose)
+    real_stdout = sys.stdout
+    sys.stdout = log
+    try:
+        with RssSampler() as rss:
+            t0 = time.perf_counter()
+            if modules[3] is not None:
+                if target == "hent_side":
+                    page_docs, latencies, phases = run_engine_sync(modules, args, policy, extraction)
+                else:
+                    page_docs, latencies, phases = asyncio.run(
+                        run_engine_async(target, modules, args, policy, extraction)
+                    )
+            elif target == "hent_side_async":
+                page_docs, latencies, phases = asyncio.run(run_async(modules, args, policy))
+            else:
+                page_docs, latencies, phases = run_sync(target, modules, args, policy)
+            elapsed = time.perf_counter() - t0
+    finally:
+        sys.stdout = real_stdout
+    return summarize(site, page_docs, latencies, elapsed, log.retries, rss.peak, policy, phases)
+
+
+def compare(results, baseline, max_regression):
+    """Skriver forskjeller mot baseline. Returnerer False ved regresjon."""
+    ok = True
+    for target, cur in results.items():
+        base = baseline.get("results", {}).get(target)
+        if not base:
+            continue
+        for key in ("docs_per_sec", "p50_page_ms", "p95_page_ms", "retries", "peak_rss_mb"):
+            b, c = base.get(key), cur.get(key)
+            if b is None or c is None:
+                continue
+            delta = f"{(c - b) / b * 100:+.1f}%" if b else "n/a"
+            print(f"[DIFF] {target:22} {key:14} {b:>10} → {c:>10} ({delta})")
+
+        b, c = base.get("docs_per_sec"), cur.get("docs_per_sec")
+        if b and c is not None and c < b * (1 - max_regression):
+            print(f"[ERROR] {target}: docs/s falt mer enn {max_regression:.0%} ({b} → {c})")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", default=",".join(TARGETS),
+                        help="Kommaseparert utvalg av " + ", ".join(TARGETS))
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--per-page", type=int, default=20,
+                        help="Dokumenter per side (fixture-siden kapper også incremental sine 100)")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--timeout-ms", type=int, default=5000)
+    parser.add_argument("--fixture", help="JSON-liste med dokumenter (standard: syntetiske)")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--nav-links", type=int, default=DEFAULT_NAV_LINKS,
+                        help="Vanlige lenker (meny) på hver visning av fixture-siden")
+    parser.add_argument("--extraction", default="batch",
+                        help="Kommaseparert utvalg av parsermodus: " + ", ".join(EXTRACTION_MODES))
+    parser.add_argument("--src", type=Path, default=DEFAULT_SRC,
+                        help="Katalog med scraper-modulene som skal måles")
+    parser.add_argument("--out", type=Path, help="Skriv rapport (JSON) hit")
+    parser.add_argument("--baseline", type=Path, help="Sammenlign mot tidligere rapport")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Feil hvis docs/s faller mer enn denne andelen mot baseline")
+    parser.add_argument("--verbose", action="store_true", help="Vis scrapernes egen logg")
+    args = parser.parse_args()
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"Ukjente mål: {', '.join(sorted(unknown))}")
+    extractions = [e.strip() for e in args.extraction.split(",") if e.strip()]
+    unknown = set(extractions) - set(EXTRACTION_MODES)
+    if unknown or not extractions:
+        parser.error(f"Ukjent parsermodus: {', '.join(sorted(unknown)) or '(tom)'}")
+
+    # incremental bruker alltid pageSize=100, så sidene må ha nok dokumenter
+    docs = load_fixture_docs(args.fixture, max(args.docs, args.pages * 100))
+    if len(docs) < args.pages * 100:
+        print(f"[WARN] Fixture har bare {len(docs)} dokumenter – incremental får tomme sider.")
+
+    site = FixtureSite(
+        docs,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        page_cap=args.per_page,
+        seed=args.seed,
+        nav_links=args.nav_links,
+    )
+    server, base_url = start_server(site)
+    os.environ["POSTLISTE_SITE_URL"] = base_url
+    modules = import_scrapers(args.src.resolve())
+    if modules[3] is None and extractions != ["batch"]:
+        print(f"[WARN] {args.src} har ikke scraper_engine – parsermodus ignoreres.")
+        extractions = ["batch"]
+
+    print(f"[INFO] Fixture-side på {base_url}: {args.pages} sider × {args.per_page} dok, "
+          f"latens {args.latency_ms}±{args.jitter_ms} ms, feilrate {args.error_rate}")
+
+    results = {}
+    try:
+        for target in targets:
+            for extraction in extractions:
+                key = target if extraction == "batch" else f"{target}:{extraction}"
+                print(f"[INFO] Kjører {key}…")
+                results[key] = run_target(target, modules, site, args, extraction)
+                r = results[key]
+                parsing = (r["phases"] or {}).get("parsing", {}).get("sum_s")
+                print(f"[RESULT] {key:30} {r['docs']:>5} dok {r['seconds']:>8.2f}s "
+                      f"{r['docs_per_sec'] or 0:>8.2f} dok/s  p50 {r['p50_page_ms']} ms  "
+                      f"p95 {r['p95_page_ms']} ms  retries {r['retries']}  "
+                      f"feil filer {r['filer_mismatch']}  RSS {r['peak_rss_mb']} MB"
+                      + (f"  parsing {parsing}s" if parsing is not None else ""))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        "config": {
+            "pages": args.pages,
+            "per_page": args.per_page,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+            "nav_links": args.nav_links,
+            "extraction": extractions,
+            "src": str(args.src),
+        },
+        "results": results,
+    }
+
+    if args.out:
+        args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[INFO] Rapport skrevet til {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("config", {}).get("latency_ms") != args.latency_ms:
+            print("[WARN] Baseline er kjørt med annen latens – sammenligningen er usikker.")
+        if not compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
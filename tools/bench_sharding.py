@@ -0,0 +1,107 @@
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_sharding import SHARD_MAX_BYTES, pack_shards, serialize_docs, write_sharded  # noqa: E402
+
+# Benchmark: gammel O(n²) sharding (json.dumps av hele shard-en for hvert
+# dokument) mot den felles sharding-motoren med løpende bytetelling.
+#
+#   python tools/bench_sharding.py --docs 500000 --legacy-docs 5000
+
+
+def synthetic_docs(n, seed=42):
+    rnd = random.Random(seed)
+    start = date(2006, 1, 1)
+    types = ["Inngående dokument", "Utgående dokument", "Saksframlegg", "Møtebok", "Internt notat"]
+    base = (
+        "https://www.strand.kommune.no/tjenester/politikk-innsyn-og-medvirkning/"
+        "postliste-dokumenter-og-vedtak/sok-i-post-dokumenter-og-saker/#/details/"
+    )
+    docs = []
+    for i in range(n):
+        d = start + timedelta(days=i * 7000 // max(n, 1))
+        has_files = rnd.random() < 0.6
+        docs.append({
+            "tittel": f"{rnd.randint(1, 300)}/{rnd.randint(1, 900)} Søknad om tiltak – Ådnanes {i}",
+            "dato": d.strftime("%d.%m.%Y"),
+            "dato_iso": d.isoformat(),
+            "dokumentID": f"{d.year}/{i}",
+            "dokumenttype": rnd.choice(types),
+            "avsender_mottaker": rnd.choice(["", "Avsender: Strand Eigedom AS", "Mottaker: Flere mottakere"]),
+            "journal_link": f"{base}a-{i:012d}!x/d-{i:012d}!y",
+            "filer": [{
+                "tekst": f"Dokument {i} (pdf, {rnd.randint(10, 900)}KB)",
+                "url": f"https://www.strand.kommune.no/api/presentation/v2/nye-innsyn/filer/v-{i}?pid=29",
+            }] if has_files else [],
+            "status": "Publisert" if has_files else "Må bes om innsyn",
+        })
+    docs.reverse()
+    return docs
+
+
+def legacy_boundaries(docs, max_bytes):
+    """Den gamle løkken fra save_postliste_sharded (kun grenser, ingen skriving)."""
+    sizes = []
+    current = []
+    for doc in docs:
+        current.append(doc)
+        serialized = json.dumps(current, ensure_ascii=False)
+        if len(serialized.encode("utf-8")) > max_bytes:
+            last = current.pop()
+            sizes.append(len(current))
+            current = [last]
+    if current:
+        sizes.append(len(current))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=500_000)
+    parser.add_argument("--legacy-docs", type=int, default=5_000,
+                        help="Antall dokumenter den gamle O(n²)-løkken kjøres på")
+    parser.add_argument("--max-bytes", type=int, default=SHARD_MAX_BYTES)
+    args = parser.parse_args()
+
+    print(f"[INFO] Lager {args.docs} syntetiske dokumenter…")
+    docs = synthetic_docs(args.docs)
+
+    # Ny motor: planlegging + skriving til temp-katalog
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        written = write_sharded(docs, lambda n: Path(tmp) / f"postliste_{n}.json", args.max_bytes)
+        t_new = time.perf_counter() - t0
+
+        for path, shard_docs, nbytes, _locs in written:
+            actual = path.stat().st_size
+            if actual != nbytes or actual > args.max_bytes and len(shard_docs) > 1:
+                print(f"[ERROR] {path.name}: beregnet {nbytes} B, faktisk {actual} B")
+                sys.exit(1)
+
+    print(f"[RESULT] Ny motor:   {args.docs} dok på {t_new:.2f}s "
+          f"({args.docs / t_new:,.0f} dok/s), {len(written)} shards, grenser byte-eksakte")
+
+    # Gammel løkke på et utvalg (kvadratisk, så hele korpuset tar timer)
+    sample = docs[: args.legacy_docs]
+    t0 = time.perf_counter()
+    legacy_boundaries(sample, args.max_bytes)
+    t_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pack_shards(serialize_docs(sample), args.max_bytes)
+    t_new_sample = time.perf_counter() - t0
+
+    print(f"[RESULT] Gammel løkke: {len(sample)} dok på {t_old:.2f}s ({len(sample) / t_old:,.0f} dok/s)")
+    print(f"[RESULT] Ny motor på samme utvalg (uten skriving): {t_new_sample:.2f}s "
+          f"→ {t_old / t_new_sample:,.0f}x raskere")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,25 @@
 import json
+import os
+import sys
 from pathlib import Path
-from datetime import datetime, date
-
-DATA_DIR = Path("data")
-ARCHIVE_DIR = DATA_DIR / "archive"
-OUTPUT_DIR = DATA_DIR
-
-SHARD_PREFIX = "postliste_"
-SHARD_MAX_BYTES = 50 * 1024 * 1024
-SHARD_INDEX_FILE = OUTPUT_DIR / "postliste_index.json"
 
+ROOT = Path(__file__).resolve().parent.parent
+SCRAPERS_DIR = ROOT / "src" / "scrapers"
+sys.path.insert(0, str(SCRAPERS_DIR))
+from utils_files import archive_files, save_postliste_sharded  # noqa: E402
+from utils_archive import iter_archive  # noqa: E402
 
-def sort_key(x):
-    for key in ("dato_iso", "dato"):
-        v = x.get(key)
-        if not v:
-            continue
-        try:
-            if key == "dato_iso":
-                return datetime.fromisoformat(v).date()
-            else:
-                return datetime.strptime(v, "%d.%m.%Y").date()
-        except Exception:
-            continue
-    return date.min
-
-
-def atomic_write(path, data):
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    tmp.replace(path)
+DATA_DIR = ROOT / "data"
+ARCHIVE_DIR = DATA_DIR / "archive"
 
 
 def main():
     all_docs = []
 
-    # 1) Les alle årsfilene fra data/archive/
-    for path in sorted(ARCHIVE_DIR.glob("postliste_*.json")):
-        print(f"[INFO] Leser arkivfil {path}")
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-            if isinstance(data, list):
-                all_docs.extend(data)
-        except Exception as e:
-            print(f"[WARN] Klarte ikke lese {path}: {e}")
+    # 1) Les alle årsfilene fra data/archive/ (parallelt, med cache)
+    for path, data in iter_archive(archive_files("postliste_*", ARCHIVE_DIR)):
+        print(f"[INFO] Leste arkivfil {path} ({len(data)} dokumenter)")
+        all_docs.extend(data)
 
     # 2) Hvis du vil inkludere eksisterende data/postliste.json:
     legacy = DATA_DIR / "postliste.json"
@@ -69,40 +43,12 @@ def main():
         merged[did] = d
 
     docs = list(merged.values())
-    docs_sorted = sorted(docs, key=sort_key, reverse=True)
-    print(f"[INFO] Totalt {len(docs_sorted)} unike dokumenter etter sammenslåing.")
-
-    # 4) Shard dem ut
-    shards = []
-    current = []
-    current_index = 1
-
-    def current_path(idx):
-        return OUTPUT_DIR / f"{SHARD_PREFIX}{idx}.json"
-
-    for doc in docs_sorted:
-        current.append(doc)
-        serialized = json.dumps(current, ensure_ascii=False)
-        if len(serialized.encode("utf-8")) > SHARD_MAX_BYTES:
-            last = current.pop()
-            path = current_path(current_index)
-            atomic_write(path, current)
-            shards.append(path)
-            print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
-            current_index += 1
-            current = [last]
-
-    if current:
-        path = current_path(current_index)
-        atomic_write(path, current)
-        shards.append(path)
-        print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
-
-    # 5) Skriv index
-    atomic_write(SHARD_INDEX_FILE, [p.name for p in shards])
+    print(f"[INFO] Totalt {len(docs)} unike dokumenter etter sammenslåing.")
 
-    total = sum(len(json.loads(p.read_text(encoding="utf-8"))) for p in shards)
-    print(f"[INFO] Ferdig: {total} dokumenter fordelt på {len(shards)} shards.")
+    # 4) Shard dem ut, med indeks, manifest, dokument- og hash-indeks.
+    #    DATA_DIR i utils_files er relativ til src/scrapers.
+    os.chdir(SCRAPERS_DIR)
+    save_postliste_sharded(docs)
     print("[INFO] Nå kan du fase ut data/postliste.json hvis du vil.")
 
 
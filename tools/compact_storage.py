@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SCRAPERS_DIR = Path(__file__).resolve().parent.parent / "src" / "scrapers"
+sys.path.insert(0, str(SCRAPERS_DIR))
+from utils_compact import COMPRESSIONS  # noqa: E402
+from utils_files import (  # noqa: E402
+    COMPACT_SUFFIX,
+    atomic_write_stream,
+    doc_fingerprint,
+    drop_archive_sibling,
+    list_shard_paths,
+    read_docs,
+    save_postliste_sharded,
+    write_compact,
+)
+from utils_shards import ensure_hash_index  # noqa: E402
+
+# Kompakt lagring (.plc) for arkivet og hele korpuset.
+#
+#   python tools/compact_storage.py pack [--compression lzma] [--corpus] [--force]
+#       data/archive/postliste_*.json -> .plc (og shardene -> postliste_corpus.plc)
+#   python tools/compact_storage.py export [--shards] [--force]
+#       .plc -> JSON-filer (arkiv og/eller shards for nettsiden).
+#
+# Hver arkivfil finnes i ett format: finnes begge, gjelder .plc
+# (utils_files.archive_files), og pack/export fjerner filen i det andre
+# formatet når den nye er skrevet og kontrollert. mtime brukes ikke til
+# noe valg, siden den er tilfeldig etter en git checkout. Shards som
+# avviker fra korpuset overskrives bare med --force.
+#   python tools/compact_storage.py verify
+#       rundtur-sjekk (tapsfri) pluss størrelse og innlesingstid per format
+#
+# Kjøres fra rotmappen i repoet.
+
+DATA_DIR = Path("data")
+ARCHIVE_DIR = DATA_DIR / "archive"
+SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
+CORPUS_FILE = DATA_DIR / "postliste_corpus.plc"
+
+
+def _mb(n):
+    return f"{n / (1024 * 1024):.2f} MB"
+
+
+def shard_paths():
+    names = json.loads(SHARD_INDEX_FILE.read_text(encoding="utf-8")) if SHARD_INDEX_FILE.exists() else []
+    return [DATA_DIR / name for name in names if (DATA_DIR / name).exists()]
+
+
+def _same_docs(a, b):
+    # Sammenlign også nøkkelrekkefølge og typer, ikke bare ==
+    return json.dumps(a, ensure_ascii=False) == json.dumps(b, ensure_ascii=False)
+
+
+@contextmanager
+def _in_scrapers_dir():
+    # DATA_DIR i utils_files er relativ til src/scrapers
+    cwd = os.getcwd()
+    os.chdir(SCRAPERS_DIR)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def pack(compression, corpus, force):
+    for src in sorted(ARCHIVE_DIR.glob("postliste_*.json")):
+        dst = src.with_suffix(COMPACT_SUFFIX)
+        docs = read_docs(src)
+        if dst.exists() and not force and not _same_docs(read_docs(dst), docs):
+            print(f"[WARN] {dst.name} avviker fra {src.name} og gjelder foran den – hopper over "
+                  f"(bruk --force for å pakke {src.name}).")
+            continue
+        nbytes = write_compact(dst, docs, compression)
+        if not _same_docs(read_docs(dst), docs):
+            print(f"[ERROR] {dst.name}: rundturen er ikke tapsfri – beholder {src.name}.")
+            dst.unlink()
+            continue
+        print(f"[INFO] {src.name}: {_mb(src.stat().st_size)} → {dst.name}: {_mb(nbytes)}")
+        drop_archive_sibling(dst)
+
+    if corpus:
+        if not shard_paths():
+            print("[WARN] Ingen shards funnet – hopper over korpusfilen.")
+            return
+        docs = []
+        for p in shard_paths():
+            docs.extend(read_docs(p))
+        nbytes = write_compact(CORPUS_FILE, docs, compression)
+        print(f"[INFO] Korpus: {len(docs)} dokumenter → {CORPUS_FILE} ({_mb(nbytes)})")
+
+
+def export(shards, force):
+    # .plc gjelder foran .json (archive_files), så eksporten overskriver
+    # JSON-filen og fjerner .plc etterpå
+    for src in sorted(ARCHIVE_DIR.glob(f"postliste_*{COMPACT_SUFFIX}")):
+        dst = src.with_suffix(".json")
+        docs = read_docs(src)
+        count = atomic_write_stream(dst, docs)
+        if not _same_docs(read_docs(dst), docs):
+            print(f"[ERROR] {dst.name}: rundturen er ikke tapsfri – beholder {src.name}.")
+            continue
+        print(f"[INFO] {src.name} → {dst.name} ({count} dokumenter)")
+        drop_archive_sibling(dst)
+
+    if shards:
+        if not CORPUS_FILE.exists():
+            print(f"[ERROR] {CORPUS_FILE} finnes ikke – kjør pack --corpus først.")
+            sys.exit(1)
+        docs = read_docs(CORPUS_FILE)
+        with _in_scrapers_dir():
+            if list_shard_paths():
+                # Innholdet avgjør, ikke mtime (tilfeldig etter en git checkout)
+                corpus_hashes = {d["dokumentID"]: doc_fingerprint(d) for d in docs if d.get("dokumentID")}
+                if ensure_hash_index() == corpus_hashes:
+                    print(f"[INFO] Shardene har samme innhold som {CORPUS_FILE.name} – ingenting å eksportere.")
+                    return
+                if not force:
+                    print(f"[WARN] Shardene avviker fra {CORPUS_FILE.name} – hopper over (bruk --force).")
+                    return
+            # Samme skriver som scraperne (indeks, manifest, dokument- og hash-indeks)
+            save_postliste_sharded(docs)
+
+
+def _timed_read(path):
+    t0 = time.perf_counter()
+    docs = read_docs(path)
+    return docs, time.perf_counter() - t0
+
+
+def verify():
+    pairs = [(p, p.with_suffix(".json")) for p in sorted(ARCHIVE_DIR.glob(f"postliste_*{COMPACT_SUFFIX}"))]
+    if CORPUS_FILE.exists():
+        pairs.append((CORPUS_FILE, None))
+
+    ok = True
+    totals = {"json_bytes": 0, "plc_bytes": 0, "json_s": 0.0, "plc_s": 0.0}
+    for plc, js in pairs:
+        compact, t_plc = _timed_read(plc)
+        if js is None:
+            original, t_js = [], 0.0
+            for p in shard_paths():
+                docs, t = _timed_read(p)
+                original.extend(docs)
+                t_js += t
+            js_bytes = sum(p.stat().st_size for p in shard_paths())
+        elif js.exists():
+            original, t_js = _timed_read(js)
+            js_bytes = js.stat().st_size
+        else:
+            print(f"[INFO] {plc.name}: {len(compact)} dokumenter (ingen JSON å sammenligne med)")
+            continue
+
+        # Sammenlign også nøkkelrekkefølge og typer, ikke bare ==
+        same = json.dumps(compact, ensure_ascii=False) == json.dumps(original, ensure_ascii=False)
+        ok &= same
+        totals["json_bytes"] += js_bytes
+        totals["plc_bytes"] += plc.stat().st_size
+        totals["json_s"] += t_js
+        totals["plc_s"] += t_plc
+        print(f"[{'OK' if same else 'ERROR'}] {plc.name}: {len(compact)} dokumenter, "
+              f"{_mb(js_bytes)} → {_mb(plc.stat().st_size)}, {t_js * 1000:.0f} → {t_plc * 1000:.0f} ms")
+
+    if totals["plc_bytes"]:
+        print(f"[INFO] Totalt {_mb(totals['json_bytes'])} → {_mb(totals['plc_bytes'])} "
+              f"({totals['json_bytes'] / totals['plc_bytes']:.1f}x), innlesing "
+              f"{totals['json_s'] * 1000:.0f} → {totals['plc_s'] * 1000:.0f} ms")
+    if not ok:
+        print("[ERROR] Rundtur er ikke tapsfri for alle filer.")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_pack = sub.add_parser("pack")
+    p_pack.add_argument("--compression", choices=sorted(COMPRESSIONS), default="zlib")
+    p_pack.add_argument("--corpus", action="store_true", help="Pakk også alle shards til postliste_corpus.plc")
+    p_pack.add_argument("--force", action="store_true", help="Pakk .json selv om en avvikende .plc finnes")
+
+    p_export = sub.add_parser("export")
+    p_export.add_argument("--shards", action="store_true", help="Skriv shards for nettsiden fra postliste_corpus.plc")
+    p_export.add_argument("--force", action="store_true", help="Overskriv shards som avviker fra korpuset")
+
+    sub.add_parser("verify")
+
+    args = parser.parse_args()
+    if args.cmd == "pack":
+        pack(args.compression, args.corpus, args.force)
+    elif args.cmd == "export":
+        export(args.shards, args.force)
+    else:
+        verify()
+
+
+if __name__ == "__main__":
+    main()
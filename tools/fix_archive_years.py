@@ -1,6 +1,11 @@
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_files import COMPACT_SUFFIX, archive_files, drop_archive_sibling, write_compact  # noqa: E402
+from utils_archive import iter_archive  # noqa: E402
+
 ARCHIVE_DIR = Path("data/archive")
 
 def extract_year_from_filename(filename):
@@ -10,12 +15,9 @@ def extract_year_from_filename(filename):
     year = parts[1]
     return int(year) if year.isdigit() else None
 
-def fix_file(path):
+def fix_file(path, data):
     expected_year = extract_year_from_filename(path.name)
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
     filtered = []
     removed = 0
 
@@ -26,15 +28,22 @@ def fix_file(path):
         else:
             removed += 1
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(filtered, f, ensure_ascii=False, indent=2)
+    # Skriv bare filer som faktisk endres (holder mtime, og dermed
+    # arkiv-cachen, gyldig for resten)
+    if removed:
+        if path.suffix == COMPACT_SUFFIX:
+            write_compact(path, filtered)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(filtered, f, ensure_ascii=False, indent=2)
+        drop_archive_sibling(path)
 
     return len(filtered), removed
 
 def main():
     print("=== Fikser arkivfiler ===")
-    for file in sorted(ARCHIVE_DIR.glob("postliste_*_H*.json")):
-        kept, removed = fix_file(file)
+    for file, data in iter_archive(archive_files("postliste_*_H*", ARCHIVE_DIR)):
+        kept, removed = fix_file(file, data)
         print(f"\nFil: {file.name}")
         print(f"  Beholdt: {kept}")
         print(f"  Fjernet: {removed}")
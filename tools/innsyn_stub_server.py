@@ -0,0 +1,97 @@
+import argparse
+import json
+import sys
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from scraper_core_api import DEFAULT_SEARCH_PATH, SEARCH_QUERY  # noqa: E402
+
+# Lokal stub-server som spiller av innspilte JSON-svar fra innsyn-API-et.
+#
+# Opptaksfilen er et JSON-objekt der nøkkelen er path + query-string
+# og verdien er responsen som skal returneres, f.eks.:
+#
+#   {
+#     "/api/presentation/v2/nye-innsyn/journalposter?page=1&pageSize=100": [ ... ]
+#   }
+#
+# Bruk mot scraperne ved å sette "fetch_backend": "api" og
+# "api_base_url": "http://127.0.0.1:8765" i config.
+#
+# Ekte opptak (f.eks. for å kontrollere API_FIELDS i scraper_core_api.py):
+#   python tools/innsyn_stub_server.py opptak.json --record https://www.strand.kommune.no --pages 2
+
+DEFAULT_PORT = 8765
+
+
+def load_recording(path):
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError("Opptaksfilen må være et JSON-objekt {path: respons}")
+    return data
+
+
+def record(base_url, pages, page_size, search_path=DEFAULT_SEARCH_PATH):
+    """Henter søkesidene 1..pages fra base_url og returnerer {path: respons}."""
+    recording = {}
+    for page in range(1, pages + 1):
+        path = search_path + SEARCH_QUERY.format(page=page, page_size=page_size)
+        req = urllib.request.Request(base_url.rstrip("/") + path, headers={"Accept": "application/json"})
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            recording[path] = json.loads(resp.read().decode("utf-8"))
+        print(f"[INFO] Tok opp {path}")
+    return recording
+
+
+def make_handler(recording):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in recording:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            body = json.dumps(recording[self.path], ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            print(f"[STUB] {self.address_string()} {fmt % args}")
+
+    return ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("recording", help="JSON-fil med innspilte svar")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--record", metavar="BASE_URL", help="Ta opp svar fra BASE_URL til filen i stedet for å spille av")
+    parser.add_argument("--pages", type=int, default=1, help="Antall søkesider å ta opp")
+    parser.add_argument("--page-size", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.record:
+        recording = record(args.record, args.pages, args.page_size)
+        Path(args.recording).write_text(json.dumps(recording, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[INFO] Skrev {len(recording)} svar til {args.recording}")
+        return
+
+    recording = load_recording(args.recording)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(recording))
+    print(f"[INFO] Stub-server lytter på http://127.0.0.1:{args.port} ({len(recording)} svar)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
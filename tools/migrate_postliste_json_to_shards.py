@@ -1,36 +1,15 @@
 import json
+import os
+import sys
 from pathlib import Path
-from datetime import datetime, date
-
-DATA_DIR = Path("data")
-LEGACY_FILE = DATA_DIR / "postliste.json"
-
-SHARD_PREFIX = "postliste_"
-SHARD_MAX_BYTES = 50 * 1024 * 1024
-SHARD_INDEX_FILE = DATA_DIR / "postliste_index.json"
-
-
-def sort_key(x):
-    for key in ("dato_iso", "dato"):
-        v = x.get(key)
-        if not v:
-            continue
-        try:
-            if key == "dato_iso":
-                return datetime.fromisoformat(v).date()
-            else:
-                return datetime.strptime(v, "%d.%m.%Y").date()
-        except Exception:
-            continue
-    return date.min
 
+ROOT = Path(__file__).resolve().parent.parent
+SCRAPERS_DIR = ROOT / "src" / "scrapers"
+sys.path.insert(0, str(SCRAPERS_DIR))
+from utils_files import save_postliste_sharded  # noqa: E402
 
-def atomic_write(path, data):
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    tmp.replace(path)
+DATA_DIR = ROOT / "data"
+LEGACY_FILE = DATA_DIR / "postliste.json"
 
 
 def main():
@@ -60,41 +39,12 @@ def main():
         merged[did] = d
 
     docs = list(merged.values())
-    docs_sorted = sorted(docs, key=sort_key, reverse=True)
-
-    print(f"[INFO] Totalt {len(docs_sorted)} unike dokumenter etter dedup.")
-
-    # Shard dem ut
-    shards = []
-    current = []
-    current_index = 1
-
-    def current_path(idx):
-        return DATA_DIR / f"{SHARD_PREFIX}{idx}.json"
-
-    for doc in docs_sorted:
-        current.append(doc)
-        serialized = json.dumps(current, ensure_ascii=False)
-        if len(serialized.encode("utf-8")) > SHARD_MAX_BYTES:
-            last = current.pop()
-            path = current_path(current_index)
-            atomic_write(path, current)
-            shards.append(path)
-            print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
-            current_index += 1
-            current = [last]
-
-    if current:
-        path = current_path(current_index)
-        atomic_write(path, current)
-        shards.append(path)
-        print(f"[INFO] Skrev shard {path} med {len(current)} dokumenter.")
-
-    # Skriv index
-    atomic_write(SHARD_INDEX_FILE, [p.name for p in shards])
+    print(f"[INFO] Totalt {len(docs)} unike dokumenter etter dedup.")
 
-    total = sum(len(json.loads(p.read_text(encoding="utf-8"))) for p in shards)
-    print(f"[INFO] Ferdig: {total} dokumenter fordelt på {len(shards)} shards.")
+    # Shard dem ut, med indeks, manifest, dokument- og hash-indeks.
+    # DATA_DIR i utils_files er relativ til src/scrapers.
+    os.chdir(SCRAPERS_DIR)
+    save_postliste_sharded(docs)
     print("[INFO] Migrering fullført. postliste.json kan beholdes eller slettes.")
 
 
@@ -1,6 +1,10 @@
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "scrapers"))
+from utils_files import archive_files  # noqa: E402
+from utils_archive import map_archive  # noqa: E402
+
 ARCHIVE_DIR = Path("data/archive")
 
 def extract_year_from_filename(filename):
@@ -11,14 +15,12 @@ def extract_year_from_filename(filename):
     year = parts[1]
     return int(year) if year.isdigit() else None
 
-def verify_file(path):
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
+def verify_docs(data):
+    # Kjøres i arbeidsprosesser og caches per fil (se utils_archive)
     if not data:
         return {
             "count": 0,
-            "years": set(),
+            "years": [],
             "status": "EMPTY"
         }
 
@@ -30,15 +32,16 @@ def verify_file(path):
 
     return {
         "count": len(data),
-        "years": years,
+        "years": sorted(years),
         "status": "OK" if len(years) == 1 else "MIXED"
     }
 
 def main():
     print("=== Verifiserer arkivfiler ===")
-    for file in sorted(ARCHIVE_DIR.glob("postliste_*_H*.json")):
+    for file, result in map_archive(archive_files("postliste_*_H*", ARCHIVE_DIR), verify_docs):
+        if result is None:
+            continue
         expected_year = extract_year_from_filename(file.name)
-        result = verify_file(file)
 
         print(f"\nFil: {file.name}")
         print(f"  Antall oppføringer: {result['count']}")
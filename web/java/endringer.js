@@ -3,12 +3,11 @@
 // ===============================
 
 // Importer moduler
-import { loadChanges, loadPostliste } from "./endringer_data.js";
+import { loadRollup } from "./endringer_data.js";
 import { renderKPIs } from "./endringer_kpi.js";
 import { renderGraphs } from "./endringer_graphs.js";
 import { renderTables } from "./endringer_tables.js";
 
-
 // -------------------------------
 //  INITIALISERING
 // -------------------------------
@@ -16,18 +15,22 @@ import { renderTables } from "./endringer_tables.js";
 async function initDashboard() {
     console.log("📊 Initialiserer endringsdashboard...");
 
-    // 1. Last data
-    const changes = await loadChanges();
-    const postliste = await loadPostliste();
+    // 1. Last ferdig aggregert oversikt (én liten fil, uavhengig av
+    //    hvor lang endringsloggen er)
+    const rollup = await loadRollup();
+    if (!rollup) {
+        console.warn("Fant ikke data/changes/rollup.json – ingen endringer registrert ennå.");
+        return;
+    }
 
     // 2. KPI-er
-    renderKPIs(changes, postliste);
+    renderKPIs(rollup);
 
     // 3. Grafer
-    renderGraphs(changes, postliste);
+    renderGraphs(rollup);
 
     // 4. Tabeller
-    renderTables(changes, postliste);
+    renderTables(rollup);
 
     console.log("✅ Dashboard ferdig lastet");
 }
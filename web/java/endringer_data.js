@@ -3,14 +3,47 @@
 //  Laster og parser datafiler
 // ===============================
 
-export async function loadChanges() {
-    const res = await fetch("../data/changes.json");
-    const data = await res.json();
+// Endringsloggen ligger som NDJSON-segmenter per måned
+// (data/changes/changes_YYYY-MM.ndjson) med et lite manifest.
+// monthsBack = antall siste måneder som hentes (null = alle).
+export async function loadChanges(monthsBack = null) {
+    const manifestRes = await fetch("../data/changes/manifest.json");
+
+    // Fallback til gammelt format før migrering
+    if (!manifestRes.ok) {
+        const res = await fetch("../data/changes.json");
+        const data = await res.json();
+        return data.sort((a, b) => new Date(b.tidspunkt) - new Date(a.tidspunkt));
+    }
+
+    const manifest = await manifestRes.json();
+    let segments = manifest.segments || [];
+    if (monthsBack !== null) {
+        segments = segments.slice(-monthsBack);
+    }
+
+    const segmentData = await Promise.all(segments.map(async (seg) => {
+        const res = await fetch(`../data/changes/${seg.file}`);
+        const text = await res.text();
+        return text
+            .split("\n")
+            .filter(line => line.trim())
+            .map(line => JSON.parse(line));
+    }));
+
+    const data = segmentData.flat();
 
     // Sorter nyeste først
     return data.sort((a, b) => new Date(b.tidspunkt) - new Date(a.tidspunkt));
 }
 
+// Ferdig aggregert oversikt for dashboardet (data/changes/rollup.json),
+// vedlikeholdt av scraperne (utils_change_rollup.py). null hvis den mangler.
+export async function loadRollup() {
+    const res = await fetch("../data/changes/rollup.json");
+    return res.ok ? res.json() : null;
+}
+
 // ===============================
 //  Laster shards i stedet for postliste.json
 // ===============================
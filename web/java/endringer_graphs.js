@@ -3,18 +3,24 @@
 //  Grafer for dashboardet
 // ===============================
 
-export function renderGraphs(changes, postliste) {
+// Summerer {nøkkel: antall} over alle måneder i oversikten
+function sumMonths(rollup, field) {
+    const total = {};
+    for (const month of Object.values(rollup.per_maned || {})) {
+        for (const [key, n] of Object.entries(month[field] || {})) {
+            total[key] = (total[key] || 0) + n;
+        }
+    }
+    return total;
+}
 
-    // 1. Endringer over tid
-    const perDay = {};
+export function renderGraphs(rollup) {
 
-    for (const c of changes) {
-        const d = c.tidspunkt.slice(0, 10);
-        perDay[d] = (perDay[d] || 0) + 1;
-    }
+    // 1. Endringer over tid
+    const perDay = rollup.per_dag || {};
 
     const labels = Object.keys(perDay).sort();
-    const values = labels.map(d => perDay[d]);
+    const values = labels.map(d => (perDay[d].NEW || 0) + (perDay[d].UPDATE || 0));
 
     new Chart(
         document.getElementById("graph-changes-over-time"),
@@ -32,16 +38,35 @@ export function renderGraphs(changes, postliste) {
         }
     );
 
-    // 2. Endringer per dokumenttype
-    const perType = {};
+    // 2. Nye og oppdaterte per uke
+    const perWeek = rollup.per_uke || {};
+    const weeks = Object.keys(perWeek).sort();
 
-    for (const c of changes) {
-        const doc = postliste[c.dokumentID];
-        if (!doc) continue;
+    new Chart(
+        document.getElementById("graph-per-week"),
+        {
+            type: "bar",
+            data: {
+                labels: weeks,
+                datasets: [
+                    {
+                        label: "Nye",
+                        data: weeks.map(w => perWeek[w].NEW || 0),
+                        backgroundColor: "#44aadd"
+                    },
+                    {
+                        label: "Oppdaterte",
+                        data: weeks.map(w => perWeek[w].UPDATE || 0),
+                        backgroundColor: "#ffaa33"
+                    }
+                ]
+            },
+            options: { scales: { x: { stacked: true }, y: { stacked: true } } }
+        }
+    );
 
-        const type = doc.dokumenttype || "Ukjent";
-        perType[type] = (perType[type] || 0) + 1;
-    }
+    // 3. Endringer per dokumenttype
+    const perType = sumMonths(rollup, "typer");
 
     new Chart(
         document.getElementById("graph-by-type"),
@@ -58,15 +83,8 @@ export function renderGraphs(changes, postliste) {
         }
     );
 
-    // 3. Hvilke felter endres mest?
-    const fieldCounts = {};
-
-    for (const c of changes) {
-        if (!c.endringer) continue;
-        for (const field of Object.keys(c.endringer)) {
-            fieldCounts[field] = (fieldCounts[field] || 0) + 1;
-        }
-    }
+    // 4. Hvilke felter endres mest?
+    const fieldCounts = sumMonths(rollup, "felt");
 
     new Chart(
         document.getElementById("graph-field-changes"),
@@ -82,4 +100,22 @@ export function renderGraphs(changes, postliste) {
             }
         }
     );
+
+    // 5. Statusoverganger (f.eks. "Må bes om innsyn → Publisert")
+    const transitions = sumMonths(rollup, "overganger");
+
+    new Chart(
+        document.getElementById("graph-status-transitions"),
+        {
+            type: "bar",
+            data: {
+                labels: Object.keys(transitions),
+                datasets: [{
+                    label: "Statusoverganger",
+                    data: Object.values(transitions),
+                    backgroundColor: "#66bb66"
+                }]
+            }
+        }
+    );
 }
@@ -3,32 +3,30 @@
 //  KPI-beregninger og rendering
 // ===============================
 
-export function renderKPIs(changes, postliste) {
+export function renderKPIs(rollup) {
 
     const now = new Date();
     const days30 = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000);
+    const from = days30.toISOString().slice(0, 10);
 
-    const recent = changes.filter(c => new Date(c.tidspunkt) >= days30);
+    // Summer dagstellerne for de siste 30 dagene
+    const sum = { NEW: 0, UPDATE: 0, filer: 0, status: 0 };
+    for (const [day, counts] of Object.entries(rollup.per_dag || {})) {
+        if (day < from) continue;
+        for (const key of Object.keys(sum)) sum[key] += counts[key] || 0;
+    }
 
-    const newDocs = recent.filter(c => c.type === "NEW").length;
-    const updatedDocs = recent.filter(c => c.type === "UPDATE").length;
+    const newDocs = sum.NEW;
+    const updatedDocs = sum.UPDATE;
 
     const changeRate = newDocs + updatedDocs > 0
         ? Math.round((updatedDocs / (newDocs + updatedDocs)) * 100)
         : 0;
 
-    const newFiles = recent.filter(c =>
-        c.endringer && c.endringer.filer_count
-    ).length;
-
-    const statusChanges = recent.filter(c =>
-        c.endringer && c.endringer.status
-    ).length;
-
     // Render
     document.getElementById("kpi-new-docs-value").textContent = newDocs;
     document.getElementById("kpi-updated-docs-value").textContent = updatedDocs;
     document.getElementById("kpi-change-rate-value").textContent = changeRate + "%";
-    document.getElementById("kpi-new-files-value").textContent = newFiles;
-    document.getElementById("kpi-status-changes-value").textContent = statusChanges;
+    document.getElementById("kpi-new-files-value").textContent = sum.filer;
+    document.getElementById("kpi-status-changes-value").textContent = sum.status;
 }
@@ -3,7 +3,7 @@
 //  Tabeller og detaljvisning
 // ===============================
 
-export function renderTables(changes, postliste) {
+export function renderTables(rollup) {
 
     // ---------------------------
     // 1. Siste endringer
@@ -11,9 +11,7 @@ export function renderTables(changes, postliste) {
     const tbody = document.querySelector("#table-latest-changes tbody");
     tbody.innerHTML = "";
 
-    const latest = changes
-    .filter(c => c.type === "UPDATE")
-    .slice(0, 20);
+    const latest = (rollup.siste?.UPDATE || []).slice(0, 20);
 
     for (const c of latest) {
         const tr = document.createElement("tr");
@@ -21,12 +19,12 @@ export function renderTables(changes, postliste) {
         tr.innerHTML = `
             <td>${c.tidspunkt}</td>
             <td>${c.dokumentID}</td>
-            <td>${postliste[c.dokumentID]?.tittel || ""}</td>
+            <td>${c.tittel || ""}</td>
             <td>${c.type}</td>
             <td>${Object.keys(c.endringer || {}).join(", ")}</td>
         `;
 
-        tr.addEventListener("click", () => showDetail(c, postliste));
+        tr.addEventListener("click", () => showDetail(c));
 
         tbody.appendChild(tr);
     }
@@ -35,24 +33,16 @@ export function renderTables(changes, postliste) {
     // ---------------------------
     // 2. Dokumenter med flest endringer
     // ---------------------------
-    const counts = {};
-
-    for (const c of changes) {
-        counts[c.dokumentID] = (counts[c.dokumentID] || 0) + 1;
-    }
-
-    const sorted = Object.entries(counts)
-        .sort((a, b) => b[1] - a[1])
-        .slice(0, 20);
+    const sorted = rollup.mest_endret || [];
 
     const tbody2 = document.querySelector("#table-most-changed tbody");
     tbody2.innerHTML = "";
 
-    for (const [docID, count] of sorted) {
+    for (const [docID, title, count] of sorted) {
         const tr = document.createElement("tr");
         tr.innerHTML = `
             <td>${docID}</td>
-            <td>${postliste[docID]?.tittel || ""}</td>
+            <td>${title || ""}</td>
             <td>${count}</td>
         `;
         tbody2.appendChild(tr);
@@ -65,15 +55,13 @@ export function renderTables(changes, postliste) {
     const tbody3 = document.querySelector("#table-new-files tbody");
     tbody3.innerHTML = "";
 
-    const fileChanges = changes.filter(c =>
-        c.endringer && c.endringer.filer_count
-    );
+    const fileChanges = rollup.siste_filer || [];
 
     for (const c of fileChanges.slice(0, 20)) {
         const tr = document.createElement("tr");
         tr.innerHTML = `
             <td>${c.dokumentID}</td>
-            <td>${postliste[c.dokumentID]?.tittel || ""}</td>
+            <td>${c.tittel || ""}</td>
             <td>${c.endringer.filer_count?.ny || "?"}</td>
         `;
         tbody3.appendChild(tr);
@@ -85,14 +73,12 @@ export function renderTables(changes, postliste) {
 //  POPUP-DETALJVISNING
 // ---------------------------
 
-function showDetail(change, postliste) {
+function showDetail(change) {
     const modal = document.getElementById("detail-modal");
     const body = document.getElementById("modal-body");
 
-    const doc = postliste[change.dokumentID];
-
     body.innerHTML = `
-        <h2>${doc?.tittel || "Ukjent dokument"}</h2>
+        <h2>${change.tittel || "Ukjent dokument"}</h2>
         <p><strong>DokumentID:</strong> ${change.dokumentID}</p>
         <p><strong>Tidspunkt:</strong> ${change.tidspunkt}</p>
         <p><strong>Type:</strong> ${change.type}</p>
@@ -1,8 +1,8 @@
 // export.js – funksjoner for eksport og deling
 import { getState, getFilteredData } from './render.js';
 
-export function exportCSV() {
-  const filtered = getFilteredData();
+export async function exportCSV() {
+  const filtered = await getFilteredData();
   const rows = [["Dato","DokumentID","Tittel","Dokumenttype","Avsender/Mottaker","Status","Journalpostlenke"]];
   filtered.forEach(d => {
     const link = d.journal_link || d.detalj_link || "";
@@ -0,0 +1,208 @@
+// postliste_index.js – oppslag mot forhåndsberegnede filer i data/web/
+// (lages av src/utils/generate_search_index.py).
+//
+// Hvert dokument har en posisjon i datorekkefølge (0 = eldst). Søk,
+// filtre og sortering regnes ut på posisjoner; bare skivene som trengs
+// for siden som vises hentes.
+
+const BASE = "../data/web";
+const MIN_TERM = 2;
+
+let meta = null;
+const cache = new Map();  // sti → Promise
+
+function fetchJSON(path) {
+  if (!cache.has(path)) {
+    cache.set(path, fetch(`${BASE}/${path}`).then(res => {
+      if (!res.ok) throw new Error(`${path}: ${res.status}`);
+      return res.json();
+    }));
+  }
+  return cache.get(path);
+}
+
+// Samme ordgrense som tokenize() i generate_search_index.py
+export function tokenize(text) {
+  return text ? (String(text).toLowerCase().match(/[\p{L}\p{N}]+/gu) || []) : [];
+}
+
+function undelta(arr) {
+  const out = new Array(arr.length);
+  let p = 0;
+  for (let i = 0; i < arr.length; i++) {
+    p += arr[i];
+    out[i] = p;
+  }
+  return out;
+}
+
+export async function loadMeta() {
+  meta = await fetchJSON("meta.json");
+  return meta;
+}
+
+// Reserve når data/web/ mangler: bygger de samme strukturene i minnet
+// fra en liste med dokumenter (f.eks. alle shards).
+export function useLocalData(docs) {
+  const day = d => {
+    const iso = d.dato_iso || (d.dato || "").split(".").reverse().join("-");
+    return /^\d{4}-\d{2}-\d{2}/.test(iso) ? iso.slice(0, 10) : "0001-01-01";
+  };
+  // Stigende dato; ved lik dato beholdes rekkefølgen (nyest først)
+  const sorted = docs.map((d, i) => [day(d), -i, d])
+    .sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : a[1] - b[1]))
+    .map(x => x[2]);
+
+  const days = new Map(), types = new Map(), statuses = new Map(), tokens = new Map();
+  const add = (map, key, p) => { if (!map.has(key)) map.set(key, []); map.get(key).push(p); };
+  sorted.forEach((d, p) => {
+    days.set(day(d), (days.get(day(d)) || 0) + 1);
+    add(types, d.dokumenttype || "", p);
+    add(statuses, d.status || "", p);
+    new Set([d.tittel, d.avsender_mottaker, d.dokumentID].flatMap(tokenize)).forEach(t => add(tokens, t, p));
+  });
+
+  const delta = list => list.map((p, i) => p - (i ? list[i - 1] : 0));
+  const typeNames = [...types.keys()].sort();
+  const statusNames = [...statuses.keys()].sort();
+  const size = sorted.length || 1;
+
+  meta = {
+    antall: sorted.length,
+    skive: size,
+    skiver: 1,
+    dager: [...days.entries()].sort(),
+    typer: typeNames.map(t => [t, types.get(t).length]),
+    statuser: statusNames.map(s => [s, statuses.get(s).length]),
+    sok: [""]
+  };
+  cache.set("sider/side_0.json", Promise.resolve(sorted));
+  typeNames.forEach((t, i) => cache.set(`lister/type_${i}.json`, Promise.resolve(delta(types.get(t)))));
+  statusNames.forEach((s, i) => cache.set(`lister/status_${i}.json`, Promise.resolve(delta(statuses.get(s)))));
+  cache.set("sok/.json", Promise.resolve(Object.fromEntries([...tokens].map(([t, ps]) => [t, delta(ps)]))));
+  return meta;
+}
+
+export function getMeta() {
+  return meta;
+}
+
+// === Delmengder (Set med posisjoner, eller null = alle) ===
+async function searchSet(query) {
+  const terms = tokenize(query).filter(t => t.length >= MIN_TERM);
+  if (!terms.length) return null;
+
+  let result = null;
+  for (const term of terms) {
+    const buckets = meta.sok.filter(b => b.startsWith(term) || term.startsWith(b));
+    const data = await Promise.all(buckets.map(b => fetchJSON(`sok/${encodeURIComponent(b)}.json`)));
+
+    const hits = new Set();
+    data.forEach(bucket => {
+      for (const [token, positions] of Object.entries(bucket)) {
+        if (token.startsWith(term)) undelta(positions).forEach(p => hits.add(p));
+      }
+    });
+    result = result ? new Set([...result].filter(p => hits.has(p))) : hits;
+  }
+  return result;
+}
+
+async function listPositions(kind, indices) {
+  const lists = await Promise.all(indices.map(i => fetchJSON(`lister/${kind}_${i}.json`)));
+  return lists.map(undelta);
+}
+
+function indicesWhere(entries, pred) {
+  return entries.map(([name], i) => pred(name) ? i : -1).filter(i => i >= 0);
+}
+
+function typeIndices(filter) {
+  return indicesWhere(meta.typer, t => t.includes(filter));
+}
+
+function statusIndices(status) {
+  return indicesWhere(meta.statuser, s => s === status);
+}
+
+async function unionSet(kind, indices) {
+  const set = new Set();
+  (await listPositions(kind, indices)).forEach(list => list.forEach(p => set.add(p)));
+  return set;
+}
+
+// [lo, hi) i posisjoner for datointervallet (dokumenter uten dato utelates)
+function dateInterval(from, to) {
+  let lo = 0, hi = 0, pos = 0;
+  let started = false;
+  for (const [day, count] of meta.dager) {
+    const ok = day !== "0001-01-01" && (!from || day >= from) && (!to || day <= to);
+    if (ok && !started) { lo = pos; started = true; }
+    pos += count;
+    if (ok) hi = pos;
+  }
+  return started ? [lo, hi] : [0, 0];
+}
+
+// === Resultat i visningsrekkefølge ===
+// Gir { length, slice(start, end) } med posisjoner.
+export async function queryPositions({ currentSearch, currentFilter, currentStatus, dateFrom, dateTo, currentSort }) {
+  const total = meta.antall;
+  const sets = await Promise.all([
+    currentSearch ? searchSet(currentSearch) : null,
+    currentFilter ? unionSet("type", typeIndices(currentFilter)) : null,
+    currentStatus ? unionSet("status", statusIndices(currentStatus)) : null
+  ]);
+  const active = sets.filter(s => s !== null).sort((a, b) => a.size - b.size);
+  const [lo, hi] = (dateFrom || dateTo) ? dateInterval(dateFrom, dateTo) : [0, total];
+
+  const keep = p => p >= lo && p < hi && active.every(s => s.has(p));
+
+  // Nyeste først innenfor hver gruppe, som i den gamle klientsorteringen
+  const byGroups = async (kind, indices) => {
+    const lists = await listPositions(kind, indices);
+    const out = [];
+    lists.forEach(list => {
+      for (let i = list.length - 1; i >= 0; i--) if (keep(list[i])) out.push(list[i]);
+    });
+    return out;
+  };
+
+  let positions;
+  if (currentSort === "type-asc" || currentSort === "type-desc") {
+    const order = meta.typer.map((_, i) => i)
+      .sort((a, b) => meta.typer[a][0].localeCompare(meta.typer[b][0]));
+    if (currentSort === "type-desc") order.reverse();
+    positions = await byGroups("type", order);
+  } else if (currentSort === "status-publisert" || currentSort === "status-innsyn") {
+    const pub = statusIndices("Publisert");
+    const rest = meta.statuser.map((_, i) => i).filter(i => !pub.includes(i));
+    positions = await byGroups("status", currentSort === "status-publisert" ? [...pub, ...rest] : [...rest, ...pub]);
+  } else if (!active.length) {
+    // Bare datointervall: ingen lister trengs
+    const n = hi - lo;
+    const asc = currentSort === "dato-asc";
+    return {
+      length: n,
+      slice: (start, end) => {
+        const out = [];
+        for (let i = start; i < Math.min(end, n); i++) out.push(asc ? lo + i : hi - 1 - i);
+        return out;
+      }
+    };
+  } else {
+    positions = [...active[0]].filter(keep).sort((a, b) => b - a);
+    if (currentSort === "dato-asc") positions.reverse();
+  }
+
+  return { length: positions.length, slice: (start, end) => positions.slice(start, end) };
+}
+
+// === Dokumenter for posisjoner (henter bare skivene som trengs) ===
+export async function getDocs(positions) {
+  const size = meta.skive;
+  const slices = [...new Set(positions.map(p => Math.floor(p / size)))];
+  const data = await Promise.all(slices.map(n => fetchJSON(`sider/side_${n}.json`)));
+  const bySlice = new Map(slices.map((n, i) => [n, data[i]]));
+  return positions.map(p => bySlice.get(Math.floor(p / size))[p % size]);
+}
@@ -1,8 +1,9 @@
 // === Imports ===
 import { renderPagination } from './pagination.js';
+import { getMeta, queryPositions, getDocs } from './postliste_index.js';
 
 // === Global state (privat) ===
-let data = [];              // <-- NYTT: datasettet fra shards
+let renderSeq = 0;          // nyeste renderPage-kall vinner
 let currentSearch = "";
 let currentFilter = "";
 let currentStatus = "";
@@ -12,8 +13,6 @@ let currentSort = "dato-desc";
 let currentPage = 1;
 
 // === Settere og gettere ===
-export function setData(arr) { data = arr || []; }   // <-- NYTT
-
 export function setSearch(val) { currentSearch = val; }
 export function setFilter(val) { currentFilter = val; }
 export function setStatus(val) { currentStatus = val; }
@@ -66,59 +65,18 @@ export function parseDDMMYYYY(d) {
   return new Date(YYYY, MM - 1, DD);
 }
 
-function getDateForSort(d) {
-  const dt = parseDDMMYYYY(d.dato);
-  return dt ? dt.getTime() : 0;
-}
-
 // === Filtrering og sortering ===
-export function getFilteredData() {
-  let arr = data.slice();
-
-  if (currentSearch) {
-    const q = currentSearch.toLowerCase();
-    arr = arr.filter(d =>
-      (d.tittel && d.tittel.toLowerCase().includes(q)) ||
-      (d.dokumentID && String(d.dokumentID).toLowerCase().includes(q))
-    );
-  }
-
-  if (currentFilter) {
-    arr = arr.filter(d => d.dokumenttype && d.dokumenttype.includes(currentFilter));
-  }
-
-  if (currentStatus) {
-    arr = arr.filter(d => d.status === currentStatus);
-  }
-
-  if (dateFrom || dateTo) {
-    const from = dateFrom ? new Date(dateFrom) : null;
-    const to = dateTo ? new Date(dateTo) : null;
-    arr = arr.filter(d => {
-      const pd = parseDDMMYYYY(d.dato);
-      if (!pd) return false;
-      if (from && pd < from) return false;
-      if (to && pd > to) return false;
-      return true;
-    });
-  }
-
-  arr.sort((a,b) => {
-    if (currentSort === "dato-desc") return getDateForSort(b) - getDateForSort(a);
-    if (currentSort === "dato-asc") return getDateForSort(a) - getDateForSort(b);
-    if (currentSort === "type-asc") return (a.dokumenttype||"").localeCompare(b.dokumenttype||"");
-    if (currentSort === "type-desc") return (b.dokumenttype||"").localeCompare(a.dokumenttype||"");
-    if (currentSort === "status-publisert") return (b.status === "Publisert") - (a.status === "Publisert");
-    if (currentSort === "status-innsyn") return (a.status === "Publisert") - (b.status === "Publisert");
-    return 0;
-  });
-
-  return arr;
+// Søk, filtre og sortering gjøres mot forhåndsberegnede indekser
+// (postliste_index.js); bare dokumentene som trengs hentes.
+export async function getFilteredData() {
+  const result = await queryPositions(getState());
+  return getDocs(result.slice(0, result.length));
 }
 
 // === Sammendrag ===
 function renderSummary(totalFiltered) {
-  const totalAll = data.length;
+  const meta = getMeta();
+  const totalAll = meta ? meta.antall : 0;
   const parts = [];
   if (currentSearch) parts.push(`søk: "${currentSearch}"`);
   if (currentFilter) parts.push(`type: ${currentFilter}`);
@@ -131,8 +89,10 @@ function renderSummary(totalFiltered) {
 }
 
 // === Rendering av kort og paginering ===
-export function renderPage(page) {
-  const filtered = getFilteredData();
+export async function renderPage(page) {
+  const seq = ++renderSeq;
+  const filtered = await queryPositions(getState());
+  if (seq !== renderSeq) return;
   const maxPage = Math.ceil(filtered.length / perPage) || 1;
 
   if (page < 1) page = 1;
@@ -141,12 +101,16 @@ export function renderPage(page) {
 
   const start = (page - 1) * perPage;
   const end = start + perPage;
-  const items = filtered.slice(start, end);
+  const items = await getDocs(filtered.slice(start, end));
+  if (seq !== renderSeq) return;
 
   const cards = items.map(d => {
     const typeClass = cssClassForType(d.dokumenttype || "");
     const typeIcon = iconForType(d.dokumenttype || "");
-    const statusClass = d.status === "Publisert" ? "status-publisert" : "status-innsyn";
+    // Ventende dokumenter (detail_mode "deferred") har ingen status ennå
+    const pending = !d.status && d.detalj_status === "venter";
+    const statusText = pending ? "Venter på detaljer" : d.status;
+    const statusClass = pending ? "status-venter" : d.status === "Publisert" ? "status-publisert" : "status-innsyn";
     const link = d.journal_link || d.detalj_link || "";
 
     let filesHtml = "";
@@ -168,7 +132,7 @@ export function renderPage(page) {
           ${datoVis} – ${escapeHtml(String(d.dokumentID || ""))} – ${am}
           <span class='${typeClass}'>${typeIcon} ${escapeHtml(d.dokumenttype || "")}</span>
         </p>
-        <p>Status: <span class='${statusClass}'>${d.status}</span></p>
+        <p>Status: <span class='${statusClass}'>${statusText}</span></p>
         ${filesHtml}
         ${link ? `<p class='footer-link'><a href='${link}' target='_blank' aria-label='Åpne journalposten'>Se journalposten</a></p>` : ""}
       </article>`;
@@ -8,66 +8,56 @@ let statusChart = null;
 let yearChart = null;
 
 export function initStats(data) {
-  if (!Array.isArray(data)) {
-    console.error("Data er ikke en liste:", data);
-    return;
+  // Forhåndsberegnet data/stats.json (generate_stats.py), eller en
+  // liste med dokumenter som reserve
+  if (Array.isArray(data)) {
+    buildCharts(aggregate(data));
+  } else if (data && data.per_maned) {
+    buildCharts(data);
+  } else {
+    console.error("Ukjent statistikkformat:", data);
   }
-
-  buildCharts(data);
 }
 
-function buildCharts(data) {
-  // ============================
-  // 1) Dokumenter per måned
-  // ============================
-  const perMonth = {};
+// Samme telling som src/utils/generate_stats.py
+function aggregate(data) {
+  const stats = {
+    per_maned: {},
+    per_type: {},
+    per_status: { "Publisert": 0, "Må bes om innsyn": 0 },
+    per_ar: {}
+  };
+
   data.forEach(d => {
     const dt = parseDDMMYYYY(d.dato);
-    if (!dt) return;
-    const key = `${dt.getFullYear()}-${String(dt.getMonth() + 1).padStart(2, "0")}`;
-    perMonth[key] = (perMonth[key] || 0) + 1;
-  });
-
-  const monthLabels = Object.keys(perMonth).sort();
-  const monthData = monthLabels.map(k => perMonth[k]);
+    if (dt && !isNaN(dt)) {
+      const key = `${dt.getFullYear()}-${String(dt.getMonth() + 1).padStart(2, "0")}`;
+      stats.per_maned[key] = (stats.per_maned[key] || 0) + 1;
+      stats.per_ar[dt.getFullYear()] = (stats.per_ar[dt.getFullYear()] || 0) + 1;
+    }
 
-  // ============================
-  // 2) Dokumenter per type
-  // ============================
-  const types = {};
-  data.forEach(d => {
     const t = d.dokumenttype || "Ukjent";
-    types[t] = (types[t] || 0) + 1;
+    stats.per_type[t] = (stats.per_type[t] || 0) + 1;
+
+    if (d.status === "Publisert") stats.per_status["Publisert"]++;
+    else stats.per_status["Må bes om innsyn"]++;
   });
 
-  const typeLabels = Object.keys(types).sort();
-  const typeData = typeLabels.map(k => types[k]);
+  return stats;
+}
 
-  // ============================
-  // 3) Publisert vs. Innsyn
-  // ============================
-  const status = { "Publisert": 0, "Må bes om innsyn": 0 };
-  data.forEach(d => {
-    if (d.status === "Publisert") status["Publisert"]++;
-    else status["Må bes om innsyn"]++;
-  });
+function buildCharts(stats) {
+  const monthLabels = Object.keys(stats.per_maned).sort();
+  const monthData = monthLabels.map(k => stats.per_maned[k]);
 
-  const statusLabels = Object.keys(status);
-  const statusData = statusLabels.map(k => status[k]);
+  const typeLabels = Object.keys(stats.per_type).sort();
+  const typeData = typeLabels.map(k => stats.per_type[k]);
 
-  // ============================
-  // 4) Dokumenter per år
-  // ============================
-  const perYear = {};
-  data.forEach(d => {
-    const dt = parseDDMMYYYY(d.dato);
-    if (!dt) return;
-    const year = dt.getFullYear();
-    perYear[year] = (perYear[year] || 0) + 1;
-  });
+  const statusLabels = Object.keys(stats.per_status);
+  const statusData = statusLabels.map(k => stats.per_status[k]);
 
-  const yearLabels = Object.keys(perYear).sort();
-  const yearData = yearLabels.map(k => perYear[k]);
+  const yearLabels = Object.keys(stats.per_ar).sort();
+  const yearData = yearLabels.map(k => stats.per_ar[k]);
 
   // ============================
   // Hent canvas-elementer
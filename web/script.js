@@ -1,7 +1,8 @@
 // Entry point for å hente inn modulene fra web/java/
 
 import './java/filters.js';
-import { renderPage, setData } from './java/render.js';
+import { renderPage } from './java/render.js';
+import { loadMeta, useLocalData } from './java/postliste_index.js';
 import { loadPostliste } from './java/endringer_data.js';
 import './java/export.js';
 import './java/stats.js';
@@ -10,19 +11,20 @@ import './java/stats.js';
 window.perPage = 50;
 
 document.addEventListener("DOMContentLoaded", async () => {
-  // 1. Last datasettet fra shards
-  const map = await loadPostliste();
+  // 1. Last metadata for søkeindeksen (data/web/meta.json)
+  try {
+    await loadMeta();
+  } catch (e) {
+    // 2. Reserve: last alle shards og bygg indeksen i nettleseren
+    console.warn("Fant ikke data/web/, laster alle shards:", e);
+    const map = await loadPostliste();
+    useLocalData(Object.values(map));
+  }
 
-  // 2. Konverter map → array (render.js forventer en liste)
-  const arr = Object.values(map);
-
-  // 3. Sett data i render.js
-  setData(arr);
-
-  // 4. Hent side fra URL
+  // 3. Hent side fra URL
   const params = new URLSearchParams(window.location.search);
   const page = parseInt(params.get("page"), 10);
 
-  // 5. Render første side
+  // 4. Render første side
   renderPage(!isNaN(page) ? page : 1);
 });